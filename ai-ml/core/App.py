@@ -3,32 +3,37 @@
 
 ###### Packages Used ######
 import streamlit as st # core package used in this project
-import pandas as pd
 import base64, random
 import time,datetime
 import pymysql
 import os
+import sys
 import socket
 import platform
-import geocoder
 import secrets
+import hashlib
 import io,random
-import plotly.express as px # to create visualisations at the admin session
-import plotly.graph_objects as go
-from geopy.geocoders import Nominatim
-# libraries used to parse the pdf files
-from pyresparser import ResumeParser
-from pdfminer3.layout import LAParams, LTTextBox
-from pdfminer3.pdfpage import PDFPage
-from pdfminer3.pdfinterp import PDFResourceManager
-from pdfminer3.pdfinterp import PDFPageInterpreter
-from pdfminer3.converter import TextConverter
+import queue
+import contextlib
 from streamlit_tags import st_tags
 from PIL import Image
+# make the shared ai-ml modules importable when launched with `streamlit run core/App.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 # pre stored data for prediction purposes
-from Courses import ds_course,web_course,android_course,ios_course,uiux_course,resume_videos,interview_videos
-import nltk
-nltk.download('stopwords')
+from modules.Courses import ds_course,web_course,android_course,ios_course,uiux_course,resume_videos,interview_videos
+# heavy packages (pandas, plotly, geopy, pyresparser, pdfminer3, nltk) are imported
+# lazily where they are used, and NLTK data is read from the local data dir
+from modules.resources import DATA_DIR, ensure_nltk_data
+from modules.sections import SECTION_WEIGHTS, segment, labels_present
+from modules.resume_classifier import load_default as load_classifier, rule_field, rule_level
+from modules.dedup import DedupIndex, signature
+from modules.text_cache import TextCache
+from modules.blob_store import BlobStore
+from modules.cooccurrence import ROLE_PROFILES, default_model as cooccurrence_model, record_resume
+from modules.resume_parser import reuse_analysis
+
+# estimated similarity from which a near-duplicate reuses the earlier upload's analysis
+DEDUP_REUSE_SIMILARITY = float(os.environ.get('ML_DEDUP_REUSE_SIMILARITY', '0.9'))
 
 
 ###### Preprocessing functions ######
@@ -43,13 +48,17 @@ def get_csv_download_link(df,filename,text):
     return href
 
 
-# Reads Pdf file and check_extractable
+# Reads Pdf file (path or binary file object) and check_extractable
 def pdf_reader(file):
+    from pdfminer3.layout import LAParams
+    from pdfminer3.pdfpage import PDFPage
+    from pdfminer3.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer3.converter import TextConverter
     resource_manager = PDFResourceManager()
     fake_file_handle = io.StringIO()
     converter = TextConverter(resource_manager, fake_file_handle, laparams=LAParams())
     page_interpreter = PDFPageInterpreter(resource_manager, converter)
-    with open(file, 'rb') as fh:
+    with (open(file, 'rb') if isinstance(file, str) else file) as fh:
         for page in PDFPage.get_pages(fh,
                                       caching=True,
                                       check_extractable=True):
@@ -63,23 +72,34 @@ def pdf_reader(file):
     return text
 
 
-# show uploaded file path to view pdf_display
-def show_pdf(file_path):
-    with open(file_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-    pdf_display = F'<iframe src="data:application/pdf;base64,{base64_pdf}" width="700" height="1000" type="application/pdf"></iframe>'
+# show the stored resume. Streamlit's PDF viewer (st.pdf, Streamlit 1.49+) serves the file
+# from its media endpoint, registered for the current session only; older versions get the
+# file inlined in an iframe as a base64 data url (a full in-memory copy, a third larger)
+def show_pdf(file_hash):
+    path = get_blob_store().path(file_hash)
+    if hasattr(st, 'pdf'):
+        st.pdf(path, height=1000)
+        return
+    with open(path, 'rb') as f:
+        src = 'data:application/pdf;base64,' + base64.b64encode(f.read()).decode('ascii')
+    pdf_display = F'<iframe src="{src}" width="700" height="1000" type="application/pdf"></iframe>'
     st.markdown(pdf_display, unsafe_allow_html=True)
 
 
 # course recommendations which has data already loaded from Courses.py
-def course_recommender(course_list):
+def course_recommender(course_list, key):
     st.subheader("**Courses & Certificates Recommendations 👨‍🎓**")
     c = 0
     rec_course = []
     ## slider to choose from range 1-10
     no_of_reco = st.slider('Choose Number of Course Recommendations:', 1, 10, 5)
-    random.shuffle(course_list)
-    for c_name, c_link in course_list:
+    ## shuffle once per resume, so moving the slider keeps the same order (and never shuffles the shared list)
+    order_key = 'course_order_' + key
+    if order_key not in st.session_state:
+        shuffled = list(course_list)
+        random.shuffle(shuffled)
+        st.session_state[order_key] = shuffled
+    for c_name, c_link in st.session_state[order_key]:
         c += 1
         st.markdown(f"({c}) [{c_name}]({c_link})")
         rec_course.append(c_name)
@@ -91,9 +111,55 @@ def course_recommender(course_list):
 ###### Database Stuffs ######
 
 
-# sql connector
-connection = pymysql.connect(host='localhost',user='root',password='root@MySQL4admin',db='cv')
-cursor = connection.cursor()
+# sql connections, pooled per server process. Every session's reruns run on their own
+# thread, so a query checks a connection out of the pool for its duration and opens its
+# own cursor on it; no connection or cursor is ever used by two sessions at once
+DB_POOL_SIZE = 4
+
+
+def connect():
+    return pymysql.connect(host='localhost',user='root',password='root@MySQL4admin',db='cv')
+
+
+@st.cache_resource
+def get_pool():
+    return queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+
+@contextlib.contextmanager
+def db_connection():
+    pool = get_pool()
+    try:
+        connection = pool.get_nowait()
+        connection.ping(reconnect=True)
+    except queue.Empty:
+        connection = connect()
+    try:
+        yield connection
+    except Exception:
+        connection.close()  # may be mid-transaction: do not hand it to the next query
+        raise
+    try:
+        pool.put_nowait(connection)
+    except queue.Full:
+        connection.close()
+
+
+# run one statement on a pooled connection with its own cursor; returns the fetched rows
+def run_sql(sql, params=None):
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        connection.commit()
+        return rows
+
+
+# a query result as a dataframe, read on a pooled connection
+def read_sql(query):
+    import pandas as pd
+    with db_connection() as connection:
+        return pd.read_sql(query, connection)
 
 
 # inserting miscellaneous data, fetched results, prediction and recommendation into user_data table
@@ -102,8 +168,7 @@ def insert_data(sec_token,ip_add,host_name,dev_user,os_name_ver,latlong,city,sta
     insert_sql = "insert into " + DB_table_name + """
     values (0,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
     rec_values = (str(sec_token),str(ip_add),host_name,dev_user,os_name_ver,str(latlong),city,state,country,act_name,act_mail,act_mob,name,email,str(res_score),timestamp,str(no_of_pages),reco_field,cand_level,skills,recommended_skills,courses,pdf_name)
-    cursor.execute(insert_sql, rec_values)
-    connection.commit()
+    run_sql(insert_sql, rec_values)
 
 
 # inserting feedback data into user_feedback table
@@ -112,53 +177,15 @@ def insertf_data(feed_name,feed_email,feed_score,comments,Timestamp):
     insertfeed_sql = "insert into " + DBf_table_name + """
     values (0,%s,%s,%s,%s,%s)"""
     rec_values = (feed_name, feed_email, feed_score, comments, Timestamp)
-    cursor.execute(insertfeed_sql, rec_values)
-    connection.commit()
-
-
-###### Setting Page Configuration (favicon, Logo, Title) ######
-
-
-st.set_page_config(
-   page_title="AI Resume Analyzer",
-   page_icon='./Logo/recommend.png',
-)
-
-
-###### Main function run() ######
-
-
-def run():
-    
-    # (Logo, Heading, Sidebar etc)
-    img = Image.open('./Logo/RESUM.png')
-    st.image(img)
-    st.sidebar.markdown("# Choose Something...")
-    activities = ["User", "Feedback", "About", "Admin"]
-    choice = st.sidebar.selectbox("Choose among the given options:", activities)
-    link = '<b>Built with 🤍 by <a href="https://dnoobnerd.netlify.app/" style="text-decoration: none; color: #021659;">Deepak Padhi</a></b>' 
-    st.sidebar.markdown(link, unsafe_allow_html=True)
-    st.sidebar.markdown('''
-        <!-- site visitors -->
-
-        <div id="sfct2xghr8ak6lfqt3kgru233378jya38dy" hidden></div>
-
-        <noscript>
-            <a href="https://www.freecounterstat.com" title="hit counter">
-                <img src="https://counter9.stat.ovh/private/freecounterstat.php?c=t2xghr8ak6lfqt3kgru233378jya38dy" border="0" title="hit counter" alt="hit counter"> -->
-            </a>
-        </noscript>
-    
-        <p>Visitors <img src="https://counter9.stat.ovh/private/freecounterstat.php?c=t2xghr8ak6lfqt3kgru233378jya38dy" title="Free Counter" Alt="web counter" width="60px"  border="0" /></p>
-    
-    ''', unsafe_allow_html=True)
-
-    ###### Creating Database and Table ######
+    run_sql(insertfeed_sql, rec_values)
 
 
+# Create the DB and tables; cached so it only runs on the first script run
+@st.cache_resource
+def create_tables():
     # Create the DB
     db_sql = """CREATE DATABASE IF NOT EXISTS CV;"""
-    cursor.execute(db_sql)
+    run_sql(db_sql)
 
 
     # Create table user_data and user_feedback
@@ -191,7 +218,7 @@ def run():
                     PRIMARY KEY (ID)
                     );
                 """
-    cursor.execute(table_sql)
+    run_sql(table_sql)
 
 
     DBf_table_name = 'user_feedback'
@@ -205,7 +232,157 @@ def run():
                         PRIMARY KEY (ID)
                     );
                 """
-    cursor.execute(tablef_sql)
+    run_sql(tablef_sql)
+    return True
+
+
+###### Cached analysis (reruns on widget changes reuse these) ######
+
+
+# visitor location does not change between reruns, so look it up at most hourly
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_location():
+    import geocoder
+    from geopy.geocoders import Nominatim
+    g = geocoder.ip('me')
+    latlong = g.latlng
+    geolocator = Nominatim(user_agent="http")
+    location = geolocator.reverse(latlong, language='en')
+    address = location.raw['address']
+    return latlong, address.get('city', ''), address.get('state', ''), address.get('country', '')
+
+
+# text layer of an uploaded pdf, once per file content
+@st.cache_data(show_spinner=False, max_entries=256)
+def extract_text(file_hash, _pdf_bytes):
+    return pdf_reader(io.BytesIO(_pdf_bytes))
+
+
+# uploads, stored once per content under their sha256 (with size/age eviction, see modules/blob_store.py)
+@st.cache_resource
+def get_blob_store():
+    return BlobStore()
+
+
+# near-duplicate index over every resume analysed so far (persisted as an append-only log)
+@st.cache_resource
+def get_dedup_index():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return DedupIndex(os.path.join(DATA_DIR, 'resume_dedup.log'))
+
+
+# the earlier upload this resume nearly duplicates (a dedup Match), if any; new resumes are
+# registered under their file hash
+def find_near_duplicate(file_hash, pdf_bytes):
+    return get_dedup_index().find_or_add(file_hash, signature(extract_text(file_hash, pdf_bytes)))
+
+
+# extracted text of every analysed resume, kept on disk for batch re-scoring (tools/rescore_resumes.py)
+@st.cache_resource
+def get_text_cache():
+    return TextCache()
+
+
+# parse a resume once per file content; _file_path is not part of the cache key
+@st.cache_data(show_spinner=False, max_entries=256)
+def analyze_resume(file_hash, _file_path):
+    from pyresparser import ResumeParser
+    ensure_nltk_data('stopwords')
+    resume_data = ResumeParser(_file_path).get_extracted_data()
+    if not resume_data:
+        return None
+    ## Get the whole resume data into resume_text (persisted so re-scoring never re-parses the pdf)
+    text_cache = get_text_cache()
+    resume_text = text_cache.get(file_hash)
+    if resume_text is None:
+        resume_text = pdf_reader(_file_path)
+        text_cache.put(file_hash, resume_text)
+    ## Split it once into labelled sections; the checks below look at section headers
+    resume_sections = labels_present(segment(resume_text))
+    return {'resume_data': resume_data, 'resume_text': resume_text, 'resume_sections': resume_sections}
+
+
+# analysis of a near-identical copy of an earlier upload without running pyresparser: skills,
+# degree and page count come from the earlier analysis, while name, email and phone are read
+# from this resume's own text (the earlier upload may be someone else's), as are the sections
+# and the text the field/level classifier sees
+@st.cache_data(show_spinner=False, max_entries=256)
+def analyze_near_duplicate(file_hash, _file_path, prior_hash, _prior_path):
+    prior = analyze_resume(prior_hash, _prior_path)
+    if not prior:
+        return analyze_resume(file_hash, _file_path)
+    text_cache = get_text_cache()
+    resume_text = text_cache.get(file_hash)
+    if resume_text is None:
+        resume_text = pdf_reader(_file_path)
+        text_cache.put(file_hash, resume_text)
+    resume_data = reuse_analysis(prior['resume_data'], resume_text)
+    resume_sections = labels_present(segment(resume_text))
+    return {'resume_data': resume_data, 'resume_text': resume_text, 'resume_sections': resume_sections}
+
+
+# trained field/level classifier (tools/train_resume_classifier.py); None falls back to the keyword rules
+@st.cache_resource
+def get_classifier():
+    return load_classifier()
+
+
+# "users with your skills also have...": co-occurrence suggestions, topped up from the field's role profile
+def suggest_skills(skills, field, top_k=15):
+    own = {s.lower() for s in skills}
+    suggested = [r['skill'] for r in cooccurrence_model().related(skills, top_k)]
+    for skill in ROLE_PROFILES.get(field, []):
+        if len(suggested) >= top_k:
+            break
+        if skill.lower() not in own and skill not in suggested:
+            suggested.append(skill)
+    return suggested
+
+
+@st.cache_resource
+def load_logo():
+    return Image.open('./Logo/RESUM.png')
+
+
+###### Setting Page Configuration (favicon, Logo, Title) ######
+
+
+st.set_page_config(
+   page_title="AI Resume Analyzer",
+   page_icon='./Logo/recommend.png',
+)
+
+
+###### Main function run() ######
+
+
+def run():
+    
+    # (Logo, Heading, Sidebar etc)
+    img = load_logo()
+    st.image(img)
+    st.sidebar.markdown("# Choose Something...")
+    activities = ["User", "Feedback", "About", "Admin"]
+    choice = st.sidebar.selectbox("Choose among the given options:", activities)
+    link = '<b>Built with 🤍 by <a href="https://dnoobnerd.netlify.app/" style="text-decoration: none; color: #021659;">Deepak Padhi</a></b>' 
+    st.sidebar.markdown(link, unsafe_allow_html=True)
+    st.sidebar.markdown('''
+        <!-- site visitors -->
+
+        <div id="sfct2xghr8ak6lfqt3kgru233378jya38dy" hidden></div>
+
+        <noscript>
+            <a href="https://www.freecounterstat.com" title="hit counter">
+                <img src="https://counter9.stat.ovh/private/freecounterstat.php?c=t2xghr8ak6lfqt3kgru233378jya38dy" border="0" title="hit counter" alt="hit counter"> -->
+            </a>
+        </noscript>
+    
+        <p>Visitors <img src="https://counter9.stat.ovh/private/freecounterstat.php?c=t2xghr8ak6lfqt3kgru233378jya38dy" title="Free Counter" Alt="web counter" width="60px"  border="0" /></p>
+    
+    ''', unsafe_allow_html=True)
+
+    ###### Creating Database and Table (once per server process) ######
+    create_tables()
 
 
     ###### CODE FOR CLIENT SIDE (USER) ######
@@ -221,17 +398,7 @@ def run():
         ip_add = socket.gethostbyname(host_name)
         dev_user = os.getlogin()
         os_name_ver = platform.system() + " " + platform.release()
-        g = geocoder.ip('me')
-        latlong = g.latlng
-        geolocator = Nominatim(user_agent="http")
-        location = geolocator.reverse(latlong, language='en')
-        address = location.raw['address']
-        cityy = address.get('city', '')
-        statee = address.get('state', '')
-        countryy = address.get('country', '')  
-        city = cityy
-        state = statee
-        country = countryy
+        latlong, city, state, country = get_location()
 
 
         # Upload Resume
@@ -240,22 +407,40 @@ def run():
         ## file upload in pdf format
         pdf_file = st.file_uploader("Choose your Resume", type=["pdf"])
         if pdf_file is not None:
-            with st.spinner('Hang On While We Cook Magic For You...'):
-                time.sleep(4)
+            ### everything below is keyed by the file content, so widget reruns skip the work
+            file_hash = hashlib.sha256(pdf_file.getbuffer()).hexdigest()
+            analysed = st.session_state.setdefault('analysed_files', set())
+            first_run = file_hash not in analysed
+            if first_run:
+                with st.spinner('Hang On While We Cook Magic For You...'):
+                    time.sleep(4)
+
+            ### near-duplicate check on the text layer: near-identical copies reuse the earlier
+            ### analysis (below) and are kept out of the co-occurrence counts
+            if 'dup_' + file_hash not in st.session_state:
+                st.session_state['dup_' + file_hash] = find_near_duplicate(file_hash, pdf_file.getvalue())
+            match = st.session_state['dup_' + file_hash]
+            duplicate = match is not None
         
-            ### saving the uploaded resume to folder
-            save_image_path = './Uploaded_Resumes/'+pdf_file.name
+            ### storing the uploaded resume by content hash (identical files are stored once);
+            ### the user always sees their own upload and its analysis
             pdf_name = pdf_file.name
-            with open(save_image_path, "wb") as f:
-                f.write(pdf_file.getbuffer())
-            show_pdf(save_image_path)
+            blob_store = get_blob_store()
+            if first_run or file_hash not in blob_store:
+                blob_store.put(pdf_file.getbuffer(), pdf_name)
+                blob_store.enforce(keep=file_hash)
+            save_image_path = blob_store.path(file_hash)
+            show_pdf(file_hash)
 
             ### parsing and extracting whole resume 
-            resume_data = ResumeParser(save_image_path).get_extracted_data()
-            if resume_data:
-                
-                ## Get the whole resume data into resume_text
-                resume_text = pdf_reader(save_image_path)
+            if duplicate and match.similarity >= DEDUP_REUSE_SIMILARITY and match.ref in blob_store:
+                analysis = analyze_near_duplicate(file_hash, save_image_path, match.ref, blob_store.path(match.ref))
+            else:
+                analysis = analyze_resume(file_hash, save_image_path)
+            if analysis:
+                resume_data = analysis['resume_data']
+                resume_text = analysis['resume_text']
+                resume_sections = analysis['resume_sections']
 
                 ## Showing Analyzed data from (resume_data)
                 st.header("**Resume Analysis 🤘**")
@@ -272,41 +457,22 @@ def run():
                     pass
                 ## Predicting Candidate Experience Level 
 
-                ### Trying with different possibilities
+                ### Learned classifier when a trained model is present, otherwise the section rules
+                ### (internship -> Intermediate, work experience -> Experienced, else Fresher)
+                classifier = get_classifier()
+                prediction = classifier.classify(resume_text, resume_data['skills'] or [], resume_sections) if classifier else None
                 cand_level = ''
                 if resume_data['no_of_pages'] < 1:                
                     cand_level = "NA"
                     st.markdown( '''<h4 style='text-align: left; color: #d73b5c;'>You are at Fresher level!</h4>''',unsafe_allow_html=True)
-                
-                #### if internship then intermediate level
-                elif 'INTERNSHIP' in resume_text:
-                    cand_level = "Intermediate"
-                    st.markdown('''<h4 style='text-align: left; color: #1ed760;'>You are at intermediate level!</h4>''',unsafe_allow_html=True)
-                elif 'INTERNSHIPS' in resume_text:
-                    cand_level = "Intermediate"
-                    st.markdown('''<h4 style='text-align: left; color: #1ed760;'>You are at intermediate level!</h4>''',unsafe_allow_html=True)
-                elif 'Internship' in resume_text:
-                    cand_level = "Intermediate"
-                    st.markdown('''<h4 style='text-align: left; color: #1ed760;'>You are at intermediate level!</h4>''',unsafe_allow_html=True)
-                elif 'Internships' in resume_text:
-                    cand_level = "Intermediate"
+                else:
+                    cand_level = prediction['level'] if prediction else rule_level(resume_sections)
+
+                if cand_level == "Intermediate":
                     st.markdown('''<h4 style='text-align: left; color: #1ed760;'>You are at intermediate level!</h4>''',unsafe_allow_html=True)
-                
-                #### if Work Experience/Experience then Experience level
-                elif 'EXPERIENCE' in resume_text:
-                    cand_level = "Experienced"
+                elif cand_level == "Experienced":
                     st.markdown('''<h4 style='text-align: left; color: #fba171;'>You are at experience level!''',unsafe_allow_html=True)
-                elif 'WORK EXPERIENCE' in resume_text:
-                    cand_level = "Experienced"
-                    st.markdown('''<h4 style='text-align: left; color: #fba171;'>You are at experience level!''',unsafe_allow_html=True)
-                elif 'Experience' in resume_text:
-                    cand_level = "Experienced"
-                    st.markdown('''<h4 style='text-align: left; color: #fba171;'>You are at experience level!''',unsafe_allow_html=True)
-                elif 'Work Experience' in resume_text:
-                    cand_level = "Experienced"
-                    st.markdown('''<h4 style='text-align: left; color: #fba171;'>You are at experience level!''',unsafe_allow_html=True)
-                else:
-                    cand_level = "Fresher"
+                elif cand_level == "Fresher":
                     st.markdown('''<h4 style='text-align: left; color: #fba171;'>You are at Fresher level!!''',unsafe_allow_html=True)
 
 
@@ -317,98 +483,72 @@ def run():
                 keywords = st_tags(label='### Your Current Skills',
                 text='See our skills recommendation below',value=resume_data['skills'],key = '1  ')
 
-                ### Keywords for Recommendations
-                ds_keyword = ['tensorflow','keras','pytorch','machine learning','deep Learning','flask','streamlit']
-                web_keyword = ['react', 'django', 'node jS', 'react js', 'php', 'laravel', 'magento', 'wordpress','javascript', 'angular js', 'C#', 'Asp.net', 'flask']
-                android_keyword = ['android','android development','flutter','kotlin','xml','kivy']
-                ios_keyword = ['ios','ios development','swift','cocoa','cocoa touch','xcode']
-                uiux_keyword = ['ux','adobe xd','figma','zeplin','balsamiq','ui','prototyping','wireframes','storyframes','adobe photoshop','photoshop','editing','adobe illustrator','illustrator','adobe after effects','after effects','adobe premier pro','premier pro','adobe indesign','indesign','wireframe','solid','grasp','user research','user experience']
-                n_any = ['english','communication','writing', 'microsoft office', 'leadership','customer management', 'social media']
                 ### Skill Recommendations Starts                
                 recommended_skills = []
-                reco_field = ''
                 rec_course = ''
 
-                ### condition starts to check skills from keywords and predict field
-                for i in resume_data['skills']:
-                
-                    #### Data science recommendation
-                    if i.lower() in ds_keyword:
-                        print(i.lower())
-                        reco_field = 'Data Science'
-                        st.success("** Our analysis says you are looking for Data Science Jobs.**")
-                        recommended_skills = ['Data Visualization','Predictive Analysis','Statistical Modeling','Data Mining','Clustering & Classification','Data Analytics','Quantitative Analysis','Web Scraping','ML Algorithms','Keras','Pytorch','Probability','Scikit-learn','Tensorflow',"Flask",'Streamlit']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Recommended skills generated from System',value=recommended_skills,key = '2')
-                        st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = course_recommender(ds_course)
-                        break
-
-                    #### Web development recommendation
-                    elif i.lower() in web_keyword:
-                        print(i.lower())
-                        reco_field = 'Web Development'
-                        st.success("** Our analysis says you are looking for Web Development Jobs **")
-                        recommended_skills = ['React','Django','Node JS','React JS','php','laravel','Magento','wordpress','Javascript','Angular JS','c#','Flask','SDK']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Recommended skills generated from System',value=recommended_skills,key = '3')
-                        st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = course_recommender(web_course)
-                        break
-
-                    #### Android App Development
-                    elif i.lower() in android_keyword:
-                        print(i.lower())
-                        reco_field = 'Android Development'
-                        st.success("** Our analysis says you are looking for Android App Development Jobs **")
-                        recommended_skills = ['Android','Android development','Flutter','Kotlin','XML','Java','Kivy','GIT','SDK','SQLite']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Recommended skills generated from System',value=recommended_skills,key = '4')
-                        st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = course_recommender(android_course)
-                        break
-
-                    #### IOS App Development
-                    elif i.lower() in ios_keyword:
-                        print(i.lower())
-                        reco_field = 'IOS Development'
-                        st.success("** Our analysis says you are looking for IOS App Development Jobs **")
-                        recommended_skills = ['IOS','IOS Development','Swift','Cocoa','Cocoa Touch','Xcode','Objective-C','SQLite','Plist','StoreKit',"UI-Kit",'AV Foundation','Auto-Layout']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Recommended skills generated from System',value=recommended_skills,key = '5')
-                        st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = course_recommender(ios_course)
-                        break
-
-                    #### Ui-UX Recommendation
-                    elif i.lower() in uiux_keyword:
-                        print(i.lower())
-                        reco_field = 'UI-UX Development'
-                        st.success("** Our analysis says you are looking for UI-UX Development Jobs **")
-                        recommended_skills = ['UI','User Experience','Adobe XD','Figma','Zeplin','Balsamiq','Prototyping','Wireframes','Storyframes','Adobe Photoshop','Editing','Illustrator','After Effects','Premier Pro','Indesign','Wireframe','Solid','Grasp','User Research']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Recommended skills generated from System',value=recommended_skills,key = '6')
-                        st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = course_recommender(uiux_course)
-                        break
-
-                    #### For Not Any Recommendations
-                    elif i.lower() in n_any:
-                        print(i.lower())
-                        reco_field = 'NA'
-                        st.warning("** Currently our tool only predicts and recommends for Data Science, Web, Android, IOS and UI/UX Development**")
-                        recommended_skills = ['No Recommendations']
-                        recommended_keywords = st_tags(label='### Recommended skills for you.',
-                        text='Currently No Recommendations',value=recommended_skills,key = '6')
-                        st.markdown('''<h5 style='text-align: left; color: #092851;'>Maybe Available in Future Updates</h5>''',unsafe_allow_html=True)
-                        # course recommendation
-                        rec_course = "Sorry! Not Available for this Field"
-                        break
+                ### predict the field: learned classifier if trained, else the first skill found in a keyword list
+                reco_field = prediction['field'] if prediction else rule_field(resume_data['skills'] or [])
+
+                #### Data science recommendation
+                if reco_field == 'Data Science':
+                    st.success("** Our analysis says you are looking for Data Science Jobs.**")
+                    recommended_skills = suggest_skills(resume_data['skills'] or [], reco_field)
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Recommended skills generated from System',value=recommended_skills,key = '2')
+                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = course_recommender(ds_course, file_hash)
+
+                #### Web development recommendation
+                elif reco_field == 'Web Development':
+                    st.success("** Our analysis says you are looking for Web Development Jobs **")
+                    recommended_skills = suggest_skills(resume_data['skills'] or [], reco_field)
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Recommended skills generated from System',value=recommended_skills,key = '3')
+                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = course_recommender(web_course, file_hash)
+
+                #### Android App Development
+                elif reco_field == 'Android Development':
+                    st.success("** Our analysis says you are looking for Android App Development Jobs **")
+                    recommended_skills = suggest_skills(resume_data['skills'] or [], reco_field)
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Recommended skills generated from System',value=recommended_skills,key = '4')
+                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = course_recommender(android_course, file_hash)
+
+                #### IOS App Development
+                elif reco_field == 'IOS Development':
+                    st.success("** Our analysis says you are looking for IOS App Development Jobs **")
+                    recommended_skills = suggest_skills(resume_data['skills'] or [], reco_field)
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Recommended skills generated from System',value=recommended_skills,key = '5')
+                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = course_recommender(ios_course, file_hash)
+
+                #### Ui-UX Recommendation
+                elif reco_field == 'UI-UX Development':
+                    st.success("** Our analysis says you are looking for UI-UX Development Jobs **")
+                    recommended_skills = suggest_skills(resume_data['skills'] or [], reco_field)
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Recommended skills generated from System',value=recommended_skills,key = '6')
+                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>Adding this skills to resume will boost🚀 the chances of getting a Job💼</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = course_recommender(uiux_course, file_hash)
+
+                #### For Not Any Recommendations
+                elif reco_field == 'NA':
+                    st.warning("** Currently our tool only predicts and recommends for Data Science, Web, Android, IOS and UI/UX Development**")
+                    recommended_skills = ['No Recommendations']
+                    recommended_keywords = st_tags(label='### Recommended skills for you.',
+                    text='Currently No Recommendations',value=recommended_skills,key = '6')
+                    st.markdown('''<h5 style='text-align: left; color: #092851;'>Maybe Available in Future Updates</h5>''',unsafe_allow_html=True)
+                    # course recommendation
+                    rec_course = "Sorry! Not Available for this Field"
 
 
                 ## Resume Scorer & Resume Writing Tips
@@ -416,107 +556,62 @@ def run():
                 resume_score = 0
                 
                 ### Predicting Whether these key points are added to the resume
-                if 'Objective' or 'Summary' in resume_text:
-                    resume_score = resume_score+6
+                if 'summary' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['summary']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Objective/Summary</h4>''',unsafe_allow_html=True)                
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add your career objective, it will give your career intension to the Recruiters.</h4>''',unsafe_allow_html=True)
 
-                if 'Education' or 'School' or 'College'  in resume_text:
-                    resume_score = resume_score + 12
+                if 'education' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['education']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Education Details</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Education. It will give Your Qualification level to the recruiter</h4>''',unsafe_allow_html=True)
 
-                if 'EXPERIENCE' in resume_text:
-                    resume_score = resume_score + 16
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Experience</h4>''',unsafe_allow_html=True)
-                elif 'Experience' in resume_text:
-                    resume_score = resume_score + 16
+                if 'experience' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['experience']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Experience</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Experience. It will help you to stand out from crowd</h4>''',unsafe_allow_html=True)
 
-                if 'INTERNSHIPS'  in resume_text:
-                    resume_score = resume_score + 6
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Internships</h4>''',unsafe_allow_html=True)
-                elif 'INTERNSHIP'  in resume_text:
-                    resume_score = resume_score + 6
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Internships</h4>''',unsafe_allow_html=True)
-                elif 'Internships'  in resume_text:
-                    resume_score = resume_score + 6
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Internships</h4>''',unsafe_allow_html=True)
-                elif 'Internship'  in resume_text:
-                    resume_score = resume_score + 6
+                if 'internships' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['internships']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Internships</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Internships. It will help you to stand out from crowd</h4>''',unsafe_allow_html=True)
 
-                if 'SKILLS'  in resume_text:
-                    resume_score = resume_score + 7
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Skills</h4>''',unsafe_allow_html=True)
-                elif 'SKILL'  in resume_text:
-                    resume_score = resume_score + 7
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Skills</h4>''',unsafe_allow_html=True)
-                elif 'Skills'  in resume_text:
-                    resume_score = resume_score + 7
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Skills</h4>''',unsafe_allow_html=True)
-                elif 'Skill'  in resume_text:
-                    resume_score = resume_score + 7
+                if 'skills' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['skills']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added Skills</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Skills. It will help you a lot</h4>''',unsafe_allow_html=True)
 
-                if 'HOBBIES' in resume_text:
-                    resume_score = resume_score + 4
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Hobbies</h4>''',unsafe_allow_html=True)
-                elif 'Hobbies' in resume_text:
-                    resume_score = resume_score + 4
+                if 'hobbies' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['hobbies']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Hobbies</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Hobbies. It will show your personality to the Recruiters and give the assurance that you are fit for this role or not.</h4>''',unsafe_allow_html=True)
 
-                if 'INTERESTS'in resume_text:
-                    resume_score = resume_score + 5
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Interest</h4>''',unsafe_allow_html=True)
-                elif 'Interests'in resume_text:
-                    resume_score = resume_score + 5
+                if 'interests' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['interests']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Interest</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Interest. It will show your interest other that job.</h4>''',unsafe_allow_html=True)
 
-                if 'ACHIEVEMENTS' in resume_text:
-                    resume_score = resume_score + 13
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Achievements </h4>''',unsafe_allow_html=True)
-                elif 'Achievements' in resume_text:
-                    resume_score = resume_score + 13
+                if 'achievements' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['achievements']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Achievements </h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Achievements. It will show that you are capable for the required position.</h4>''',unsafe_allow_html=True)
 
-                if 'CERTIFICATIONS' in resume_text:
-                    resume_score = resume_score + 12
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Certifications </h4>''',unsafe_allow_html=True)
-                elif 'Certifications' in resume_text:
-                    resume_score = resume_score + 12
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Certifications </h4>''',unsafe_allow_html=True)
-                elif 'Certification' in resume_text:
-                    resume_score = resume_score + 12
+                if 'certifications' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['certifications']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Certifications </h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Certifications. It will show that you have done some specialization for the required position.</h4>''',unsafe_allow_html=True)
 
-                if 'PROJECTS' in resume_text:
-                    resume_score = resume_score + 19
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Projects</h4>''',unsafe_allow_html=True)
-                elif 'PROJECT' in resume_text:
-                    resume_score = resume_score + 19
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Projects</h4>''',unsafe_allow_html=True)
-                elif 'Projects' in resume_text:
-                    resume_score = resume_score + 19
-                    st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Projects</h4>''',unsafe_allow_html=True)
-                elif 'Project' in resume_text:
-                    resume_score = resume_score + 19
+                if 'projects' in resume_sections:
+                    resume_score = resume_score + SECTION_WEIGHTS['projects']
                     st.markdown('''<h5 style='text-align: left; color: #1ed760;'>[+] Awesome! You have added your Projects</h4>''',unsafe_allow_html=True)
                 else:
                     st.markdown('''<h5 style='text-align: left; color: #000000;'>[-] Please add Projects. It will show that you have done work related the required position or not.</h4>''',unsafe_allow_html=True)
@@ -536,10 +631,15 @@ def run():
                 ### Score Bar
                 my_bar = st.progress(0)
                 score = 0
-                for percent_complete in range(resume_score):
-                    score +=1
-                    time.sleep(0.1)
-                    my_bar.progress(percent_complete + 1)
+                if first_run:
+                    for percent_complete in range(resume_score):
+                        score +=1
+                        time.sleep(0.1)
+                        my_bar.progress(percent_complete + 1)
+                else:
+                    ## already animated once for this resume
+                    score = resume_score
+                    my_bar.progress(resume_score)
 
                 ### Score
                 st.success('** Your Resume Writing Score: ' + str(score)+'**')
@@ -555,21 +655,27 @@ def run():
                 timestamp = str(cur_date+'_'+cur_time)
 
 
-                ## Calling insert_data to add all the data into user_data                
-                insert_data(str(sec_token), str(ip_add), (host_name), (dev_user), (os_name_ver), (latlong), (city), (state), (country), (act_name), (act_mail), (act_mob), resume_data['name'], resume_data['email'], str(resume_score), timestamp, str(resume_data['no_of_pages']), reco_field, cand_level, str(resume_data['skills']), str(recommended_skills), str(rec_course), pdf_name)
+                ## Calling insert_data to add all the data into user_data (once per resume per session)
+                if first_run:
+                    ## new resumes also feed the skill co-occurrence model behind suggest_skills
+                    if not duplicate:
+                        record_resume(resume_data['skills'] or [])
+                    insert_data(str(sec_token), str(ip_add), (host_name), (dev_user), (os_name_ver), (latlong), (city), (state), (country), (act_name), (act_mail), (act_mob), resume_data['name'], resume_data['email'], str(resume_score), timestamp, str(resume_data['no_of_pages']), reco_field, cand_level, str(resume_data['skills']), str(recommended_skills), str(rec_course), pdf_name)
+                analysed.add(file_hash)
 
                 ## Recommending Resume Writing Video
                 st.header("**Bonus Video for Resume Writing Tips💡**")
-                resume_vid = random.choice(resume_videos)
+                resume_vid = st.session_state.setdefault('resume_vid_' + file_hash, random.choice(resume_videos))
                 st.video(resume_vid)
 
                 ## Recommending Interview Preparation Video
                 st.header("**Bonus Video for Interview Tips💡**")
-                interview_vid = random.choice(interview_videos)
+                interview_vid = st.session_state.setdefault('interview_vid_' + file_hash, random.choice(interview_videos))
                 st.video(interview_vid)
 
                 ## On Successful Result 
-                st.balloons()
+                if first_run:
+                    st.balloons()
 
             else:
                 st.error('Something went wrong..')                
@@ -577,6 +683,8 @@ def run():
 
     ###### CODE FOR FEEDBACK SIDE ######
     elif choice == 'Feedback':   
+        import pandas as pd
+        import plotly.express as px # to create visualisations
         
         # timestamp 
         ts = time.time()
@@ -604,7 +712,7 @@ def run():
 
         # query to fetch data from user feedback table
         query = 'select * from user_feedback'        
-        plotfeed_data = pd.read_sql(query, connection)                        
+        plotfeed_data = read_sql(query)                        
 
 
         # fetching feed_score from the query and getting the unique values and total value count 
@@ -619,8 +727,7 @@ def run():
 
 
         #  Fetching Comment History
-        cursor.execute('select feed_name, comments from user_feedback')
-        plfeed_cmt_data = cursor.fetchall()
+        plfeed_cmt_data = run_sql('select feed_name, comments from user_feedback')
 
         st.subheader("**User Comment's**")
         dff = pd.DataFrame(plfeed_cmt_data, columns=['User', 'Comment'])
@@ -671,10 +778,11 @@ def run():
             
             ## Credentials 
             if ad_user == 'admin' and ad_password == 'admin@resume-analyzer':
+                import pandas as pd
+                import plotly.express as px # to create visualisations
                 
                 ### Fetch miscellaneous data from user_data(table) and convert it into dataframe
-                cursor.execute('''SELECT ID, ip_add, resume_score, convert(Predicted_Field using utf8), convert(User_level using utf8), city, state, country from user_data''')
-                datanalys = cursor.fetchall()
+                datanalys = run_sql('''SELECT ID, ip_add, resume_score, convert(Predicted_Field using utf8), convert(User_level using utf8), city, state, country from user_data''')
                 plot_data = pd.DataFrame(datanalys, columns=['Idt', 'IP_add', 'resume_score', 'Predicted_Field', 'User_Level', 'City', 'State', 'Country'])
                 
                 ### Total Users Count with a Welcome Message
@@ -682,8 +790,7 @@ def run():
                 st.success("Welcome Deepak ! Total %d " % values + " User's Have Used Our Tool : )")                
                 
                 ### Fetch user data from user_data(table) and convert it into dataframe
-                cursor.execute('''SELECT ID, sec_token, ip_add, act_name, act_mail, act_mob, convert(Predicted_Field using utf8), Timestamp, Name, Email_ID, resume_score, Page_no, pdf_name, convert(User_level using utf8), convert(Actual_skills using utf8), convert(Recommended_skills using utf8), convert(Recommended_courses using utf8), city, state, country, latlong, os_name_ver, host_name, dev_user from user_data''')
-                data = cursor.fetchall()                
+                data = run_sql('''SELECT ID, sec_token, ip_add, act_name, act_mail, act_mob, convert(Predicted_Field using utf8), Timestamp, Name, Email_ID, resume_score, Page_no, pdf_name, convert(User_level using utf8), convert(Actual_skills using utf8), convert(Recommended_skills using utf8), convert(Recommended_courses using utf8), city, state, country, latlong, os_name_ver, host_name, dev_user from user_data''')
 
                 st.header("**User's Data**")
                 df = pd.DataFrame(data, columns=['ID', 'Token', 'IP Address', 'Name', 'Mail', 'Mobile Number', 'Predicted Field', 'Timestamp',
@@ -698,8 +805,7 @@ def run():
                 st.markdown(get_csv_download_link(df,'User_Data.csv','Download Report'), unsafe_allow_html=True)
 
                 ### Fetch feedback data from user_feedback(table) and convert it into dataframe
-                cursor.execute('''SELECT * from user_feedback''')
-                data = cursor.fetchall()
+                data = run_sql('''SELECT * from user_feedback''')
 
                 st.header("**User's Feedback Data**")
                 df = pd.DataFrame(data, columns=['ID', 'Name', 'Email', 'Feedback Score', 'Comments', 'Timestamp'])
@@ -707,7 +813,7 @@ def run():
 
                 ### query to fetch data from user_feedback(table)
                 query = 'select * from user_feedback'
-                plotfeed_data = pd.read_sql(query, connection)                        
+                plotfeed_data = read_sql(query)                        
 
                 ### Analyzing All the Data's in pie charts
 
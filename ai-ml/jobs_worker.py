@@ -0,0 +1,37 @@
+"""Standalone job workers for the ML service.
+
+Drains the queue behind /api/jobs (modules/jobs.py) with a pool of worker processes.
+Use it when the API runs pre-forked (prefork.py) with ML_JOB_WORKERS=0, so there is one
+worker pool per host instead of one per API worker.
+
+    ML_JOB_WORKERS=0 python prefork.py --workers 8
+    python jobs_worker.py --workers 4
+"""
+import argparse
+import signal
+import sys
+import threading
+
+from modules.jobs import JOBS_DB, JobStore, WorkerPool
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Run ML service job workers')
+    ap.add_argument('--workers', type=int, default=2)
+    ap.add_argument('--db', default=JOBS_DB)
+    args = ap.parse_args()
+
+    pool = WorkerPool(args.db, max(1, args.workers)).start()
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    print(f'{args.workers} job workers on {args.db}', flush=True)
+    store = JobStore(args.db)
+    while not stopped.wait(30):
+        print(f'jobs {store.stats()} pool {pool.snapshot()}', flush=True)
+    pool.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,66 +1,543 @@
-from fastapi import FastAPI, HTTPException
+import os
+import hmac
+import time
+import hashlib
+import tempfile
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 from modules.roadmap_generator import generate_roadmap
-from modules.resume_parser import parse_resume
+from modules.resume_parser import (DEFAULT_SKILLS, ChunkCache, _extract_skills, extract_text_generic, parse_resume_text,
+                                   reuse_analysis)
 from modules.skill_gap_analyzer import analyze_skill_gap
 from modules.recommendation_engine import get_recommendations
+from modules.ndjson import LineTooLong, dumps_line, iter_records, map_ordered
+from modules.candidate_index import SharedCandidateIndex
+from modules.dedup import DedupIndex, signature
+from modules import cooccurrence
+from modules import autocomplete
+from modules.admission import AdmissionController, AdmissionMiddleware
+from modules.body_limit import BodyLimitMiddleware
+from modules.deadline import PARSE_DEADLINE_MS, ArrivalMiddleware, Deadline
+from modules.serialization import encode
+from modules.singleflight import SingleFlight, canonical_key
+from modules import rpc
+from modules.rpc import RpcServer
+from modules.jobs import DONE, FAILED, JOB_WORKERS, JobStore, UnknownJobKind, WorkerPool
+from modules import profiler
+from modules import leader
 
 app = FastAPI(title="NexStepAI ML Service")
 
+STREAM_CONCURRENCY = int(os.environ.get("ML_STREAM_CONCURRENCY", "4"))
+STREAM_MAX_LINE_BYTES = int(os.environ.get("ML_STREAM_MAX_LINE_BYTES", str(2 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.environ.get("ML_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY_BYTES = 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+UPLOAD_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
+DEDUP_INDEX_PATH = os.environ.get("ML_DEDUP_INDEX_PATH")
+ANALYSIS_CACHE_SIZE = int(os.environ.get("ML_ANALYSIS_CACHE_SIZE", "4096"))
+# Estimated similarity from which a near-duplicate reuses the earlier resume's analysis
+DEDUP_REUSE_SIMILARITY = float(os.environ.get("ML_DEDUP_REUSE_SIMILARITY", "0.9"))
+# Binary msgpack transport for the Node backend (see modules/rpc.py); off unless configured
+RPC_SOCKET = os.environ.get("ML_RPC_SOCKET")
+RPC_HOST = os.environ.get("ML_RPC_HOST", "127.0.0.1")
+RPC_PORT = os.environ.get("ML_RPC_PORT")
+# Longest a GET /api/jobs/{id}?wait= long-poll may hold the connection
+JOB_MAX_WAIT = float(os.environ.get("ML_JOB_MAX_WAIT", "25"))
+# Debug endpoints are disabled unless an admin token is configured
+ADMIN_TOKEN = os.environ.get("ML_ADMIN_TOKEN")
+
+# Every worker searches the same candidates: adds and removes go through a shared
+# SQLite store that each worker's in-memory index catches up with (see modules/candidate_index.py)
+candidate_index = SharedCandidateIndex()
+
+# Near-duplicate resumes (MinHash LSH over the extracted text) are reported as such;
+# only byte-identical text reuses an analysis from the bounded analysis cache
+dedup_index = DedupIndex(DEDUP_INDEX_PATH)
+analysis_cache = OrderedDict()
+analysis_cache_lock = threading.Lock()
+dedup_stats = {"parsed": 0, "reused": 0, "reused_near": 0}
+# Edited re-uploads only re-extract the paragraphs that changed (see modules/resume_parser.py)
+chunk_cache = ChunkCache()
+
+# Per-client rate limits and heavy/light concurrency classes (see modules/admission.py);
+# opt-in with ML_ADMISSION=1, keyed on the end user a trusted caller forwards
+ADMISSION_ENABLED = os.environ.get("ML_ADMISSION", "0") == "1"
+admission = AdmissionController()
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# Upload bodies are capped before FastAPI parses the multipart form (see modules/body_limit.py);
+# the allowance over UPLOAD_MAX_BYTES covers the multipart framing and form fields
+app.add_middleware(BodyLimitMiddleware, max_bytes=UPLOAD_MAX_BYTES + UPLOAD_CHUNK_BYTES,
+                   paths=("/api/parse-resume/upload", "/api/jobs/upload"))
+# Added last, so it runs first: parse deadlines count from arrival, before any queueing
+app.add_middleware(ArrivalMiddleware)
+
+# Identical concurrent roadmap/gap/recommendation requests share one computation
+coalescer = SingleFlight()
+
 class RoadmapRequest(BaseModel):
-    goal: str
-    skill_level: str
-    time_available: str
+    goal: str = ""
+    skill_level: Optional[str] = None
+    time_available: Optional[str] = None
     current_skills: list = []
+    # skills the roadmap should lead to; when empty, the skills named in the goal
+    target_skills: list = []
 
 class ResumeRequest(BaseModel):
     resume_text: str
+    candidate_id: Optional[str] = None
 
 class SkillGapRequest(BaseModel):
     current_skills: list
     target_skills: list
+    user_id: Optional[str] = None
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: dict = {}
+    priority: int = 0
+    max_attempts: Optional[int] = None
+
+class CandidateSearchRequest(BaseModel):
+    job_description: str
+    top_k: int = 10
+    required_skills: list = []
+
+@app.on_event("startup")
+def elect_leader():
+    # taken once at startup, so shutdown order cannot hand the lock to another worker
+    leader.acquire()
+
+@app.on_event("shutdown")
+def close_indexes():
+    dedup_index.close()
+    cooccurrence.snapshot()
+
+def _respond(http_request: Request, payload, status_code: int = 200) -> Response:
+    # Handlers return plain dicts, so skip jsonable_encoder and encode/compress directly
+    body, headers = encode(
+        payload,
+        http_request.headers.get("accept", ""),
+        http_request.headers.get("accept-encoding", ""),
+    )
+    return Response(content=body, status_code=status_code, headers=headers)
+
+def _body_key(route: str, request: BaseModel) -> str:
+    dump = getattr(request, "model_dump", None) or request.dict
+    return canonical_key(route, dump())
+
+def _index_candidate(candidate_id, text, details):
+    # Parsed resumes with an id are added to the search index as they come in
+    if candidate_id:
+        candidate_index.add(candidate_id, text, details["skills"])
+
+def _request_deadline(http_request: Request) -> Deadline:
+    # X-Deadline-Ms is the client's total budget, counted from arrival (before queueing)
+    header = http_request.headers.get("x-deadline-ms", "")
+    ms = float(header) if header.replace(".", "", 1).isdigit() else PARSE_DEADLINE_MS
+    return Deadline.from_ms(ms, getattr(http_request.state, "arrived", None))
+
+def _cache_analysis(ref, details, counter):
+    with analysis_cache_lock:
+        analysis_cache[ref] = details
+        while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+            analysis_cache.popitem(last=False)
+        dedup_stats[counter] += 1
+
+def _parse_deduplicated(text, ext=".txt", deadline=None):
+    """Parse a resume, reusing the analysis of an identical one; returns (details, match).
+
+    ``match`` is the near-duplicate found in the dedup index, if any. From
+    DEDUP_REUSE_SIMILARITY up (the same resume renamed, reformatted or with other
+    contact details) its cached analysis is reused for the content fields, while
+    name, email and phone are always extracted from this text (see
+    resume_parser.reuse_analysis). A less similar match, such as an edited
+    re-upload, is parsed again; the paragraph cache keeps that cheap by only
+    extracting from the paragraphs that changed.
+
+    A result degraded by the deadline anywhere in the request (OCR or extraction before
+    the parse, or a stage inside it) is not cached, indexed for dedup or counted in the
+    co-occurrence model, so the next request for the same resume gets a full analysis.
+    """
+    deadline = deadline or Deadline()
+    ref = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    match = sig = None
+    if deadline.allows("dedup", len(text) / 1000):
+        with deadline.timed("dedup", len(text) / 1000):
+            sig = signature(text)
+            match = dedup_index.query(sig)
+    with analysis_cache_lock:
+        details = analysis_cache.get(ref)
+        if details is not None:
+            analysis_cache.move_to_end(ref)
+            dedup_stats["reused"] += 1
+            return details, match
+        prior = analysis_cache.get(match.ref) if match and match.similarity >= DEDUP_REUSE_SIMILARITY else None
+    if prior is not None:
+        details = reuse_analysis(prior, text)
+        if not deadline.skipped:
+            _cache_analysis(ref, details, "reused_near")
+        return details, match
+    details = parse_resume_text(text, None, None, ext, deadline, chunk_cache)
+    if deadline.skipped:
+        return details, match
+    if match is None:
+        # a concurrent upload of the same resume may have been indexed since the query
+        match = dedup_index.find_or_add(ref, sig)
+        if match is None:
+            # only distinct resumes feed the skill co-occurrence model
+            cooccurrence.record_resume(details["skills"])
+    _cache_analysis(ref, details, "parsed")
+    return details, match
+
+def _parse_result(details, match, deadline=None):
+    result = {"skills": details, "skipped_stages": list(deadline.skipped) if deadline else []}
+    if match:
+        result["duplicate_of"] = match._asdict()
+    return result
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to NexStepAI ML Service"}
 
 @app.post("/api/roadmap")
-def create_roadmap(request: RoadmapRequest):
+async def create_roadmap(request: RoadmapRequest, http_request: Request):
     try:
-        roadmap = generate_roadmap(
-            request.goal, 
-            request.skill_level, 
-            request.time_available,
-            request.current_skills
+        target_skills = request.target_skills or _extract_skills(request.goal, DEFAULT_SKILLS, use_nlp=False)
+        roadmap = await coalescer.do(
+            _body_key("roadmap", request),
+            generate_roadmap,
+            request.current_skills,
+            target_skills
         )
-        return roadmap
+        return _respond(http_request, roadmap)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/parse-resume")
-def process_resume(request: ResumeRequest):
+def process_resume(request: ResumeRequest, http_request: Request):
     try:
-        skills = parse_resume(request.resume_text)
-        return {"skills": skills}
+        deadline = _request_deadline(http_request)
+        skills, match = _parse_deduplicated(request.resume_text, deadline=deadline)
+        _index_candidate(request.candidate_id, request.resume_text, skills)
+        return _respond(http_request, _parse_result(skills, match, deadline))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _spool_upload(file: UploadFile):
+    """Copy an upload into a size-limited spool, chunk by chunk."""
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > UPLOAD_MAX_BYTES:
+            spool.close()
+            raise HTTPException(status_code=413, detail=f"File exceeds {UPLOAD_MAX_BYTES} bytes")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+@app.post("/api/parse-resume/upload")
+async def process_resume_upload(request: Request, file: UploadFile = File(...),
+                                candidate_id: Optional[str] = Form(None)):
+    name = file.filename or "resume.txt"
+    if os.path.splitext(name)[1].lower() not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=415, detail="Supported formats: PDF, DOCX, TXT")
+    deadline = _request_deadline(request)
+    spool = await _spool_upload(file)
+    try:
+        text, ext = await run_in_threadpool(extract_text_generic, spool, name, deadline)
+        skills, match = await run_in_threadpool(_parse_deduplicated, text, ext, deadline)
+        await run_in_threadpool(_index_candidate, candidate_id, text, skills)
+        return _respond(request, _parse_result(skills, match, deadline))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        spool.close()
+        await file.close()
+
 @app.post("/api/skill-gap")
-def process_skill_gap(request: SkillGapRequest):
+async def process_skill_gap(request: SkillGapRequest, http_request: Request):
     try:
-        gap_analysis = analyze_skill_gap(request.current_skills, request.target_skills)
-        return gap_analysis
+        gap_analysis = await coalescer.do(
+            _body_key("skill-gap", request), analyze_skill_gap, request.current_skills, request.target_skills)
+        return _respond(http_request, gap_analysis)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/recommendations")
-def get_learning_recommendations(request: SkillGapRequest):
+async def get_learning_recommendations(request: SkillGapRequest, http_request: Request):
+    try:
+        recommendations = await coalescer.do(
+            _body_key("recommendations", request), get_recommendations, request.current_skills, request.target_skills,
+            request.user_id)
+        return _respond(http_request, recommendations)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/candidates")
+def index_candidate(request: ResumeRequest, http_request: Request):
+    if not request.candidate_id:
+        raise HTTPException(status_code=422, detail="candidate_id is required")
     try:
-        recommendations = get_recommendations(request.current_skills, request.target_skills)
-        return recommendations
+        skills, _ = _parse_deduplicated(request.resume_text)
+        _index_candidate(request.candidate_id, request.resume_text, skills)
+        return _respond(http_request, {"candidate_id": request.candidate_id, "skills": skills["skills"],
+                                       "indexed": len(candidate_index)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/api/candidates/{candidate_id}")
+def remove_candidate(candidate_id: str):
+    if not candidate_index.remove(candidate_id):
+        raise HTTPException(status_code=404, detail="Unknown candidate")
+    return {"candidate_id": candidate_id, "indexed": len(candidate_index)}
+
+@app.post("/api/candidates/search")
+def search_candidates(request: CandidateSearchRequest, http_request: Request):
+    try:
+        start = time.perf_counter()
+        results = candidate_index.search(request.job_description, request.top_k, request.required_skills)
+        return _respond(http_request, {
+            "results": results,
+            "indexed": len(candidate_index),
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/skills/related")
+def related_skills(skills: str, top_k: int = 10, metric: str = "pmi"):
+    # "users with your skills also have...": ?skills=python,sql ranked by PMI (or lift)
+    if metric not in ("pmi", "lift"):
+        raise HTTPException(status_code=422, detail="metric must be 'pmi' or 'lift'")
+    wanted = [s.strip() for s in skills.split(",") if s.strip()]
+    model = cooccurrence.default_model()
+    return {"skills": wanted, "related": model.related(wanted, min(max(top_k, 1), 100), metric),
+            "documents": model.n_docs}
+
+@app.get("/api/skills/autocomplete")
+async def skill_autocomplete(q: str = "", limit: int = 10):
+    # async on purpose: a lookup is tens of microseconds, less than a thread-pool hop
+    return {"query": q, "suggestions": autocomplete.complete(q, min(max(limit, 1), 50))}
+
+@app.on_event("startup")
+def build_autocomplete_index():
+    autocomplete.rebuild()
+
+@app.get("/api/metrics")
+def service_metrics():
+    return {
+        "coalescing": coalescer.snapshot(),
+        "admission": admission.snapshot(),
+        "candidates_indexed": len(candidate_index),
+        "dedup": dict(dedup_stats, indexed=len(dedup_index)),
+        "paragraph_cache": chunk_cache.stats(),
+        "rpc": rpc_server.snapshot() if rpc_server else None,
+        "jobs": dict(job_store.stats(), **(job_pool.snapshot() if job_pool else {})),
+    }
+
+# Admin-only diagnostics (off unless ML_ADMIN_TOKEN is set; idle cost is zero)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.post("/api/skills/autocomplete/rebuild", dependencies=[Depends(require_admin)])
+def rebuild_autocomplete_index():
+    # after a vocabulary change that should show up before the periodic check notices it
+    return autocomplete.rebuild().stats()
+
+@app.post("/api/debug/profile", dependencies=[Depends(require_admin)], response_class=PlainTextResponse)
+async def debug_profile(seconds: float = 10.0, interval_ms: float = 5.0, include_idle: bool = False):
+    try:
+        counts = await run_in_threadpool(profiler.sample_stacks, seconds, interval_ms / 1000, include_idle)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(profiler.collapsed_text(counts))
+
+@app.post("/api/debug/tracemalloc/start", dependencies=[Depends(require_admin)])
+def debug_tracemalloc_start(frames: int = 10):
+    profiler.start_tracing(frames)
+    return {"tracing": profiler.tracing()}
+
+@app.post("/api/debug/tracemalloc/stop", dependencies=[Depends(require_admin)])
+def debug_tracemalloc_stop():
+    profiler.stop_tracing()
+    return {"tracing": profiler.tracing()}
+
+@app.post("/api/debug/tracemalloc/snapshot", dependencies=[Depends(require_admin)])
+def debug_tracemalloc_snapshot(limit: int = 20, key_type: str = "lineno"):
+    try:
+        return profiler.take_snapshot(limit, key_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/api/debug/tracemalloc/diff", dependencies=[Depends(require_admin)])
+def debug_tracemalloc_diff(base: int, current: Optional[int] = None, limit: int = 20, key_type: str = "lineno"):
+    try:
+        return {"base": base, "diff": profiler.diff_snapshots(base, current, limit, key_type)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+# Streaming variants: NDJSON in, NDJSON out. Each output line is
+# {"index": n, "result": ...} or {"index": n, "error": "..."} in input order.
+
+def _ndjson_response(request: Request, handle) -> StreamingResponse:
+    async def body():
+        records = iter_records(request.stream(), STREAM_MAX_LINE_BYTES)
+        try:
+            async for item in map_ordered(records, handle, STREAM_CONCURRENCY):
+                yield dumps_line(item)
+        except LineTooLong as e:
+            yield dumps_line({"error": str(e)})
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+def _stream_parse(record):
+    req = ResumeRequest(**record)
+    # every record gets its own budget (its "deadline_ms", else the default) from when it is taken up
+    ms = record.get("deadline_ms")
+    deadline = Deadline.from_ms(ms if isinstance(ms, (int, float)) else PARSE_DEADLINE_MS)
+    skills, match = _parse_deduplicated(req.resume_text, deadline=deadline)
+    _index_candidate(req.candidate_id, req.resume_text, skills)
+    return _parse_result(skills, match, deadline)
+
+def _stream_skill_gap(record):
+    req = SkillGapRequest(**record)
+    return analyze_skill_gap(req.current_skills, req.target_skills)
+
+def _stream_recommendations(record):
+    req = SkillGapRequest(**record)
+    return get_recommendations(req.current_skills, req.target_skills, req.user_id)
+
+@app.post("/api/stream/parse-resume")
+async def stream_parse_resume(request: Request):
+    return _ndjson_response(request, _stream_parse)
+
+@app.post("/api/stream/skill-gap")
+async def stream_skill_gap(request: Request):
+    return _ndjson_response(request, _stream_skill_gap)
+
+@app.post("/api/stream/recommendations")
+async def stream_recommendations(request: Request):
+    return _ndjson_response(request, _stream_recommendations)
+
+# Persistent binary transport: the same handlers as the streaming routes, batched over
+# length-prefixed msgpack frames on a Unix socket (ML_RPC_SOCKET) or TCP port (ML_RPC_PORT)
+
+def _rpc_roadmap(record):
+    req = SkillGapRequest(**record)
+    return generate_roadmap(req.current_skills, req.target_skills)
+
+RPC_METHODS = {
+    "parse_resume": _stream_parse,
+    "analyze_skill_gap": _stream_skill_gap,
+    "get_recommendations": _stream_recommendations,
+    "generate_roadmap": _rpc_roadmap,
+}
+rpc_server = None
+
+# Background jobs: durable SQLite queue (modules/jobs.py) drained by worker processes.
+# With several service workers only the leader starts the job pool (see modules/leader.py);
+# set ML_JOB_WORKERS=0 to drain the queue with a separate jobs_worker.py instead.
+
+job_store = JobStore()
+job_pool = None
+
+@app.on_event("startup")
+def start_job_workers():
+    global job_pool
+    if JOB_WORKERS > 0 and leader.is_leader():
+        job_pool = WorkerPool(processes=JOB_WORKERS).start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    if job_pool:
+        job_pool.stop()
+
+def _submit(kind, payload, blob=None, priority=0, max_attempts=None):
+    kwargs = {"max_attempts": max_attempts} if max_attempts else {}
+    try:
+        job_id = job_store.submit(kind, payload, blob, priority, **kwargs)
+    except UnknownJobKind as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    body, headers = encode({"job_id": job_id, "status": "queued"})
+    headers["location"] = f"/api/jobs/{job_id}"
+    return Response(content=body, status_code=202, headers=headers)
+
+@app.post("/api/jobs")
+async def submit_job(request: JobRequest):
+    return await run_in_threadpool(_submit, request.kind, request.payload, None, request.priority, request.max_attempts)
+
+@app.post("/api/jobs/upload")
+async def submit_upload_job(request: Request, file: UploadFile = File(...), priority: int = Form(0)):
+    name = file.filename or "resume.txt"
+    if os.path.splitext(name)[1].lower() not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=415, detail="Supported formats: PDF, DOCX, TXT")
+    spool = await _spool_upload(file)
+    try:
+        blob = spool.read()
+    finally:
+        spool.close()
+        await file.close()
+    return await run_in_threadpool(_submit, "parse_resume", {"filename": name}, blob, priority)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, http_request: Request, wait: float = 0.0):
+    # wait > 0 long-polls: the answer comes back as soon as the job finishes or the wait runs out
+    deadline = time.monotonic() + min(max(wait, 0.0), JOB_MAX_WAIT)
+    delay = 0.05
+    while True:
+        job = await run_in_threadpool(job_store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired job")
+        remaining = deadline - time.monotonic()
+        if job["status"] in (DONE, FAILED) or remaining <= 0 or await http_request.is_disconnected():
+            return _respond(http_request, job)
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.5)
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    if not job_store.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not queued (already running, finished or unknown)")
+    return {"job_id": job_id, "status": "cancelled"}
+
+@app.on_event("startup")
+async def start_rpc_server():
+    global rpc_server
+    if not (RPC_SOCKET or RPC_PORT):
+        return
+    # Every worker serves a TCP port (reuse_port) or a socket prefork.py bound before forking;
+    # a Unix socket path bound here is served by the leader alone
+    if RPC_SOCKET and not rpc.inherited(RPC_SOCKET) and not leader.is_leader():
+        return
+    # RPC calls bypass AdmissionMiddleware, so they are charged to the same per-client buckets
+    limiter = admission.limiter if ADMISSION_ENABLED else None
+    rpc_server = await RpcServer(RPC_METHODS, limiter=limiter).start(RPC_SOCKET, RPC_HOST, int(RPC_PORT) if RPC_PORT else None)
+
+@app.on_event("shutdown")
+async def stop_rpc_server():
+    if rpc_server:
+        await rpc_server.close()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
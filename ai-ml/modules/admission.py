@@ -0,0 +1,273 @@
+import os
+import json
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+# In-process admission control for the ML service, mounted as an ASGI middleware when
+# ML_ADMISSION=1 (off by default):
+#   1. per-client token buckets -> 429 + Retry-After. The caller is its X-API-Key when
+#      that is one of ML_ADMISSION_API_KEYS, else its IP; anything else a caller sends
+#      could be varied per request to get a fresh bucket. A trusted caller (a configured
+#      API key, or an IP in ML_ADMISSION_TRUSTED_PROXIES) may name the end user it acts
+#      for in the ML_ADMISSION_USER_HEADER header (the Node backend forwards its
+#      authenticated user id); that user then gets a bucket of its own, and is charged
+#      against the caller's larger ML_RATE_PER_CALLER budget as well. Without the user
+#      header every user behind one backend would share a single bucket.
+#   2. per-class concurrency limits ('heavy' parsing vs 'light' gap/recommendations)
+#      with a bounded wait queue -> 503 + Retry-After when the queue is full, when the
+#      predicted wait already exceeds the class deadline, or when a queued request's
+#      deadline passes before it gets a slot.
+# A slot is held until the response body has been fully sent, so streaming endpoints
+# are accounted for correctly.
+
+RATE_PER_CLIENT = float(os.environ.get('ML_RATE_PER_CLIENT', '10'))
+RATE_BURST = float(os.environ.get('ML_RATE_BURST', '20'))
+MAX_TRACKED_CLIENTS = int(os.environ.get('ML_RATE_MAX_CLIENTS', '10000'))
+USER_HEADER = os.environ.get('ML_ADMISSION_USER_HEADER', 'x-end-user').lower().encode('latin-1')
+API_KEYS = frozenset(k.strip() for k in os.environ.get('ML_ADMISSION_API_KEYS', '').split(',') if k.strip())
+TRUSTED_PROXIES = frozenset(
+    ip.strip() for ip in os.environ.get('ML_ADMISSION_TRUSTED_PROXIES', '').split(',') if ip.strip())
+RATE_PER_CALLER = float(os.environ.get('ML_RATE_PER_CALLER', '200'))
+CALLER_BURST = float(os.environ.get('ML_RATE_CALLER_BURST', '400'))
+
+CLASS_SETTINGS = {
+    # name: (concurrency, queue length, max queue wait in seconds, token cost)
+    'heavy': (int(os.environ.get('ML_HEAVY_CONCURRENCY', str(os.cpu_count() or 2))),
+              int(os.environ.get('ML_HEAVY_QUEUE', '16')),
+              float(os.environ.get('ML_HEAVY_MAX_WAIT', '5')),
+              float(os.environ.get('ML_HEAVY_COST', '5'))),
+    'light': (int(os.environ.get('ML_LIGHT_CONCURRENCY', '64')),
+              int(os.environ.get('ML_LIGHT_QUEUE', '256')),
+              float(os.environ.get('ML_LIGHT_MAX_WAIT', '1')),
+              float(os.environ.get('ML_LIGHT_COST', '1'))),
+}
+
+HEAVY_PATHS = ('/api/parse-resume', '/api/stream/')
+HEAVY_EXACT = ('/api/candidates',)
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Map a request to a concurrency class; None means not admission-controlled."""
+    if not path.startswith('/api/'):
+        return None
+    # Job status long-polls mostly sleep; holding a light slot for their whole wait
+    # would starve real work
+    if method == 'GET' and path.startswith('/api/jobs/'):
+        return None
+    if path.startswith(HEAVY_PATHS) or (method == 'POST' and path in HEAVY_EXACT):
+        return 'heavy'
+    return 'light'
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """Consume `cost` tokens; returns 0 on success, else seconds until they exist."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class ClientLimiter:
+    def __init__(self, rate: float = RATE_PER_CLIENT, burst: float = RATE_BURST,
+                 max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str, cost: float) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, max(self.burst, cost), now)
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            wait = bucket.take(cost, now)
+        if wait:
+            raise Rejected(429, wait, 'rate limit exceeded')
+
+
+class ConcurrencyClass:
+    """A counting semaphore with a bounded FIFO wait queue and per-waiter deadlines."""
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters = deque()
+        self._service_ewma = 0.05
+        self.stats = {'admitted': 0, 'queued': 0, 'shed_queue_full': 0, 'shed_deadline': 0}
+
+    def _estimated_wait(self, position: int) -> float:
+        return self._service_ewma * (position + 1) / self.limit
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.stats['admitted'] += 1
+            return
+        position = len(self._waiters)
+        if position >= self.max_queue:
+            self.stats['shed_queue_full'] += 1
+            raise Rejected(503, self._estimated_wait(position), f'{self.name} queue full')
+        if self._estimated_wait(position) > self.max_wait:
+            self.stats['shed_deadline'] += 1
+            raise Rejected(503, self._estimated_wait(position), f'{self.name} queue wait exceeds deadline')
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.stats['queued'] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(fut)
+            self.stats['shed_deadline'] += 1
+            raise Rejected(503, self._estimated_wait(len(self._waiters)), f'{self.name} queue deadline exceeded')
+        except asyncio.CancelledError:
+            self._abandon(fut)
+            raise
+        self.stats['admitted'] += 1
+
+    def _abandon(self, fut) -> None:
+        if fut.done() and not fut.cancelled():
+            # The slot was handed over just as we gave up; pass it on
+            self.release(None)
+        else:
+            fut.cancel()
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self, service_time: Optional[float]) -> None:
+        if service_time is not None:
+            self._service_ewma = 0.9 * self._service_ewma + 0.1 * service_time
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                # Hand the slot straight to the next waiter; `active` stays the same
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict:
+        return dict(self.stats, active=self.active, waiting=len(self._waiters), limit=self.limit,
+                    service_ewma_ms=round(self._service_ewma * 1000, 2))
+
+
+class AdmissionController:
+    def __init__(self, settings: Dict[str, Tuple[int, int, float, float]] = None, limiter: ClientLimiter = None,
+                 callers: ClientLimiter = None):
+        settings = settings or CLASS_SETTINGS
+        self.classes = {name: ConcurrencyClass(name, c, q, w) for name, (c, q, w, _) in settings.items()}
+        self.costs = {name: cost for name, (_, _, _, cost) in settings.items()}
+        self.limiter = limiter or ClientLimiter()
+        # budget of a trusted caller across all the end users it forwards
+        self.callers = callers or ClientLimiter(RATE_PER_CALLER, CALLER_BURST)
+        self.rate_limited = 0
+
+    def check(self, scope, cost: float) -> None:
+        caller, user = client_keys(scope)
+        if user is None:
+            self.limiter.check(caller, cost)
+            return
+        self.limiter.check(user, cost)
+        self.callers.check(caller, cost)
+
+    def snapshot(self) -> Dict:
+        return {'rate_limited': self.rate_limited, 'classes': {n: c.snapshot() for n, c in self.classes.items()}}
+
+
+def client_keys(scope) -> Tuple[str, Optional[str]]:
+    """(caller key, end-user key or None); the user only counts for a trusted caller."""
+    api_key = user = None
+    for name, value in scope.get('headers', []):
+        if name == USER_HEADER and value:
+            user = value.decode('latin-1')
+        elif name == b'x-api-key' and value:
+            api_key = value.decode('latin-1')
+    client = scope.get('client')
+    ip = client[0] if client else 'unknown'
+    if api_key is not None and api_key in API_KEYS:
+        caller = 'key:' + api_key
+    else:
+        caller = 'ip:' + ip
+        if ip not in TRUSTED_PROXIES:
+            return caller, None
+    return caller, (f'{caller}/user:{user}' if user else None)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to /api/ requests."""
+
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        klass = classify(scope['method'], scope['path'])
+        if klass is None:
+            return await self.app(scope, receive, send)
+        ctrl = self.controller
+        slots = ctrl.classes[klass]
+        try:
+            ctrl.check(scope, ctrl.costs[klass])
+        except Rejected as r:
+            ctrl.rate_limited += 1
+            return await self._reject(send, r)
+        try:
+            await slots.acquire()
+        except Rejected as r:
+            return await self._reject(send, r)
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slots.release(time.monotonic() - start)
+
+    @staticmethod
+    async def _reject(send, rejected: Rejected) -> None:
+        body = json.dumps({'detail': rejected.reason}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': rejected.status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(max(1, math.ceil(rejected.retry_after))).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
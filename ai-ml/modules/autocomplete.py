@@ -0,0 +1,264 @@
+import time
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .resume_parser import DEFAULT_SKILLS
+    from .recommendation_engine import CATEGORY_MAP
+    from .cooccurrence import ROLE_PROFILES, default_model as cooccurrence_model
+except ImportError:
+    from resume_parser import DEFAULT_SKILLS
+    from recommendation_engine import CATEGORY_MAP
+    from cooccurrence import ROLE_PROFILES, default_model as cooccurrence_model
+
+# Skill autocomplete for the profile and goal forms.
+#
+# The vocabulary is the parser's DEFAULT_SKILLS, the role-profile skills, the course
+# catalogue tags and every skill the co-occurrence model has learned from resumes, plus
+# the aliases below. Each skill is indexed under its name, its aliases and, for
+# multi-word names, every later word ("learning" finds "machine learning"), as one
+# sorted array of keys: a prefix is a bisect plus a scan of the matching run. Ranking is
+# by popularity, the number of resumes with the skill (from the co-occurrence model)
+# plus one per source listing it. Prefixes of one or two characters match a large part
+# of the array, so their top lists are precomputed.
+#
+# Typos go through a deletion-neighbourhood index (SymSpell): every key prefix of 3 to
+# PREFIX_LEN characters is stored under each string obtained by deleting up to 1
+# (2 from 6 characters on) of its characters. A query prefix's own deletions then find
+# the keys within that edit distance with a few dict lookups; candidates are confirmed
+# with an optimal-string-alignment distance between the whole query and the key's
+# closest prefix.
+#
+# The index is immutable. rebuild() builds a new one and swaps the module reference, so
+# requests always see a complete index; current() rebuilds in the background when the
+# co-occurrence vocabulary or counts have changed, at most every REBUILD_INTERVAL seconds.
+
+PREFIX_LEN = 7
+MIN_FUZZY = 4
+SHORT_PREFIX = 2
+TOP_PER_SHORT_PREFIX = 50
+REBUILD_INTERVAL = 60.0
+
+SKILL_ALIASES: Dict[str, List[str]] = {
+    'javascript': ['js', 'ecmascript', 'es6'],
+    'typescript': ['ts'],
+    'react': ['reactjs', 'react.js', 'react js'],
+    'node': ['nodejs', 'node.js', 'node js'],
+    'postgres': ['postgresql', 'psql'],
+    'kubernetes': ['k8s'],
+    'sklearn': ['scikit-learn', 'scikit learn'],
+    'tensorflow': ['tf'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'aws': ['amazon web services'],
+    'azure': ['microsoft azure'],
+    'nlp': ['natural language processing'],
+    'cv': ['computer vision'],
+    'ui': ['user interface'],
+    'ux': ['user experience'],
+    'ci': ['continuous integration'],
+    'cd': ['continuous delivery', 'continuous deployment'],
+    'mongodb': ['mongo'],
+    'git': ['github', 'gitlab'],
+    'rest': ['rest api', 'restful'],
+}
+
+
+def _key(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def _edits(length: int) -> int:
+    return 1 if length < 6 else 2
+
+
+def _deletes(word: str, max_edits: int, min_len: int) -> Set[str]:
+    out = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w)) if len(w) > min_len}
+        out |= frontier
+    return out
+
+
+def _prefix_distance(q: str, key: str, limit: int) -> int:
+    """Smallest optimal-string-alignment distance between q and any prefix of key,
+    or limit + 1 as soon as it is certainly above limit."""
+    b = key[:len(q) + limit]
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(q) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (q[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and q[i - 1] == b[j - 2] and q[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return min(prev[max(0, len(q) - limit):])
+
+
+def vocabulary() -> Dict[str, Tuple[str, float]]:
+    """key -> (display name, popularity) from every skill source."""
+    terms: Dict[str, List] = {}
+
+    def add(name: str, weight: float) -> None:
+        key = _key(name)
+        if not key:
+            return
+        entry = terms.setdefault(key, [name.strip(), 0.0])
+        if entry[0] == entry[0].lower() and name.strip() != name.strip().lower():
+            entry[0] = name.strip()  # prefer a cased display name ("Flutter" over "flutter")
+        entry[1] += weight
+
+    for name in DEFAULT_SKILLS:
+        add(name, 1.0)
+    for skills in ROLE_PROFILES.values():
+        for name in skills:
+            add(name, 1.0)
+    for tag in CATEGORY_MAP:
+        add(tag, 1.0)
+    model = cooccurrence_model()
+    for sid, name in enumerate(model.names):
+        add(name, float(model.skill_docs[sid]))
+    return {k: (v[0], v[1]) for k, v in terms.items()}
+
+
+class SkillIndex:
+    def __init__(self, terms: Dict[str, Tuple[str, float]], aliases: Dict[str, List[str]] = SKILL_ALIASES):
+        self.names: List[str] = []
+        self.popularity = array('d')
+        ids: Dict[str, int] = {}
+        for key, (name, pop) in sorted(terms.items(), key=lambda kv: -kv[1][1]):
+            ids[key] = len(self.names)
+            self.names.append(name)
+            self.popularity.append(pop)
+
+        entries: Set[Tuple[str, int]] = set()
+        for key, tid in ids.items():
+            entries.add((key, tid))
+            words = key.split()
+            for i in range(1, len(words)):
+                entries.add((' '.join(words[i:]), tid))
+        for canonical, alias_list in aliases.items():
+            tid = ids.get(_key(canonical))
+            if tid is not None:
+                entries.update((_key(a), tid) for a in alias_list)
+        entries = sorted(entries)
+        self.keys: List[str] = [k for k, _ in entries]
+        self.key_term = array('I', (t for _, t in entries))
+
+        # top lists for the short prefixes that match a large share of the keys
+        self.short: Dict[str, Tuple[int, ...]] = {}
+        buckets: Dict[str, Set[int]] = {}
+        for key, tid in entries:
+            for n in range(1, min(SHORT_PREFIX, len(key)) + 1):
+                buckets.setdefault(key[:n], set()).add(tid)
+        for prefix, tids in buckets.items():
+            self.short[prefix] = tuple(sorted(tids)[:TOP_PER_SHORT_PREFIX])  # ids are popularity-ordered
+
+        # deletion neighbourhoods of key prefixes -> key positions
+        deletes: Dict[str, List[int]] = {}
+        for pos, key in enumerate(self.keys):
+            seen: Set[str] = set()
+            for n in range(MIN_FUZZY - 1, min(PREFIX_LEN, len(key)) + 1):
+                seen |= _deletes(key[:n], _edits(n), MIN_FUZZY - 1)
+            for d in seen:
+                deletes.setdefault(d, []).append(pos)
+        self.deletes: Dict[str, array] = {d: array('I', p) for d, p in deletes.items()}
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _prefix_terms(self, q: str) -> Iterable[Tuple[int, str]]:
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + '\uffff', lo)
+        return ((self.key_term[p], self.keys[p]) for p in range(lo, hi))
+
+    def complete(self, query: str, limit: int = 10) -> List[Dict]:
+        q = _key(query)
+        if not q:
+            return []
+        if len(q) <= SHORT_PREFIX:
+            return [self._result(tid, _key(self.names[tid]), 0) for tid in self.short.get(q, ())[:limit]]
+        results: List[Dict] = []
+        found: Set[int] = set()
+        matched: Dict[int, str] = {}
+        for tid, key in self._prefix_terms(q):
+            if tid not in matched or key == _key(self.names[tid]):
+                matched[tid] = key
+        for tid in heapq.nsmallest(limit, matched):  # smaller id = more popular
+            found.add(tid)
+            results.append(self._result(tid, matched[tid], 0))
+        if len(results) < limit and len(q) >= MIN_FUZZY:
+            results += self._fuzzy(q, limit - len(results), found)
+        return results
+
+    def _fuzzy(self, q: str, limit: int, exclude: Set[int]) -> List[Dict]:
+        qp = q[:PREFIX_LEN]
+        positions: Set[int] = set()
+        for d in _deletes(qp, _edits(len(qp)), MIN_FUZZY - 1):
+            positions.update(self.deletes.get(d, ()))
+        # candidates share a deletion with the first PREFIX_LEN characters; the whole query
+        # must be within the edit budget of the key
+        max_edits = _edits(len(q))
+        best: Dict[int, Tuple[int, str]] = {}
+        for pos in positions:
+            tid = self.key_term[pos]
+            if tid in exclude:
+                continue
+            key = self.keys[pos]
+            dist = _prefix_distance(q, key, max_edits)
+            if dist <= max_edits and (tid not in best or dist < best[tid][0]):
+                best[tid] = (dist, key)
+        ranked = heapq.nsmallest(limit, best.items(), key=lambda kv: (kv[1][0], kv[0]))
+        return [self._result(tid, key, dist) for tid, (dist, key) in ranked]
+
+    def _result(self, tid: int, matched: str, distance: int) -> Dict:
+        return {'skill': self.names[tid], 'matched': matched, 'popularity': self.popularity[tid],
+                'distance': distance}
+
+    def stats(self) -> Dict:
+        return {'skills': len(self.names), 'keys': len(self.keys), 'deletion_keys': len(self.deletes),
+                'built_at': self.built_at}
+
+
+_index: Optional[SkillIndex] = None
+_version = None
+_checked = 0.0
+_lock = threading.Lock()
+
+
+def _vocabulary_version():
+    model = cooccurrence_model()
+    return len(model), model.updates
+
+
+def rebuild() -> SkillIndex:
+    """Build a new index from the current vocabulary and swap it in."""
+    global _index, _version
+    with _lock:
+        version = _vocabulary_version()
+        index = SkillIndex(vocabulary())
+        _index, _version = index, version  # one reference assignment: readers see old or new
+    return index
+
+
+def current() -> SkillIndex:
+    global _checked
+    index = _index
+    if index is None:
+        return rebuild()
+    now = time.monotonic()
+    if now - _checked > REBUILD_INTERVAL:
+        _checked = now
+        if _vocabulary_version() != _version and not _lock.locked():
+            threading.Thread(target=rebuild, name='autocomplete-rebuild', daemon=True).start()
+    return index
+
+
+def complete(query: str, limit: int = 10) -> List[Dict]:
+    return current().complete(query, limit)
@@ -0,0 +1,229 @@
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import contextlib
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    from .resources import DATA_DIR
+except ImportError:
+    from resources import DATA_DIR
+
+# Content-addressed store for uploaded resumes.
+#
+# A file is stored once under the sha256 of its bytes, at <root>/ab/cd/<sha256><ext>
+# (two levels of 256-way sharding keep directories small), so re-uploads of the same
+# resume share one copy and different files with the same name never collide. The
+# original extension is kept because parsers dispatch on it. An SQLite index next to the
+# blobs tracks each blob's size, creation and last access time, and the file name each
+# upload arrived under (the most recent blob per name), which is what user_data.pdf_name
+# records.
+#
+# Retention: blobs not read for MAX_AGE_DAYS are evicted, and when the store grows past
+# MAX_BYTES the least recently used blobs go until it is back under LOW_WATER of it.
+# enforce() applies the policy and returns what it removed so callers can drop anything
+# derived from those blobs. Last access is written at most every ACCESS_RESOLUTION
+# seconds per blob, so reads stay reads.
+#
+# Settings (environment):
+#   ML_BLOB_DIR            store root (default <data dir>/blobs)
+#   ML_BLOB_MAX_BYTES      size cap in bytes (default 5 GiB, 0 = no cap)
+#   ML_BLOB_MAX_AGE_DAYS   evict blobs unread for this long (default 365, 0 = keep)
+
+BLOB_DIR = os.environ.get('ML_BLOB_DIR', os.path.join(DATA_DIR, 'blobs'))
+MAX_BYTES = int(os.environ.get('ML_BLOB_MAX_BYTES', str(5 * 1024 ** 3)))
+MAX_AGE_DAYS = float(os.environ.get('ML_BLOB_MAX_AGE_DAYS', '365'))
+LOW_WATER = 0.9
+ACCESS_RESOLUTION = 60.0
+CHUNK_BYTES = 1 << 20
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    uploaded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS names_sha256 ON names (sha256);
+'''
+
+
+class BlobStore:
+    """sha256-addressed files with an SQLite index. Connections are per thread."""
+
+    def __init__(self, root: str = BLOB_DIR, max_bytes: int = MAX_BYTES, max_age_days: float = MAX_AGE_DAYS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400.0
+        os.makedirs(os.path.join(root, 'tmp'), exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, 'index.sqlite3'), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256 + ext)
+
+    # ---- writing ----
+
+    def put(self, data: Union[bytes, bytearray, memoryview], name: Optional[str] = None) -> str:
+        """Store bytes (once per distinct content) and return their sha256."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        if not self._known(sha256):
+            self._write(sha256, lambda f: f.write(data), name)
+        self._record(sha256, len(data), name)
+        return sha256
+
+    def put_file(self, path: str, name: Optional[str] = None) -> str:
+        """Store a file from disk, hashing and copying it in chunks."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHUNK_BYTES), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        if not self._known(sha256):
+            def copy(out):
+                with open(path, 'rb') as src:
+                    for block in iter(lambda: src.read(CHUNK_BYTES), b''):
+                        out.write(block)
+            self._write(sha256, copy, name or os.path.basename(path))
+        self._record(sha256, os.path.getsize(path), name or os.path.basename(path))
+        return sha256
+
+    def _known(self, sha256: str) -> bool:
+        row = self._conn().execute('SELECT ext FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        return row is not None and os.path.exists(self._path(sha256, row[0]))
+
+    def _write(self, sha256: str, fill, name: Optional[str]) -> None:
+        ext = os.path.splitext(name or '')[1].lower()
+        final = self._path(sha256, ext)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        # write to a temp file on the same filesystem, then rename into place atomically
+        fd, tmp = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                fill(f)
+            os.replace(tmp, final)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        now = time.time()
+        self._conn().execute(
+            'INSERT OR REPLACE INTO blobs (sha256, ext, size, created, last_access) VALUES (?, ?, ?, ?, ?)',
+            (sha256, ext, os.path.getsize(final), now, now))
+
+    def _record(self, sha256: str, size: int, name: Optional[str]) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute('UPDATE blobs SET last_access = ? WHERE sha256 = ?', (now, sha256))
+        if name:
+            conn.execute('INSERT OR REPLACE INTO names (name, sha256, uploaded) VALUES (?, ?, ?)',
+                         (name, sha256, now))
+
+    # ---- reading ----
+
+    def path(self, sha256: str, touch: bool = True) -> Optional[str]:
+        """Filesystem path of a blob (None if absent); counts as an access."""
+        row = self._conn().execute('SELECT ext, last_access FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        if row is None:
+            return None
+        path = self._path(sha256, row[0])
+        if not os.path.exists(path):
+            return None
+        now = time.time()
+        if touch and now - row[1] > ACCESS_RESOLUTION:
+            self._conn().execute('UPDATE blobs SET last_access = ? WHERE sha256 = ?', (now, sha256))
+        return path
+
+    def __contains__(self, sha256: str) -> bool:
+        return self.path(sha256, touch=False) is not None
+
+    def lookup_name(self, name: str) -> Optional[str]:
+        """sha256 of the latest upload stored under a file name."""
+        row = self._conn().execute('SELECT sha256 FROM names WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    @contextlib.contextmanager
+    def mapped(self, sha256: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """Read-only memory map of a blob: pages are loaded by the OS as they are read."""
+        path = self.path(sha256)
+        if path is None:
+            raise KeyError(sha256)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''  # empty files cannot be mapped
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                yield m
+
+    def iter_chunks(self, sha256: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+        path = self.path(sha256)
+        if path is None:
+            raise KeyError(sha256)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_bytes), b''):
+                yield block
+
+    # ---- retention ----
+
+    def enforce(self, keep: Optional[str] = None) -> List[str]:
+        """Apply the age and size limits; returns the evicted sha256s. ``keep`` is never evicted."""
+        conn = self._conn()
+        victims: List[str] = []
+        if self.max_age > 0:
+            victims += [r[0] for r in conn.execute(
+                'SELECT sha256 FROM blobs WHERE last_access < ? AND sha256 != ?',
+                (time.time() - self.max_age, keep or ''))]
+        if self.max_bytes > 0:
+            total = self.stats()['bytes'] - sum(self._size(s) for s in victims)
+            if total > self.max_bytes:
+                target = self.max_bytes * LOW_WATER
+                gone = set(victims)
+                for sha256, size in conn.execute('SELECT sha256, size FROM blobs ORDER BY last_access'):
+                    if total <= target:
+                        break
+                    if sha256 == keep or sha256 in gone:
+                        continue
+                    victims.append(sha256)
+                    total -= size
+        for sha256 in victims:
+            self.delete(sha256)
+        return victims
+
+    def _size(self, sha256: str) -> int:
+        row = self._conn().execute('SELECT size FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        return row[0] if row else 0
+
+    def delete(self, sha256: str) -> None:
+        conn = self._conn()
+        row = conn.execute('SELECT ext FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        if row is None:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self._path(sha256, row[0]))
+        conn.execute('DELETE FROM blobs WHERE sha256 = ?', (sha256,))
+        conn.execute('DELETE FROM names WHERE sha256 = ?', (sha256,))
+
+    def stats(self) -> Dict[str, int]:
+        count, size = self._conn().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        names = self._conn().execute('SELECT COUNT(*) FROM names').fetchone()[0]
+        return {'blobs': count, 'bytes': size, 'names': names, 'max_bytes': self.max_bytes}
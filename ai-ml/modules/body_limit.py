@@ -0,0 +1,78 @@
+import json
+from typing import Iterable
+
+from starlette.exceptions import HTTPException
+
+# Request body limits for upload routes, enforced below the framework.
+#
+# FastAPI parses a multipart body (spooling every file part to disk) before the route
+# function runs, so a size check in the route only happens after the whole body has
+# been received. This ASGI middleware runs first: a declared Content-Length over the
+# limit, or a body that is not multipart/form-data, is answered straight away without
+# reading anything; a chunked or under-declared body is counted as it is received and
+# cut off with 413 as soon as it passes the limit. The cut-off is an HTTPException so
+# that FastAPI's body parsing re-raises it as is instead of turning it into a 400.
+
+
+class BodyTooLarge(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f'Request body exceeds {max_bytes} bytes')
+
+
+class BodyLimitMiddleware:
+    """ASGI middleware capping the request body of multipart upload routes."""
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or scope['path'] not in self.paths:
+            return await self.app(scope, receive, send)
+        headers = dict(scope['headers'])
+        if not headers.get(b'content-type', b'').lower().startswith(b'multipart/form-data'):
+            return await self._reject(send, 415, 'Expected a multipart/form-data file upload')
+        declared = headers.get(b'content-length', b'')
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            e = BodyTooLarge(self.max_bytes)
+            return await self._reject(send, e.status_code, e.detail)
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    raise BodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except BodyTooLarge as e:
+            if started:
+                raise
+            await self._reject(send, e.status_code, e.detail)
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str) -> None:
+        body = json.dumps({'detail': detail}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'connection', b'close'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,410 @@
+import os
+import re
+import json
+import math
+import heapq
+import pickle
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+try:
+    from .resources import DATA_DIR
+    from .resume_parser import DEFAULT_SKILLS, _extract_skills
+except ImportError:
+    from resources import DATA_DIR
+    from resume_parser import DEFAULT_SKILLS, _extract_skills
+
+# In-memory candidate search: rank stored resumes against a job description.
+#
+# Two kinds of postings are kept, both as append-only arrays of internal doc ids (so
+# they stay sorted without re-sorting):
+#   - skill postings: skill -> docs whose parsed skills contain it
+#   - term postings:  token -> (docs, term frequencies) for BM25 over the resume text
+# Re-indexing or removing a candidate tombstones the old doc id; postings are compacted
+# once dead ids make up a quarter of the index, and before every save.
+#
+# With several service workers, each holding its own in-memory index, the candidates
+# themselves live in one SQLite database (CandidateStore, WAL mode like jobs.py): every
+# add or remove is written there first and stamped with an increasing sequence number.
+# SharedCandidateIndex applies the rows past the last sequence it has seen before each
+# search, so every worker answers from the same set of candidates and nothing depends
+# on which worker saved last. The database is opened on first use.
+#
+# Settings (environment):
+#   ML_CANDIDATES_DB   database path (default <data dir>/candidates.sqlite3)
+
+CANDIDATES_DB = os.environ.get('ML_CANDIDATES_DB', os.path.join(DATA_DIR, 'candidates.sqlite3'))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SKILL_WEIGHT = 3.0
+COMPACT_RATIO = 0.25
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the to was we '
+    'will with you your this they their who what which all any can able must should would'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def intersect_postings(lists: List[List[int]]) -> List[int]:
+    """Intersect sorted doc-id lists, smallest first, galloping through the larger ones."""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        if not result:
+            break
+        out = []
+        lo = 0
+        n = len(other)
+        for doc in result:
+            # exponential search for the first position >= doc, then binary search
+            step = 1
+            hi = lo
+            while hi < n and other[hi] < doc:
+                lo = hi
+                hi += step
+                step <<= 1
+            hi = min(hi, n)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if other[mid] < doc:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo < n and other[lo] == doc:
+                out.append(doc)
+        result = out
+    return result
+
+
+class CandidateIndex:
+    def __init__(self, skills_vocab: List[str] = None):
+        self.skills_vocab = list(skills_vocab or DEFAULT_SKILLS)
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._external: List[Optional[str]] = []
+        self._doc_len = array('I')
+        self._doc_skills: List[frozenset] = []
+        self._skill_postings: Dict[str, array] = {}
+        self._term_docs: Dict[str, array] = {}
+        self._term_tfs: Dict[str, array] = {}
+        self._live = 0
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # ---- updates ----
+
+    def add(self, candidate_id: str, text: str, skills: Iterable[str] = None) -> None:
+        """Index (or re-index) a candidate from resume text and its parsed skills."""
+        if skills is None:
+            skills = _extract_skills(text, self.skills_vocab, use_nlp=False)
+        skill_set = frozenset(s.lower() for s in skills)
+        tokens = tokenize(text)
+        tfs: Dict[str, int] = {}
+        for t in tokens:
+            tfs[t] = tfs.get(t, 0) + 1
+        with self._lock:
+            self._remove_locked(candidate_id)
+            doc = len(self._external)
+            self._ids[candidate_id] = doc
+            self._external.append(candidate_id)
+            self._doc_len.append(len(tokens))
+            self._doc_skills.append(skill_set)
+            for s in skill_set:
+                self._skill_postings.setdefault(s, array('I')).append(doc)
+            for t, tf in tfs.items():
+                self._term_docs.setdefault(t, array('I')).append(doc)
+                self._term_tfs.setdefault(t, array('I')).append(tf)
+            self._live += 1
+            self._total_len += len(tokens)
+            if self._dead_ratio() > COMPACT_RATIO:
+                self._compact_locked()
+
+    def remove(self, candidate_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_locked(candidate_id)
+            if removed and self._dead_ratio() > COMPACT_RATIO:
+                self._compact_locked()
+            return removed
+
+    def _remove_locked(self, candidate_id: str) -> bool:
+        doc = self._ids.pop(candidate_id, None)
+        if doc is None:
+            return False
+        self._external[doc] = None
+        self._live -= 1
+        self._total_len -= self._doc_len[doc]
+        return True
+
+    def _dead_ratio(self) -> float:
+        return 1 - self._live / len(self._external) if self._external else 0.0
+
+    def _compact_locked(self) -> None:
+        docs = [(cid, self._doc_len[d], self._doc_skills[d]) for d, cid in enumerate(self._external) if cid is not None]
+        remap = {old: new for new, old in enumerate(d for d, cid in enumerate(self._external) if cid is not None)}
+        term_docs, term_tfs = self._term_docs, self._term_tfs
+        skill_postings = self._skill_postings
+        self._reset()
+        for new, (cid, length, skills) in enumerate(docs):
+            self._ids[cid] = new
+            self._external.append(cid)
+            self._doc_len.append(length)
+            self._doc_skills.append(skills)
+            self._total_len += length
+        self._live = len(docs)
+        for s, postings in skill_postings.items():
+            kept = array('I', (remap[d] for d in postings if d in remap))
+            if kept:
+                self._skill_postings[s] = kept
+        for t, postings in term_docs.items():
+            tfs = term_tfs[t]
+            new_docs, new_tfs = array('I'), array('I')
+            for d, tf in zip(postings, tfs):
+                if d in remap:
+                    new_docs.append(remap[d])
+                    new_tfs.append(tf)
+            if new_docs:
+                self._term_docs[t] = new_docs
+                self._term_tfs[t] = new_tfs
+
+    # ---- queries ----
+
+    def search(self, job_description: str, top_k: int = 10, required_skills: List[str] = None) -> List[Dict[str, Any]]:
+        """Return the top-k candidates for a job description.
+
+        Score = BM25 over the job description's terms + SKILL_WEIGHT per matched skill.
+        `required_skills` restricts the result to candidates having all of them, via
+        posting-list intersection. Terms are scored in order of decreasing upper bound;
+        once the remaining terms cannot lift an unseen doc into the top-k, no new
+        candidates are admitted and hopeless accumulators are dropped.
+        """
+        query_skills = set(s.lower() for s in _extract_skills(job_description, self.skills_vocab, use_nlp=False))
+        query_terms = set(tokenize(job_description)) - query_skills
+        with self._lock:
+            if not self._live:
+                return []
+            n = self._live
+            avg_len = self._total_len / n if n else 0.0
+            allowed: Optional[Set[int]] = None
+            if required_skills:
+                lists = [self._skill_postings.get(s.lower(), array('I')) for s in required_skills]
+                allowed = set(intersect_postings(lists))
+                if not allowed:
+                    return []
+
+            # (upper bound, kind, key) for every query feature present in the index
+            features = []
+            for s in query_skills:
+                if s in self._skill_postings:
+                    features.append((SKILL_WEIGHT, 'skill', s))
+            for t in query_terms:
+                docs = self._term_docs.get(t)
+                if docs is None:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                features.append((idf * (BM25_K1 + 1), 'term', t, idf))
+            features.sort(key=lambda f: f[0], reverse=True)
+
+            remaining = sum(f[0] for f in features)
+            acc: Dict[int, float] = {}
+            admit_new = True
+            for feature in features:
+                ub, kind, key = feature[0], feature[1], feature[2]
+                remaining -= ub
+                docs = self._skill_postings[key] if kind == 'skill' else self._term_docs[key]
+                if not admit_new and len(acc) * 8 < len(docs):
+                    # Few survivors left: probe the sorted postings instead of scanning them
+                    for d in acc:
+                        pos = bisect_left(docs, d)
+                        if pos < len(docs) and docs[pos] == d:
+                            acc[d] += ub if kind == 'skill' else self._bm25(key, pos, feature[3], avg_len)
+                else:
+                    for pos, d in enumerate(docs):
+                        if self._external[d] is None or (allowed is not None and d not in allowed):
+                            continue
+                        if d in acc:
+                            pass
+                        elif admit_new:
+                            acc[d] = 0.0
+                        else:
+                            continue
+                        acc[d] += ub if kind == 'skill' else self._bm25(key, pos, feature[3], avg_len)
+                if len(acc) >= top_k and remaining > 0:
+                    threshold = heapq.nlargest(top_k, acc.values())[-1]
+                    if remaining < threshold:
+                        # An unseen doc can score at most `remaining`: stop admitting new
+                        # docs and drop those that can no longer reach the top-k
+                        admit_new = False
+                        acc = {d: sc for d, sc in acc.items() if sc + remaining >= threshold}
+
+            if allowed is not None and len(acc) < top_k:
+                # Required-skill matches with no overlapping query features still qualify
+                for d in allowed:
+                    if d not in acc and self._external[d] is not None:
+                        acc[d] = 0.0
+            best = heapq.nlargest(top_k, acc.items(), key=lambda kv: (kv[1], -kv[0]))
+            return [{
+                'candidate_id': self._external[d],
+                'score': round(score, 4),
+                'matched_skills': sorted(self._doc_skills[d] & query_skills),
+            } for d, score in best]
+
+    def _bm25(self, term: str, pos: int, idf: float, avg_len: float) -> float:
+        d = self._term_docs[term][pos]
+        tf = self._term_tfs[term][pos]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[d] / avg_len) if avg_len else BM25_K1
+        return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    # ---- persistence ----
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            if self._dead_ratio() > 0:
+                self._compact_locked()
+            state = {k: v for k, v in self.__dict__.items() if k != '_lock'}
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CandidateIndex':
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        index._lock = threading.RLock()
+        return index
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS candidates (
+    candidate_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0,
+    text TEXT NOT NULL,
+    skills TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_seq ON candidates (seq);
+'''
+
+
+class CandidateStore:
+    """Latest text and skills of every candidate, shared by all workers. Connections are per thread."""
+
+    def __init__(self, path: str = CANDIDATES_DB):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if not self._schema_ready:
+                self.open()
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def open(self) -> 'CandidateStore':
+        with self._schema_lock:
+            if not self._schema_ready:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = self._connect()
+                try:
+                    conn.executescript(_SCHEMA)
+                finally:
+                    conn.close()
+                self._schema_ready = True
+        return self
+
+    def _write(self, candidate_id: str, removed: bool, text: str, skills: List[str]) -> bool:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT removed FROM candidates WHERE candidate_id = ?', (candidate_id,)).fetchone()
+            if removed and (row is None or row['removed']):
+                conn.execute('COMMIT')
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO candidates (candidate_id, seq, removed, text, skills) '
+                'VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM candidates), ?, ?, ?)',
+                (candidate_id, int(removed), text, json.dumps(skills)))
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def put(self, candidate_id: str, text: str, skills: List[str]) -> None:
+        self._write(candidate_id, False, text, skills)
+
+    def delete(self, candidate_id: str) -> bool:
+        """Tombstone a candidate; False if it is not indexed."""
+        return self._write(candidate_id, True, '', [])
+
+    def changes(self, after: int) -> List[sqlite3.Row]:
+        return self._conn().execute(
+            'SELECT * FROM candidates WHERE seq > ? ORDER BY seq', (after,)).fetchall()
+
+
+class SharedCandidateIndex:
+    """A per-process CandidateIndex kept in step with a CandidateStore."""
+
+    def __init__(self, store: CandidateStore = None, index: CandidateIndex = None):
+        self.store = store or CandidateStore()
+        self.index = index or CandidateIndex()
+        self._seen = 0
+        self._sync_lock = threading.Lock()
+
+    def sync(self) -> None:
+        """Apply the adds and removes written (by any worker) since the last sync."""
+        with self._sync_lock:
+            for row in self.store.changes(self._seen):
+                if row['removed']:
+                    self.index.remove(row['candidate_id'])
+                else:
+                    self.index.add(row['candidate_id'], row['text'], json.loads(row['skills']))
+                self._seen = row['seq']
+
+    def __len__(self) -> int:
+        self.sync()
+        return len(self.index)
+
+    def add(self, candidate_id: str, text: str, skills: Iterable[str] = None) -> None:
+        if skills is None:
+            skills = _extract_skills(text, self.index.skills_vocab, use_nlp=False)
+        self.store.put(candidate_id, text, list(skills))
+        self.sync()
+
+    def remove(self, candidate_id: str) -> bool:
+        removed = self.store.delete(candidate_id)
+        self.sync()
+        return removed
+
+    def search(self, job_description: str, top_k: int = 10, required_skills: List[str] = None) -> List[Dict[str, Any]]:
+        self.sync()
+        return self.index.search(job_description, top_k, required_skills)
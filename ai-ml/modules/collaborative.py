@@ -0,0 +1,261 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .resources import DATA_DIR, lazy_import
+except ImportError:
+    from resources import DATA_DIR, lazy_import
+
+# Collaborative-filtering course recommendations (implicit-feedback ALS).
+#
+# Interactions are (user, course, weight) events: the courses stored for a user in
+# user_data.Recommended_courses, weighted by that user's user_feedback score. They form
+# a sparse user x course matrix R (CSR arrays), factorised as in Hu, Koren & Volinsky:
+# preference p_ui = 1 where r_ui > 0, confidence c_ui = 1 + ALPHA * r_ui, and the user
+# and item factor matrices X, Y are solved alternately by regularised least squares.
+#
+# A course catalogue is small (tens to a few thousand items) while users run into the
+# millions, so the user step is batched: for a chunk of users the per-user k x k systems
+#     (Y'Y + reg*I + sum_i (c_ui - 1) y_i y_i') x_u = sum_i c_ui y_i
+# are never formed. A few conjugate-gradient steps, warm-started from the previous
+# iteration's factors, only need products with them, and for the whole chunk those are
+# dense matmuls against its (users x items) confidence block. The item step solves each
+# item's system exactly from a gather of its users' factors.
+#
+# Serving needs only the item factors (and Y'Y): a known user's factors are looked up,
+# anyone else is folded in from the courses the content-based engine picked, and all
+# items are scored with one dot product and an argpartition top-k. User factors and
+# their interactions are saved with the model so known users get their own vector and
+# do not see courses they already have.
+
+MODEL_PATH = os.environ.get('ML_CF_PATH', os.path.join(DATA_DIR, 'course_als.npz'))
+CF_BLEND = float(os.environ.get('ML_CF_BLEND', '0.3'))
+FACTORS = 32
+ALPHA = 20.0
+REG = 0.1
+CG_STEPS = 3
+USER_CHUNK = 4096
+
+
+def build_matrix(events: Iterable[Tuple[str, str, float]], items: Sequence[str] = ()):
+    """Sum (user, course, weight) events into CSR arrays.
+
+    Returns (user_ids, item_ids, indptr, indices, values); ``items`` fixes the order of
+    known courses, courses only seen in events are appended.
+    """
+    np = lazy_import('numpy')
+    item_index = {name: i for i, name in enumerate(items)}
+    item_ids = list(items)
+    user_index: Dict[str, int] = {}
+    cells: Dict[Tuple[int, int], float] = {}
+    for user, course, weight in events:
+        if not user or not course:
+            continue
+        u = user_index.setdefault(user, len(user_index))
+        i = item_index.get(course)
+        if i is None:
+            i = item_index[course] = len(item_ids)
+            item_ids.append(course)
+        cells[u, i] = cells.get((u, i), 0.0) + weight
+    keys = sorted(cells)
+    rows = np.fromiter((u for u, _ in keys), dtype=np.int64, count=len(keys))
+    indices = np.fromiter((i for _, i in keys), dtype=np.int32, count=len(keys))
+    values = np.fromiter((cells[k] for k in keys), dtype=np.float32, count=len(keys))
+    indptr = np.zeros(len(user_index) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(user_index)), out=indptr[1:])
+    return list(user_index), item_ids, indptr, indices, values
+
+
+def _user_step(indptr, indices, conf, Y, X, reg, cg_steps):
+    np = lazy_import('numpy')
+    n_users, (n_items, k) = len(indptr) - 1, Y.shape
+    gram = Y.T @ Y + reg * np.eye(k, dtype=np.float32)
+    for start in range(0, n_users, USER_CHUNK):
+        stop = min(start + USER_CHUNK, n_users)
+        lo, hi = indptr[start], indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+        W = np.zeros((stop - start, n_items), dtype=np.float32)  # c_ui - 1
+        W[rows, indices[lo:hi]] = conf[lo:hi] - 1.0
+        b = W @ Y
+        np.add.at(b, rows, Y[indices[lo:hi]])  # + sum_i y_i, i.e. b = sum_i c_ui y_i
+
+        def apply(v):
+            return v @ gram + (W * (v @ Y.T)) @ Y
+
+        x = X[start:stop]
+        r = b - apply(x)
+        p = r.copy()
+        rs = np.einsum('ij,ij->i', r, r)
+        for _ in range(cg_steps):
+            Ap = apply(p)
+            step = rs / np.maximum(np.einsum('ij,ij->i', p, Ap), 1e-20)
+            x += step[:, None] * p
+            r -= step[:, None] * Ap
+            rs_new = np.einsum('ij,ij->i', r, r)
+            p = r + (rs_new / np.maximum(rs, 1e-20))[:, None] * p
+            rs = rs_new
+    return X
+
+
+def _item_step(item_ptr, item_users, item_conf, X, reg):
+    np = lazy_import('numpy')
+    n_items, k = len(item_ptr) - 1, X.shape[1]
+    base = (X.T @ X).astype(np.float64) + reg * np.eye(k)
+    Y = np.zeros((n_items, k), dtype=np.float32)
+    for i in range(n_items):
+        lo, hi = item_ptr[i], item_ptr[i + 1]
+        if lo == hi:
+            continue
+        Xu = X[item_users[lo:hi]].astype(np.float64)
+        c = item_conf[lo:hi].astype(np.float64)
+        A = base + (Xu.T * (c - 1.0)) @ Xu
+        Y[i] = np.linalg.solve(A, Xu.T @ c)
+    return Y
+
+
+def train_als(indptr, indices, values, n_items: int, factors: int = FACTORS, iterations: int = 10,
+              alpha: float = ALPHA, reg: float = REG, cg_steps: int = CG_STEPS, seed: int = 0, callback=None):
+    """Implicit ALS on a CSR user x item matrix. Returns (user_factors, item_factors)."""
+    np = lazy_import('numpy')
+    conf = 1.0 + alpha * values.astype(np.float32)
+    # item-major copy of the matrix for the item step
+    order = np.argsort(indices, kind='stable')
+    user_of = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    item_users, item_conf = user_of[order], conf[order]
+    item_ptr = np.zeros(n_items + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_items), out=item_ptr[1:])
+
+    rng = np.random.default_rng(seed)
+    Y = (rng.standard_normal((n_items, factors)) * 0.01).astype(np.float32)
+    X = (rng.standard_normal((len(indptr) - 1, factors)) * 0.01).astype(np.float32)
+    for it in range(iterations):
+        _user_step(indptr, indices, conf, Y, X, reg, cg_steps)
+        Y = _item_step(item_ptr, item_users, item_conf, X, reg)
+        if callback is not None:
+            callback(it, X, Y)
+    return X, Y
+
+
+class CourseModel:
+    """Item factors plus (optionally) the trained users' factors and interactions."""
+
+    def __init__(self, items: Sequence[str], item_factors, reg: float = REG, alpha: float = ALPHA,
+                 user_ids: Sequence[str] = (), user_factors=None, user_ptr=None, user_items=None):
+        np = lazy_import('numpy')
+        self.items = list(items)
+        self.item_index = {name: i for i, name in enumerate(self.items)}
+        self.item_factors = np.ascontiguousarray(item_factors, dtype=np.float32)
+        self.reg, self.alpha = reg, alpha
+        Y = self.item_factors.astype(np.float64)
+        self.gram = Y.T @ Y + reg * np.eye(Y.shape[1])
+        self.users = {u: i for i, u in enumerate(user_ids)}
+        self.user_factors, self.user_ptr, self.user_items = user_factors, user_ptr, user_items
+
+    def fold_in(self, courses: Dict[str, float]):
+        """Factors of an unseen user from their (course -> weight) interactions, or None."""
+        np = lazy_import('numpy')
+        picked = [(self.item_index[c], w) for c, w in courses.items() if c in self.item_index and w > 0]
+        if not picked:
+            return None
+        idx = np.array([i for i, _ in picked])
+        conf = 1.0 + self.alpha * np.array([w for _, w in picked])
+        Yi = self.item_factors[idx].astype(np.float64)
+        A = self.gram + (Yi.T * (conf - 1.0)) @ Yi
+        return np.linalg.solve(A, Yi.T @ conf).astype(np.float32)
+
+    def user_vector(self, user_id: Optional[str]):
+        u = self.users.get(user_id) if user_id else None
+        return None if u is None or self.user_factors is None else self.user_factors[u]
+
+    def seen(self, user_id: Optional[str]) -> List[int]:
+        u = self.users.get(user_id) if user_id else None
+        if u is None or self.user_ptr is None:
+            return []
+        return self.user_items[self.user_ptr[u]:self.user_ptr[u + 1]].tolist()
+
+    def top_k(self, vector, k: int = 10, exclude: Iterable[int] = ()) -> List[Tuple[str, float]]:
+        np = lazy_import('numpy')
+        scores = self.item_factors @ vector
+        exclude = list(exclude)
+        if exclude:
+            scores[exclude] = -np.inf
+        k = min(k, len(scores) - len(exclude))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.items[i], float(scores[i])) for i in best]
+
+    def recommend(self, user_id: Optional[str] = None, courses: Optional[Dict[str, float]] = None,
+                  k: int = 10) -> List[Tuple[str, float]]:
+        vector = self.user_vector(user_id)
+        if vector is None and courses:
+            vector = self.fold_in(courses)
+        if vector is None:
+            return []
+        return self.top_k(vector, k, self.seen(user_id))
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        np = lazy_import('numpy')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {'items': np.array(self.items), 'item_factors': self.item_factors,
+                  'params': np.array([self.reg, self.alpha])}
+        if self.user_factors is not None:
+            # ids as one newline-joined byte buffer: a million-entry str array would not
+            # stay small on load
+            ids = sorted(self.users, key=self.users.get)
+            arrays.update(user_ids=np.frombuffer('\n'.join(ids).encode('utf-8'), dtype=np.uint8),
+                          user_factors=self.user_factors, user_ptr=self.user_ptr, user_items=self.user_items)
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH, users: bool = True) -> 'CourseModel':
+        np = lazy_import('numpy')
+        with np.load(path) as z:
+            reg, alpha = (float(v) for v in z['params'])
+            kwargs = {}
+            if users and 'user_factors' in z.files:
+                raw = z['user_ids'].tobytes().decode('utf-8')
+                kwargs = dict(user_ids=raw.split('\n') if raw else [], user_factors=z['user_factors'],
+                              user_ptr=z['user_ptr'], user_items=z['user_items'])
+            return cls([str(s) for s in z['items']], z['item_factors'], reg, alpha, **kwargs)
+
+
+def blend(content: List[Dict], model: Optional[CourseModel], links: Dict[str, str],
+          user_id: Optional[str] = None, k: int = 10, weight: float = CF_BLEND) -> List[Dict]:
+    """Re-rank content-based courses with collaborative scores and add CF-only picks.
+
+    Content courses score 1 - rank/n; CF scores are scaled by the best one. Without a
+    model (or a user vector to score with) the content ranking is returned unchanged.
+    """
+    if model is None or weight <= 0:
+        return content[:k]
+    n = len(content)
+    content_score = {c['title']: 1.0 - r / n for r, c in enumerate(content)}
+    cf = model.recommend(user_id, content_score, k + len(content))
+    cf = [(title, s) for title, s in cf if title in links and s > 0]
+    if not cf:
+        return content[:k]
+    top = cf[0][1]
+    cf_score = {title: s / top for title, s in cf}
+    titles = list(content_score) + [t for t in cf_score if t not in content_score]
+    ranked = sorted(titles, key=lambda t: -((1 - weight) * content_score.get(t, 0.0) + weight * cf_score.get(t, 0.0)))
+    return [{'title': t, 'link': links[t]} for t in ranked[:k]]
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def load_default() -> Optional[CourseModel]:
+    """The trained model at MODEL_PATH, or None without numpy or a model file."""
+    global _default
+    if lazy_import('numpy') is None or not os.path.exists(MODEL_PATH):
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = CourseModel.load(MODEL_PATH)
+    return _default
@@ -0,0 +1,310 @@
+import os
+import math
+import zlib
+import fcntl
+import heapq
+import struct
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .resources import DATA_DIR
+except ImportError:
+    from resources import DATA_DIR
+
+# Skill co-occurrence engine: "users with your skills also have ...".
+#
+# Every parsed resume (and every role profile, as a seed) is a set of skills. The model
+# keeps, per skill, the number of documents containing it and a sparse row of how often
+# each other skill appears alongside it; adding a resume only touches the rows of its
+# own skills. Suggestions for a skill set read those rows and rank neighbours by PMI
+# (log of observed over expected co-occurrence) or lift, summed over the input skills,
+# with a top-k heap instead of a full sort.
+#
+# Snapshots are a zlib-compressed binary file: vocabulary, per-skill counts and the
+# upper triangle of the count matrix in CSR arrays.
+#
+# Every process that parses resumes (each API worker, the Streamlit app) shares one
+# snapshot. A recorded resume is appended as one line to <snapshot>.log under a shared
+# flock on <snapshot>.lock; every SNAPSHOT_EVERY resumes a process compacts in the
+# background: under the exclusive lock it reads snapshot + log, writes a new snapshot
+# (unique temp file, then os.replace) and empties the log. Loading is snapshot + log,
+# so no process's counts are lost, and an unreadable snapshot falls back to the seeded
+# profiles. The in-memory model of a running process only has its own resumes on top
+# of what it loaded. Snapshot I/O errors are swallowed: learning is best effort and
+# must never fail the parse that feeds it.
+
+SNAPSHOT_PATH = os.environ.get('ML_COOCCURRENCE_PATH', os.path.join(DATA_DIR, 'skill_cooccurrence.bin'))
+SNAPSHOT_EVERY = int(os.environ.get('ML_COOCCURRENCE_SNAPSHOT_EVERY', '500'))
+MIN_PAIR_COUNT = 2
+PROFILE_WEIGHT = 5
+_MAGIC = b'SKCO1'
+
+# Role profiles seed the model so suggestions exist before any resume has been seen
+# (these were the fixed "recommended skills" lists in core/App.py)
+ROLE_PROFILES = {
+    'Data Science': ['Data Visualization', 'Predictive Analysis', 'Statistical Modeling', 'Data Mining',
+                     'Clustering & Classification', 'Data Analytics', 'Quantitative Analysis', 'Web Scraping',
+                     'ML Algorithms', 'Keras', 'Pytorch', 'Probability', 'Scikit-learn', 'Tensorflow', 'Flask',
+                     'Streamlit'],
+    'Web Development': ['React', 'Django', 'Node JS', 'React JS', 'php', 'laravel', 'Magento', 'wordpress',
+                        'Javascript', 'Angular JS', 'c#', 'Flask', 'SDK'],
+    'Android Development': ['Android', 'Android development', 'Flutter', 'Kotlin', 'XML', 'Java', 'Kivy', 'GIT',
+                            'SDK', 'SQLite'],
+    'IOS Development': ['IOS', 'IOS Development', 'Swift', 'Cocoa', 'Cocoa Touch', 'Xcode', 'Objective-C', 'SQLite',
+                        'Plist', 'StoreKit', 'UI-Kit', 'AV Foundation', 'Auto-Layout'],
+    'UI-UX Development': ['UI', 'User Experience', 'Adobe XD', 'Figma', 'Zeplin', 'Balsamiq', 'Prototyping',
+                          'Wireframes', 'Storyframes', 'Adobe Photoshop', 'Editing', 'Illustrator', 'After Effects',
+                          'Premier Pro', 'Indesign', 'Wireframe', 'Solid', 'Grasp', 'User Research'],
+}
+
+
+def _key(skill: str) -> str:
+    return ' '.join(skill.lower().split())
+
+
+class SkillCooccurrence:
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []           # display form, first seen wins
+        self.skill_docs = array('I')         # documents containing each skill
+        self.rows: List[Dict[int, int]] = []  # sparse co-occurrence rows
+        self.n_docs = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _id(self, skill: str, create: bool) -> Optional[int]:
+        key = _key(skill)
+        sid = self._ids.get(key)
+        if sid is None and create and key:
+            sid = self._ids[key] = len(self.names)
+            self.names.append(skill.strip())
+            self.skill_docs.append(0)
+            self.rows.append({})
+        return sid
+
+    def add(self, skills: Iterable[str], weight: int = 1) -> None:
+        """Count one document (resume or profile) with these skills."""
+        with self._lock:
+            ids = sorted({sid for sid in (self._id(s, True) for s in skills if s) if sid is not None})
+            if not ids:
+                return
+            self.n_docs += weight
+            for i, a in enumerate(ids):
+                self.skill_docs[a] += weight
+                row = self.rows[a]
+                for b in ids[i + 1:]:
+                    row[b] = row.get(b, 0) + weight
+                    other = self.rows[b]
+                    other[a] = other.get(a, 0) + weight
+            self.updates += 1
+
+    def related(self, skills: Iterable[str], top_k: int = 10, metric: str = 'pmi',
+                min_count: int = MIN_PAIR_COUNT) -> List[Dict]:
+        """Skills that co-occur with ``skills`` more than chance, best first."""
+        with self._lock:
+            own = {sid for sid in (self._id(s, False) for s in skills if s) if sid is not None}
+            if not own or not self.n_docs:
+                return []
+            n = self.n_docs
+            scores: Dict[int, float] = {}
+            support: Dict[int, int] = {}
+            for a in own:
+                ca = self.skill_docs[a]
+                for b, cab in self.rows[a].items():
+                    if b in own or cab < min_count:
+                        continue
+                    lift = cab * n / (ca * self.skill_docs[b])
+                    score = math.log(lift) if metric == 'pmi' else lift
+                    scores[b] = scores.get(b, 0.0) + score
+                    support[b] = support.get(b, 0) + cab
+            # PMI <= 0 (or lift <= 1) means no more often together than chance
+            floor = 0.0 if metric == 'pmi' else float(len(own))
+            candidates = ((b, s) for b, s in scores.items() if s > floor)
+            best = heapq.nlargest(top_k, candidates, key=lambda kv: (kv[1], support[kv[0]]))
+            return [{'skill': self.names[b], 'score': round(s, 4), 'cooccurrences': support[b],
+                     'documents': self.skill_docs[b]} for b, s in best]
+
+    # ---- snapshots ----
+
+    def save(self, path: str = SNAPSHOT_PATH) -> None:
+        with self._lock:
+            indptr, indices, counts = array('I', [0]), array('I'), array('I')
+            for a, row in enumerate(self.rows):
+                for b in sorted(k for k in row if k > a):
+                    indices.append(b)
+                    counts.append(row[b])
+                indptr.append(len(indices))
+            names = '\n'.join(self.names).encode('utf-8')
+            body = b''.join([
+                struct.pack('<III', self.n_docs, len(self.names), len(names)), names,
+                self.skill_docs.tobytes(), indptr.tobytes(), indices.tobytes(), counts.tobytes(),
+            ])
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_MAGIC + zlib.compress(body, 6))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_PATH) -> 'SkillCooccurrence':
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if not raw.startswith(_MAGIC):
+            raise ValueError(f'{path} is not a skill co-occurrence snapshot')
+        body = memoryview(zlib.decompress(raw[len(_MAGIC):]))
+        n_docs, n_skills, names_len = struct.unpack_from('<III', body)
+        pos = 12
+        names = bytes(body[pos:pos + names_len]).decode('utf-8').split('\n') if n_skills else []
+        pos += names_len
+
+        def take(count):
+            nonlocal pos
+            arr = array('I')
+            arr.frombytes(body[pos:pos + 4 * count])
+            pos += 4 * count
+            return arr
+
+        model = cls()
+        model.n_docs = n_docs
+        model.names = names
+        model._ids = {_key(name): i for i, name in enumerate(names)}
+        model.skill_docs = take(n_skills)
+        indptr = take(n_skills + 1)
+        indices = take(indptr[-1])
+        counts = take(indptr[-1])
+        model.rows = [{} for _ in range(n_skills)]
+        for a in range(n_skills):
+            row = model.rows[a]
+            for k in range(indptr[a], indptr[a + 1]):
+                b, c = indices[k], counts[k]
+                row[b] = c
+                model.rows[b][a] = c
+        return model
+
+
+def seeded() -> SkillCooccurrence:
+    model = SkillCooccurrence()
+    for skills in ROLE_PROFILES.values():
+        model.add(skills, weight=PROFILE_WEIGHT)
+    return model
+
+
+# ---- shared persistence (snapshot + append-only log) ----
+
+_UNREADABLE = (OSError, ValueError, EOFError, struct.error, zlib.error)
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def append_log(skills: Iterable[str], path: str = SNAPSHOT_PATH) -> None:
+    """Record one resume's skills in the shared log."""
+    line = '\t'.join(' '.join(s.split()) for s in skills if s and s.strip())
+    if not line:
+        return
+    with _locked(path, exclusive=False):
+        # one O_APPEND write per line, so concurrent appenders never interleave
+        fd = os.open(path + '.log', os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (line + '\n').encode('utf-8'))
+        finally:
+            os.close(fd)
+
+
+def _read(path: str) -> SkillCooccurrence:
+    try:
+        model = SkillCooccurrence.load(path) if os.path.exists(path) else seeded()
+    except _UNREADABLE:
+        model = seeded()
+    try:
+        with open(path + '.log', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.endswith('\n'):  # a line torn by a crash is skipped
+                    model.add(line[:-1].split('\t'))
+    except FileNotFoundError:
+        pass
+    return model
+
+
+def read_model(path: str = SNAPSHOT_PATH) -> SkillCooccurrence:
+    """The shared model: snapshot (or the seeded profiles) plus the log."""
+    with _locked(path, exclusive=False):
+        return _read(path)
+
+
+def compact(path: str = SNAPSHOT_PATH) -> SkillCooccurrence:
+    """Fold the log into a new snapshot and empty it."""
+    with _locked(path, exclusive=True):
+        model = _read(path)
+        model.save(path)
+        open(path + '.log', 'w').close()
+    return model
+
+
+_default = None
+_default_lock = threading.Lock()
+_logged = 0
+
+
+def default_model() -> SkillCooccurrence:
+    """Process-wide model, read from the shared snapshot and log on first use."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = read_model(SNAPSHOT_PATH)
+                except OSError:
+                    _default = seeded()
+    return _default
+
+
+def _compact_quietly() -> None:
+    try:
+        compact(SNAPSHOT_PATH)
+    except _UNREADABLE:
+        pass
+
+
+def record_resume(skills: Iterable[str]) -> None:
+    """Learn from a newly parsed resume; compact in the background every SNAPSHOT_EVERY."""
+    global _logged
+    skills = list(skills)
+    default_model().add(skills)
+    try:
+        append_log(skills, SNAPSHOT_PATH)
+    except OSError:
+        return
+    with _default_lock:
+        _logged += 1
+        if _logged < SNAPSHOT_EVERY:
+            return
+        _logged = 0
+    threading.Thread(target=_compact_quietly, name='cooccurrence-compact').start()
+
+
+def snapshot() -> None:
+    """Compact if this process logged anything since its last compaction (shutdown hook)."""
+    global _logged
+    with _default_lock:
+        if not _logged:
+            return
+        _logged = 0
+    _compact_quietly()
@@ -0,0 +1,108 @@
+import os
+import time
+import contextlib
+from typing import Dict, Iterator, List, Optional
+
+# Per-request time budgets for the parsing pipeline.
+#
+# A Deadline is created when a request arrives (ArrivalMiddleware, the outermost
+# middleware, stamps the arrival time, so time spent queued counts) and handed down
+# through text extraction and parsing. Before an optional, expensive stage (OCR of
+# scanned pages, spaCy noun chunking, the near-duplicate check) the stage asks
+# allows(): the expected cost is compared with what is left of the budget, and a stage
+# that does not fit is skipped and recorded, so the response can say which stages did
+# not run. Required work (the PDF text layer, the regex skill scan) always runs.
+#
+# Expected costs are learned: every timed stage updates an exponentially weighted
+# average of its cost per unit (per page for OCR, per 1000 characters for text stages),
+# starting from the defaults below. Requests without a budget still feed the averages.
+#
+# Settings (environment):
+#   ML_PARSE_DEADLINE_MS   default budget when the client sends none (default 0 = none)
+
+PARSE_DEADLINE_MS = float(os.environ.get('ML_PARSE_DEADLINE_MS', '0'))
+SAFETY_FACTOR = 1.5  # a stage needs this multiple of its expected cost to be started
+EWMA_WEIGHT = 0.2
+
+# initial expected seconds per unit, until measurements replace them
+STAGE_COSTS: Dict[str, float] = {
+    'ocr': 3.0,             # per page
+    'nlp_chunking': 0.02,   # per 1000 characters
+    'dedup': 0.002,         # per 1000 characters
+}
+
+
+def expected_cost(stage: str, units: float = 1.0) -> float:
+    return STAGE_COSTS.get(stage, 0.0) * units
+
+
+def observe(stage: str, seconds: float, units: float = 1.0) -> None:
+    if units <= 0:
+        return
+    per_unit = seconds / units
+    prior = STAGE_COSTS.get(stage)
+    STAGE_COSTS[stage] = per_unit if prior is None else prior + EWMA_WEIGHT * (per_unit - prior)
+
+
+class Deadline:
+    """Remaining time budget of one request; None budget means unbounded."""
+
+    __slots__ = ('expires', 'skipped')
+
+    def __init__(self, budget: Optional[float] = None, start: Optional[float] = None):
+        start = time.monotonic() if start is None else start
+        self.expires = None if budget is None else start + budget
+        self.skipped: List[str] = []
+
+    @classmethod
+    def from_ms(cls, ms: Optional[float], start: Optional[float] = None) -> 'Deadline':
+        return cls(ms / 1000.0 if ms and ms > 0 else None, start)
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires is not None
+
+    def remaining(self) -> float:
+        return float('inf') if self.expires is None else self.expires - time.monotonic()
+
+    def skip(self, stage: str) -> None:
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+
+    def allows(self, stage: str, units: float = 1.0) -> bool:
+        """True if the stage's expected cost fits in the remaining budget; records a skip otherwise."""
+        if self.expires is None or self.remaining() >= SAFETY_FACTOR * expected_cost(stage, units):
+            return True
+        self.skip(stage)
+        return False
+
+    def affordable(self, stage: str, units: int) -> int:
+        """How many of ``units`` (e.g. pages) fit in the remaining budget."""
+        if self.expires is None:
+            return units
+        per_unit = SAFETY_FACTOR * expected_cost(stage)
+        if per_unit <= 0:
+            return units
+        return max(0, min(units, int(self.remaining() / per_unit)))
+
+    @contextlib.contextmanager
+    def timed(self, stage: str, units: float = 1.0) -> Iterator[None]:
+        start = time.monotonic()
+        yield
+        observe(stage, time.monotonic() - start, units)
+
+
+def unbounded(deadline: Optional[Deadline]) -> Deadline:
+    return deadline if deadline is not None else Deadline()
+
+
+class ArrivalMiddleware:
+    """ASGI middleware recording when a request arrived, as ``request.state.arrived``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            scope.setdefault('state', {}).setdefault('arrived', time.monotonic())
+        await self.app(scope, receive, send)
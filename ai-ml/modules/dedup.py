@@ -0,0 +1,211 @@
+import os
+import re
+import zlib
+import random
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional
+
+try:
+    from .resources import lazy_import
+except ImportError:
+    from resources import lazy_import
+
+# Near-duplicate resume detection with MinHash + LSH.
+#
+# A resume's extracted text is reduced to a set of word shingles, and the set to a
+# NUM_PERM-value MinHash signature (the fraction of equal positions between two
+# signatures estimates the Jaccard similarity of the shingle sets). The signature is cut
+# into BANDS bands of ROWS values; two resumes become candidates when any band hashes
+# equal, and candidates are confirmed against THRESHOLD with the stored signatures.
+#
+# Memory per resume is kept flat and small so a million resumes fit in ~200 MB:
+#   - per band, one array('Q') of (band_hash << 32 | doc_id), kept sorted; a lookup is
+#     one bisect, recent inserts sit in a small dict until MERGE_EVERY of them (or an
+#     eighth of the index, whichever is larger) are merged in;
+#   - per doc, only the low byte of each MinHash value (b-bit MinHash) in one
+#     bytearray, enough to estimate similarity for the confirmation step;
+#   - refs (whatever the caller uses to find the prior analysis) in a list.
+# Full signatures are appended to a log file (when a path is given) and the index is
+# rebuilt from it on load.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = int(os.environ.get('ML_DEDUP_SHINGLE_WORDS', '3'))
+THRESHOLD = float(os.environ.get('ML_DEDUP_THRESHOLD', '0.8'))
+MERGE_EVERY = 20000
+SEED = 1
+_PRIME = 4294967291  # largest prime below 2**32: (a*x + b) stays below 2**64 for numpy
+_MASK32 = 0xFFFFFFFF
+_LOG_MAGIC = b'MHLSH1'
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+_rng = random.Random(SEED)
+_PERM_A = [_rng.randrange(1, _PRIME) for _ in range(NUM_PERM)]
+_PERM_B = [_rng.randrange(0, _PRIME) for _ in range(NUM_PERM)]
+
+
+class Match(NamedTuple):
+    ref: str
+    similarity: float
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> List[int]:
+    """32-bit hashes of the distinct k-word windows of normalised text."""
+    tokens = _TOKEN_RE.findall((text or '').lower())
+    if not tokens:
+        return []
+    k = min(k, len(tokens))
+    out = {zlib.crc32(' '.join(tokens[i:i + k]).encode('utf-8')) % _PRIME for i in range(len(tokens) - k + 1)}
+    return list(out)
+
+
+def signature(text: str) -> List[int]:
+    """NUM_PERM MinHash values of the text's shingle set ([] for text without words)."""
+    hashes = shingles(text)
+    if not hashes:
+        return []
+    np = lazy_import('numpy')  # resolved on first signature, not at import
+    if np is not None:
+        h = np.array(hashes, dtype=np.uint64)
+        a = np.array(_PERM_A, dtype=np.uint64)[:, None]
+        b = np.array(_PERM_B, dtype=np.uint64)[:, None]
+        return [int(v) for v in ((a * h + b) % _PRIME).min(axis=1)]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in zip(_PERM_A, _PERM_B)]
+
+
+def band_hashes(sig: List[int]) -> List[int]:
+    return [zlib.crc32(struct.pack(f'<{ROWS}I', *sig[i * ROWS:(i + 1) * ROWS]), i) for i in range(BANDS)]
+
+
+def estimate_similarity(sig_a: bytes, sig_b: bytes) -> float:
+    """Jaccard estimate from two b-bit (low byte) signatures, corrected for chance matches."""
+    equal = sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+    return max(0.0, (equal - 1 / 256) / (1 - 1 / 256))
+
+
+class DedupIndex:
+    def __init__(self, path: Optional[str] = None, threshold: float = THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._refs: List[str] = []
+        self._low = bytearray()
+        self._sorted = [array('Q') for _ in range(BANDS)]
+        self._delta: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._log = None
+        if path:
+            self._replay(path)
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._log = open(path, 'ab')
+            if new:
+                self._log.write(_LOG_MAGIC + struct.pack('<HH', NUM_PERM, BANDS))
+                self._log.flush()
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def _replay(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        sig_size = 4 * NUM_PERM
+        with open(path, 'rb') as f:
+            header = f.read(len(_LOG_MAGIC) + 4)
+            if not header:
+                return
+            if header[:len(_LOG_MAGIC)] != _LOG_MAGIC or struct.unpack('<HH', header[len(_LOG_MAGIC):]) != (NUM_PERM, BANDS):
+                raise ValueError(f'{path} was written with different MinHash parameters')
+            while True:
+                head = f.read(2)
+                if len(head) < 2:
+                    break
+                ref = f.read(struct.unpack('<H', head)[0])
+                raw = f.read(sig_size)
+                if len(raw) < sig_size:
+                    break  # torn final record
+                self._insert(ref.decode('utf-8'), list(struct.unpack(f'<{NUM_PERM}I', raw)))
+        self._merge()
+
+    def _insert(self, ref: str, sig: List[int]) -> int:
+        doc = len(self._refs)
+        self._refs.append(ref)
+        self._low.extend(v & 0xFF for v in sig)
+        for band, key in enumerate(band_hashes(sig)):
+            self._delta[band].setdefault(key, []).append(doc)
+        self._pending += 1
+        if self._pending >= max(MERGE_EVERY, len(self._refs) >> 3):
+            self._merge()
+        return doc
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        for band in range(BANDS):
+            merged = self._sorted[band]
+            merged.extend((key << 32) | doc for key, docs in self._delta[band].items() for doc in docs)
+            # timsort merges the already-sorted prefix with the new run in linear-ish time
+            self._sorted[band] = array('Q', sorted(merged))
+            self._delta[band] = {}
+        self._pending = 0
+
+    def _candidates(self, keys: List[int]) -> set:
+        found = set()
+        for band, key in enumerate(keys):
+            arr = self._sorted[band]
+            i = bisect_left(arr, key << 32)
+            while i < len(arr) and arr[i] >> 32 == key:
+                found.add(arr[i] & _MASK32)
+                i += 1
+            found.update(self._delta[band].get(key, ()))
+        return found
+
+    def _best(self, sig: List[int]) -> Optional[Match]:
+        # Empty signatures (scanned PDFs without a text layer) never match anything
+        if not sig:
+            return None
+        low = bytes(v & 0xFF for v in sig)
+        best = None
+        for doc in self._candidates(band_hashes(sig)):
+            sim = estimate_similarity(low, self._low[doc * NUM_PERM:(doc + 1) * NUM_PERM])
+            if sim >= self.threshold and (best is None or sim > best.similarity):
+                best = Match(self._refs[doc], round(sim, 4))
+        return best
+
+    def _add(self, ref: str, sig: List[int]) -> None:
+        if not sig:
+            return
+        self._insert(ref, sig)
+        if self._log is not None:
+            raw = ref.encode('utf-8')
+            self._log.write(struct.pack('<H', len(raw)) + raw + struct.pack(f'<{NUM_PERM}I', *sig))
+            self._log.flush()
+
+    def query(self, sig: List[int]) -> Optional[Match]:
+        """Most similar indexed resume at or above the threshold, or None."""
+        with self._lock:
+            return self._best(sig)
+
+    def add(self, ref: str, sig: List[int]) -> None:
+        with self._lock:
+            self._add(ref, sig)
+
+    def find_or_add(self, ref: str, sig: List[int]) -> Optional[Match]:
+        """Return the near-duplicate of ``sig`` if there is one, else index it under ``ref``."""
+        with self._lock:
+            match = self._best(sig)
+            if match is None:
+                self._add(ref, sig)
+            return match
+
+    def memory_bytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in self._sorted) + len(self._low)
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,81 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Iterator, List
+
+# Streaming DOCX text extraction.
+#
+# A .docx is a zip of XML parts. Instead of building python-docx's object model, the
+# parts that carry resume text are read with iterparse straight out of the zip: the
+# headers first (templates often put the name and contact line there), then
+# word/document.xml, then the footers. Every paragraph becomes one line, wherever it
+# sits: body, table cells, content controls or text boxes, whose paragraphs are nested
+# inside a run of the paragraph that anchors them and come out before it. Text boxes
+# are stored twice (DrawingML plus a VML copy under mc:Fallback); the fallback copy is
+# skipped. Elements are cleared as soon as their paragraph is emitted, so memory stays
+# flat however long the document is.
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+DOCUMENT_PART = 'word/document.xml'
+_PART_RE = re.compile(r'^word/(header|footer)(\d*)\.xml$')
+
+_P, _T, _TAB, _BR, _CR = W + 'p', W + 't', W + 'tab', W + 'br', W + 'cr'
+_NO_TEXT = {W + 'pPr', W + 'rPr', W + 'instrText', W + 'delText'}
+
+
+def _parts(names: List[str]) -> List[str]:
+    """Text-bearing parts in reading order: headers, document, footers."""
+    found = {'header': [], 'footer': []}
+    for name in names:
+        m = _PART_RE.match(name)
+        if m:
+            found[m.group(1)].append((int(m.group(2) or 0), name))
+    return ([n for _, n in sorted(found['header'])] + [DOCUMENT_PART] +
+            [n for _, n in sorted(found['footer'])])
+
+
+def _iter_part(stream) -> Iterator[str]:
+    paragraphs: List[List[str]] = []  # open paragraphs, innermost last (text boxes nest)
+    stack: List[ET.Element] = []
+    skip = 0  # depth inside elements whose text is not document text
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            stack.append(elem)
+            if skip or tag == MC_FALLBACK or tag in _NO_TEXT:
+                skip += 1
+            elif tag == _P:
+                paragraphs.append([])
+            continue
+        stack.pop()
+        if skip:
+            skip -= 1
+        elif paragraphs:
+            if tag == _T:
+                paragraphs[-1].append(elem.text or '')
+            elif tag == _TAB:
+                paragraphs[-1].append('\t')
+            elif tag in (_BR, _CR):
+                paragraphs[-1].append('\n')
+            elif tag == _P:
+                yield ''.join(paragraphs.pop())
+        # the subtree is consumed; the root and w:body also drop their finished children
+        elem.clear()
+        if 0 < len(stack) <= 2:
+            stack[-1].clear()
+
+
+def iter_docx_text(source: Any) -> Iterator[str]:
+    """Paragraph texts of a .docx (path or seekable binary file object), in reading order."""
+    with zipfile.ZipFile(source) as zf:
+        names = zf.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError('not a Word document: word/document.xml is missing')
+        for part in _parts(names):
+            with zf.open(part) as stream:
+                yield from _iter_part(stream)
+
+
+def read_docx_text(source: Any) -> str:
+    return '\n'.join(iter_docx_text(source))
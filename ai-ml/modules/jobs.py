@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .resources import DATA_DIR
+except ImportError:
+    from resources import DATA_DIR
+
+# Durable job queue for work that outlives an HTTP request (file parsing with OCR,
+# batch gap analysis). Jobs live in one SQLite database in WAL mode: submitting is a
+# single INSERT, so the API acknowledges immediately, and a pool of worker processes
+# claims jobs highest-priority-first. A claim is a lease that the worker renews every
+# HEARTBEAT_SECONDS while the handler runs, however long that takes; a worker that dies
+# mid-job stops renewing, its lease expires and the next claim picks the job up again.
+# The claiming attempt number identifies the lease holder: completing, failing or
+# renewing a job only takes effect while that attempt still holds it, so a worker whose
+# lease was taken over cannot overwrite the new holder's outcome.
+# Failed attempts are retried with exponential backoff up to max_attempts; finished
+# jobs keep their result until RESULT_TTL expires and are then purged. The database is
+# opened (and its schema created) on first use, not when a JobStore is constructed.
+#
+# Settings (environment):
+#   ML_JOBS_DB             database path (default <data dir>/jobs.sqlite3)
+#   ML_JOB_WORKERS         worker processes started by the service (default 2, 0 = none)
+#   ML_JOB_MAX_ATTEMPTS    attempts per job before it is marked failed (default 3)
+#   ML_JOB_LEASE_SECONDS   time without a heartbeat before a job is re-queued (default 60)
+#   ML_JOB_RESULT_TTL      seconds results are kept after completion (default 3600)
+
+JOBS_DB = os.environ.get('ML_JOBS_DB', os.path.join(DATA_DIR, 'jobs.sqlite3'))
+JOB_WORKERS = int(os.environ.get('ML_JOB_WORKERS', '2'))
+MAX_ATTEMPTS = int(os.environ.get('ML_JOB_MAX_ATTEMPTS', '3'))
+LEASE_SECONDS = float(os.environ.get('ML_JOB_LEASE_SECONDS', '60'))
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+RESULT_TTL = float(os.environ.get('ML_JOB_RESULT_TTL', '3600'))
+RETRY_BASE_SECONDS = 2.0
+POLL_INTERVAL = 0.2
+PURGE_INTERVAL = 60.0
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    blob BLOB,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    expires REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, run_after, created);
+CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires) WHERE expires IS NOT NULL;
+'''
+
+
+class UnknownJobKind(ValueError):
+    pass
+
+
+# ---- handlers (run inside the worker processes) ----
+
+def _parse_resume(payload: Dict, blob: Optional[bytes]) -> Dict:
+    try:
+        from .resume_parser import extract_text_generic, parse_resume_text
+    except ImportError:
+        from resume_parser import extract_text_generic, parse_resume_text
+    if blob is not None:
+        import io
+        text, ext = extract_text_generic(io.BytesIO(blob), payload.get('filename') or 'resume.pdf')
+    else:
+        text, ext = payload['resume_text'], '.txt'
+    return {'skills': parse_resume_text(text, payload.get('job_requirements'), None, ext)}
+
+
+def _batch(fn_name: str) -> Callable[[Dict, Optional[bytes]], Dict]:
+    def run(payload: Dict, blob: Optional[bytes]) -> Dict:
+        if fn_name == 'analyze_skill_gap':
+            try:
+                from .skill_gap_analyzer import analyze_skill_gap as fn
+            except ImportError:
+                from skill_gap_analyzer import analyze_skill_gap as fn
+        else:
+            try:
+                from .recommendation_engine import get_recommendations as fn
+            except ImportError:
+                from recommendation_engine import get_recommendations as fn
+        items = payload['items'] if 'items' in payload else [payload]
+        return {'results': [fn(item['current_skills'], item['target_skills']) for item in items]}
+    return run
+
+
+def _roadmap(payload: Dict, blob: Optional[bytes]) -> Dict:
+    try:
+        from .roadmap_generator import generate_roadmap
+    except ImportError:
+        from roadmap_generator import generate_roadmap
+    return generate_roadmap(payload['current_skills'], payload['target_skills'])
+
+
+HANDLERS: Dict[str, Callable[[Dict, Optional[bytes]], Any]] = {
+    'parse_resume': _parse_resume,
+    'skill_gap': _batch('analyze_skill_gap'),
+    'recommendations': _batch('get_recommendations'),
+    'roadmap': _roadmap,
+}
+
+
+# ---- store ----
+
+class JobStore:
+    """SQLite-backed queue. One instance per process; connections are per thread."""
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if not self._schema_ready:
+                self.open()
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def open(self) -> 'JobStore':
+        """Create the database and its schema if needed (otherwise done on first use)."""
+        with self._schema_lock:
+            if not self._schema_ready:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = self._connect()
+                try:
+                    conn.executescript(_SCHEMA)
+                finally:
+                    conn.close()
+                self._schema_ready = True
+        return self
+
+    def submit(self, kind: str, payload: Dict, blob: Optional[bytes] = None, priority: int = 0,
+               max_attempts: int = MAX_ATTEMPTS) -> str:
+        if kind not in HANDLERS:
+            raise UnknownJobKind(f'unknown job kind {kind!r}; expected one of {sorted(HANDLERS)}')
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._conn().execute(
+            'INSERT INTO jobs (id, kind, payload, blob, priority, status, max_attempts, run_after, created) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, json.dumps(payload), blob, priority, QUEUED, max(1, max_attempts), now, now))
+        return job_id
+
+    def claim(self, lease_seconds: float = LEASE_SECONDS) -> Optional[sqlite3.Row]:
+        """Take the next ready job (or one whose worker's lease expired), or None."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # jobs whose worker vanished after their last allowed attempt are not retried
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, blob = NULL, finished = ?, expires = ?, lease_until = NULL '
+                'WHERE status = ? AND lease_until < ? AND attempts >= max_attempts',
+                (FAILED, 'worker lost', now, now + RESULT_TTL, RUNNING, now))
+            row = conn.execute(
+                'SELECT id FROM jobs WHERE (status = ? AND run_after <= ?) OR (status = ? AND lease_until < ?) '
+                'ORDER BY priority DESC, run_after, created LIMIT 1',
+                (QUEUED, now, RUNNING, now)).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, started = ? WHERE id = ?',
+                (RUNNING, now + lease_seconds, now, row['id']))
+            job = conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+            conn.execute('COMMIT')
+            return job
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def renew(self, job_id: str, attempt: int, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend the lease of a running job; False if this attempt no longer holds it."""
+        cur = self._conn().execute(
+            'UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND attempts = ?',
+            (time.time() + lease_seconds, job_id, RUNNING, attempt))
+        return cur.rowcount > 0
+
+    def complete(self, job_id: str, attempt: int, result: Any, ttl: float = RESULT_TTL) -> bool:
+        """Record the result; False (and nothing written) if the lease was lost."""
+        now = time.time()
+        cur = self._conn().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = NULL, blob = NULL, finished = ?, expires = ?, '
+            'lease_until = NULL WHERE id = ? AND status = ? AND attempts = ?',
+            (DONE, json.dumps(result, default=str), now, now + ttl, job_id, RUNNING, attempt))
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, attempt: int, error: str, ttl: float = RESULT_TTL) -> bool:
+        """Re-queue with backoff, or mark failed once the attempts are used up; False (and
+        nothing written) if the lease was lost."""
+        now = time.time()
+        cur = self._conn().execute(
+            'UPDATE jobs SET '
+            'status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, '
+            'error = ?, '
+            'run_after = CASE WHEN attempts < max_attempts THEN ? + ? * (1 << (attempts - 1)) ELSE run_after END, '
+            'blob = CASE WHEN attempts < max_attempts THEN blob END, '
+            'finished = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END, '
+            'expires = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END, '
+            'lease_until = NULL '
+            'WHERE id = ? AND status = ? AND attempts = ?',
+            (QUEUED, FAILED, error, now, RETRY_BASE_SECONDS, now, now + ttl, job_id, RUNNING, attempt))
+        return cur.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            'SELECT id, kind, priority, status, attempts, max_attempts, created, started, finished, expires, '
+            'result, error FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None or (row['expires'] is not None and row['expires'] < time.time()):
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        if job['status'] == QUEUED:
+            job['queue_position'] = self._conn().execute(
+                'SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND created < ?))',
+                (QUEUED, job['priority'], job['priority'], job['created'])).fetchone()[0]
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not started yet."""
+        cur = self._conn().execute('DELETE FROM jobs WHERE id = ? AND status = ?', (job_id, QUEUED))
+        return cur.rowcount > 0
+
+    def purge_expired(self) -> int:
+        return self._conn().execute('DELETE FROM jobs WHERE expires IS NOT NULL AND expires < ?',
+                                    (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn().execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+
+# ---- workers ----
+
+def run_job(store: JobStore, job: sqlite3.Row, heartbeat: float = HEARTBEAT_SECONDS) -> bool:
+    """Run a claimed job, renewing its lease meanwhile; False if the lease was lost."""
+    finished = threading.Event()
+
+    def renew():
+        # its own thread, so its own connection (JobStore connections are per thread)
+        while not finished.wait(heartbeat):
+            if not store.renew(job['id'], job['attempts']):
+                return
+
+    beat = threading.Thread(target=renew, name='job-heartbeat', daemon=True)
+    beat.start()
+    try:
+        handler = HANDLERS[job['kind']]
+        result = handler(json.loads(job['payload']), job['blob'])
+    except Exception as e:
+        return store.fail(job['id'], job['attempts'], f'{type(e).__name__}: {e}')
+    finally:
+        finished.set()
+        beat.join()
+    return store.complete(job['id'], job['attempts'], result)
+
+
+def worker_main(db_path: str, stop_event=None) -> None:
+    """Worker process loop: claim, run, record; sleep briefly when the queue is empty."""
+    store = JobStore(db_path)
+    while stop_event is None or not stop_event.is_set():
+        job = store.claim()
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_job(store, job)
+
+
+class WorkerPool:
+    """Fixed-size pool of worker processes with a supervisor thread that restarts dead
+    workers and purges expired results."""
+
+    def __init__(self, db_path: str = JOBS_DB, processes: int = JOB_WORKERS):
+        self.db_path = db_path
+        self.size = processes
+        # spawn, not fork: the service is multi-threaded when the pool starts
+        self._ctx = multiprocessing.get_context('spawn')
+        self._stop = self._ctx.Event()
+        self._procs: List = []
+        self._supervisor = None
+        self.restarts = 0
+
+    def _spawn(self):
+        proc = self._ctx.Process(target=worker_main, args=(self.db_path, self._stop), daemon=True)
+        proc.start()
+        return proc
+
+    def start(self) -> 'WorkerPool':
+        JobStore(self.db_path).open()  # create the schema before the workers race to
+        self._procs = [self._spawn() for _ in range(self.size)]
+        self._supervisor = threading.Thread(target=self._supervise, name='job-supervisor', daemon=True)
+        self._supervisor.start()
+        return self
+
+    def _supervise(self) -> None:
+        store = JobStore(self.db_path)
+        last_purge = 0.0
+        while not self._stop.wait(1.0):
+            for i, proc in enumerate(self._procs):
+                if not proc.is_alive():
+                    self._procs[i] = self._spawn()
+                    self.restarts += 1
+            if time.time() - last_purge > PURGE_INTERVAL:
+                store.purge_expired()
+                last_purge = time.time()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+    def snapshot(self) -> Dict[str, int]:
+        return {'workers': sum(p.is_alive() for p in self._procs), 'restarts': self.restarts}
@@ -0,0 +1,56 @@
+import os
+import fcntl
+import threading
+from typing import IO, Optional
+
+try:
+    from .resources import DATA_DIR
+except ImportError:
+    from resources import DATA_DIR
+
+# One worker per host for process-wide duties.
+#
+# With several service workers (prefork.py, uvicorn --workers) every worker runs
+# main.py's startup and shutdown hooks. Work that must happen once per host (the job
+# worker pool, serving a Unix RPC socket bound in-process) only runs in the worker holding an
+# exclusive, non-blocking flock on a lock file in DATA_DIR. The kernel drops the lock
+# when that process exits, so the worker started in its place takes over. The lock is
+# taken on first use, in the worker: a lock taken before fork would be shared by every
+# child.
+#
+# Settings (environment):
+#   ML_LEADER_LOCK   lock file (default <data dir>/leader.lock)
+
+LEADER_LOCK = os.environ.get('ML_LEADER_LOCK', os.path.join(DATA_DIR, 'leader.lock'))
+
+_held: Optional[IO] = None
+_lock = threading.Lock()
+
+
+def acquire(path: str = LEADER_LOCK) -> bool:
+    """True if this process is (or has just become) the leader."""
+    global _held
+    with _lock:
+        if _held is not None:
+            return True
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        f = open(path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        _held = f
+        return True
+
+
+def is_leader() -> bool:
+    return _held is not None
+
+
+def release() -> None:
+    global _held
+    with _lock:
+        if _held is not None:
+            _held.close()
+            _held = None
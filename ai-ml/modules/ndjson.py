@@ -0,0 +1,87 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict
+
+try:
+    from .serialization import dumps_json
+except ImportError:
+    from serialization import dumps_json
+
+# Helpers for the NDJSON streaming endpoints: the request body is split into records as
+# it arrives, each record is processed in a worker thread with at most `concurrency`
+# records in flight, and results are written back in input order as soon as they are
+# ready. Memory is bounded by the concurrency window, not by the batch size.
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into non-empty lines."""
+    buf = b''
+    async for chunk in chunks:
+        buf += chunk
+        while True:
+            nl = buf.find(b'\n')
+            if nl < 0:
+                break
+            line, buf = buf[:nl], buf[nl + 1:]
+            if line.strip():
+                yield line
+        if len(buf) > max_line_bytes:
+            raise LineTooLong(f'NDJSON record exceeds {max_line_bytes} bytes')
+    if buf.strip():
+        yield buf
+
+
+async def iter_records(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Any]:
+    """Yield one decoded JSON value per line, or the decode error for bad lines."""
+    async for line in iter_lines(chunks, max_line_bytes):
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def dumps_line(obj: Dict) -> bytes:
+    return dumps_json(obj) + b'\n'
+
+
+async def map_ordered(records: AsyncIterator[Any], fn: Callable[[Any], Any], concurrency: int) -> AsyncIterator[Dict]:
+    """Run ``fn`` over ``records`` in threads, keeping at most ``concurrency`` in flight.
+
+    Yields ``{'index': i, 'result': ...}`` or ``{'index': i, 'error': ...}`` in input
+    order. Input is only pulled when a slot is free, so a slow consumer or a slow
+    record applies backpressure to the request body instead of buffering it.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+
+    def _call(record):
+        if isinstance(record, Exception):
+            raise record
+        return fn(record)
+
+    async def _drain_one():
+        index, fut = pending.popleft()
+        try:
+            return {'index': index, 'result': await fut}
+        except Exception as e:
+            return {'index': index, 'error': str(e)}
+
+    index = 0
+    try:
+        async for record in records:
+            pending.append((index, loop.run_in_executor(None, _call, record)))
+            index += 1
+            # Flush finished head-of-line results early so the first answer goes out
+            # as soon as it is ready, not when the window fills up.
+            while pending and (len(pending) >= concurrency or pending[0][1].done()):
+                yield await _drain_one()
+        while pending:
+            yield await _drain_one()
+    finally:
+        for _, fut in pending:
+            fut.cancel()
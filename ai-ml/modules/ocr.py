@@ -0,0 +1,188 @@
+import os
+import time
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+try:
+    from .resources import DATA_DIR, lazy_import
+except ImportError:
+    from resources import DATA_DIR, lazy_import
+
+# OCR fallback for image-only PDF pages. Pages are rasterised and run through a local
+# Tesseract in a dedicated, size-limited process pool so OCR never competes with the
+# request threads; results are cached on disk per page so re-uploads skip OCR entirely.
+#
+# Time limits: the caller waits for all of a document's pages together for at most one
+# overall timeout, so a document never holds a request for more than that however many
+# pages it has; pages still unfinished then are left out of the result. Inside the
+# worker, Tesseract and pdftoppm are subprocesses killed after ML_OCR_PAGE_TIMEOUT, but
+# pdfium renders in-process, in C code no Python-level timeout can interrupt. So when a
+# page is still running at the caller's deadline the whole pool is killed and replaced
+# on next use; pages of other documents running in it at that moment are lost too.
+#
+# Settings (environment):
+#   ML_OCR                 '0' disables OCR (default: enabled when the libs are installed)
+#   ML_OCR_MIN_CHARS       pages with fewer extracted characters are OCR'd (default 32)
+#   ML_OCR_WORKERS         process pool size (default 2)
+#   ML_OCR_MAX_PENDING     pages queued or running at once; extra pages are skipped (default 16)
+#   ML_OCR_PAGE_TIMEOUT    seconds allowed per page (default 20)
+#   ML_OCR_TIMEOUT         seconds a caller waits for all pages of a document (default 40)
+#   ML_OCR_DPI, ML_OCR_LANG
+
+OCR_ENABLED = os.environ.get('ML_OCR', '1') != '0'
+OCR_MIN_CHARS = int(os.environ.get('ML_OCR_MIN_CHARS', '32'))
+OCR_WORKERS = int(os.environ.get('ML_OCR_WORKERS', '2'))
+OCR_MAX_PENDING = int(os.environ.get('ML_OCR_MAX_PENDING', '16'))
+OCR_PAGE_TIMEOUT = float(os.environ.get('ML_OCR_PAGE_TIMEOUT', '20'))
+OCR_TIMEOUT = float(os.environ.get('ML_OCR_TIMEOUT', '40'))
+OCR_DPI = int(os.environ.get('ML_OCR_DPI', '200'))
+OCR_LANG = os.environ.get('ML_OCR_LANG', 'eng')
+OCR_CACHE_DIR = os.path.join(DATA_DIR, 'ocr_cache')
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(OCR_MAX_PENDING)
+
+
+def ocr_available() -> bool:
+    if not OCR_ENABLED or lazy_import('pytesseract') is None:
+        return False
+    return lazy_import('pypdfium2') is not None or lazy_import('pdf2image') is not None
+
+
+def _rasterize(pdf_bytes: bytes, page_index: int, dpi: int, timeout: float):
+    pdfium = lazy_import('pypdfium2')
+    if pdfium is not None:
+        # not interruptible here; the caller kills the pool if it overruns (see above)
+        doc = pdfium.PdfDocument(pdf_bytes)
+        try:
+            return doc[page_index].render(scale=dpi / 72).to_pil()
+        finally:
+            doc.close()
+    pdf2image = lazy_import('pdf2image')
+    # pdftoppm runs as a subprocess, which pdf2image kills after the timeout
+    images = pdf2image.convert_from_bytes(pdf_bytes, dpi=dpi, first_page=page_index + 1,
+                                          last_page=page_index + 1, timeout=max(1, int(timeout)))
+    return images[0]
+
+
+def _ocr_page(pdf_bytes: bytes, page_index: int, dpi: int, lang: str, timeout: float) -> str:
+    """Runs inside the OCR pool process; rasterising and OCR share the page timeout."""
+    pytesseract = lazy_import('pytesseract')
+    start = time.monotonic()
+    image = _rasterize(pdf_bytes, page_index, dpi, timeout)
+    remaining = timeout - (time.monotonic() - start)
+    if remaining <= 0:
+        raise TimeoutError('page timed out while rasterising')
+    # pytesseract kills the tesseract subprocess itself when the timeout expires
+    return pytesseract.image_to_string(image, lang=lang, timeout=remaining)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the service is multi-threaded when the pool starts
+                _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool's workers (stuck or already broken); the next _get_pool starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for proc in list((getattr(pool, '_processes', None) or {}).values()):
+        proc.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _cache_path(doc_digest: str, page_index: int) -> str:
+    return os.path.join(OCR_CACHE_DIR, doc_digest[:2], f'{doc_digest}-{page_index}.txt')
+
+
+def _cache_get(doc_digest: str, page_index: int) -> Optional[str]:
+    try:
+        with open(_cache_path(doc_digest, page_index), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _cache_put(doc_digest: str, page_index: int, text: str) -> None:
+    path = _cache_path(doc_digest, page_index)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def cached_pages(pdf_bytes: bytes, page_indexes: List[int]) -> Dict[int, str]:
+    """Text of the given pages that is already in the OCR cache; never runs OCR."""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    found = ((i, _cache_get(digest, i)) for i in page_indexes)
+    return {i: text for i, text in found if text is not None}
+
+
+def ocr_pages(pdf_bytes: bytes, page_indexes: List[int], timeout: float = None) -> Dict[int, str]:
+    """OCR the given zero-based pages of a PDF, waiting at most ``timeout`` seconds in all.
+
+    Returns text for the pages that were cached or finished in time. Pages that time
+    out, fail, or find the pool already saturated are simply left out, so callers keep
+    whatever text extraction produced for them.
+    """
+    if not page_indexes or not ocr_available():
+        return {}
+    timeout = OCR_TIMEOUT if timeout is None else timeout
+    expires = time.monotonic() + timeout
+    page_timeout = min(OCR_PAGE_TIMEOUT, timeout)
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    results = {}
+    futures = {}
+    for i in page_indexes:
+        cached = _cache_get(digest, i)
+        if cached is not None:
+            results[i] = cached
+            continue
+        if not _slots.acquire(blocking=False):
+            continue
+        pool = _get_pool()
+        try:
+            fut = pool.submit(_ocr_page, pdf_bytes, i, OCR_DPI, OCR_LANG, page_timeout)
+        except BrokenProcessPool:
+            _slots.release()
+            _recycle_pool(pool)
+            continue
+        except Exception:
+            _slots.release()
+            continue
+        fut.add_done_callback(lambda _f: _slots.release())
+        futures[i] = (pool, fut)
+    if futures:
+        wait([fut for _, fut in futures.values()], timeout=max(0.0, expires - time.monotonic()))
+    for i, (pool, fut) in futures.items():
+        if not fut.done():
+            if not fut.cancel():  # running past the deadline, e.g. stuck in a render
+                _recycle_pool(pool)
+            continue
+        try:
+            text = fut.result()
+        except BrokenProcessPool:
+            _recycle_pool(pool)  # a worker died (e.g. OOM in a render)
+            continue
+        except Exception:
+            continue
+        results[i] = text
+        try:
+            _cache_put(digest, i, text)
+        except OSError:
+            pass
+    return results
@@ -0,0 +1,164 @@
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+try:
+    from .resources import lazy_import
+except ImportError:
+    from resources import lazy_import
+
+# Page-parallel text extraction for long PDFs (portfolios, CVs with publication lists).
+#
+# pdfminer lays out one page at a time on one core. Above PARALLEL_MIN_PAGES pages the
+# document is copied once into a shared-memory block and its pages are split into
+# contiguous ranges; workers in a dedicated process pool attach to the block, open the
+# document straight from it (no per-task copy of the bytes) and extract only their
+# range. Every page pdfminer emits ends with a form feed, so joining the ranges in page
+# order gives exactly the serial output. Each task re-reads the cross-reference table,
+# so ranges are at least PAGES_PER_TASK pages. A pool left broken by a dead worker (OOM,
+# a crash on a malformed PDF) is replaced and the document retried once.
+#
+# Settings (environment):
+#   ML_PDF_PARALLEL_MIN_PAGES   page count from which a PDF is split (default 30, 0 = never)
+#   ML_PDF_WORKERS              process pool size (default: number of CPUs, at most 8)
+
+PARALLEL_MIN_PAGES = int(os.environ.get('ML_PDF_PARALLEL_MIN_PAGES', '30'))
+PDF_WORKERS = int(os.environ.get('ML_PDF_WORKERS', str(min(8, os.cpu_count() or 1))))
+PAGES_PER_TASK = 4
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class _SharedReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, for pdfminer's parser."""
+
+    def __init__(self, buf: memoryview):
+        self._buf = buf
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._buf)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._buf) - self._pos))
+        b[:n] = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        self._buf = memoryview(b'')
+        super().close()
+
+
+def page_count(source) -> int:
+    """Number of pages from the page tree, without laying anything out."""
+    parser_mod = lazy_import('pdfminer.pdfparser')
+    document_mod = lazy_import('pdfminer.pdfdocument')
+    pdftypes = lazy_import('pdfminer.pdftypes')
+    if parser_mod is None or document_mod is None:
+        return 0
+    doc = document_mod.PDFDocument(parser_mod.PDFParser(source))
+    try:
+        return int(pdftypes.resolve1(pdftypes.resolve1(doc.catalog['Pages'])['Count']))
+    except Exception:
+        pdfpage = lazy_import('pdfminer.pdfpage')
+        return sum(1 for _ in pdfpage.PDFPage.create_pages(doc))
+
+
+def _extract_range(shm_name: str, size: int, first: int, last: int) -> Tuple[int, str]:
+    """Runs inside the pool: text of pages [first, last) of the PDF in shared memory."""
+    from pdfminer.high_level import extract_text
+    # spawned workers share the parent's resource tracker, so attaching here does not
+    # hand the block's lifetime to the worker; the parent unlinks it
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        buf = shm.buf[:size]
+        reader = io.BufferedReader(_SharedReader(buf))
+        try:
+            return first, extract_text(reader, page_numbers=range(first, last)) or ''
+        finally:
+            reader.close()
+            buf.release()
+    finally:
+        shm.close()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        with _pool_lock:
+            if _pool is None or _pool_workers != workers:
+                if _pool is not None:
+                    _pool.shutdown(wait=False)
+                # spawn, not fork: the service is multi-threaded when the pool starts
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                _pool_workers = workers
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def page_ranges(pages: int, workers: int) -> List[Tuple[int, int]]:
+    """Contiguous [first, last) ranges: two per worker for balance, PAGES_PER_TASK minimum."""
+    tasks = max(1, min(workers * 2, pages // PAGES_PER_TASK))
+    step, extra = divmod(pages, tasks)
+    ranges, first = [], 0
+    for t in range(tasks):
+        last = first + step + (1 if t < extra else 0)
+        ranges.append((first, last))
+        first = last
+    return ranges
+
+
+def extract_text_parallel(data: bytes, pages: int, workers: Optional[int] = None) -> str:
+    """Extract all pages of the PDF in ``data`` across the pool, in page order."""
+    workers = workers or PDF_WORKERS
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    try:
+        shm.buf[:len(data)] = data
+        for attempt in (1, 2):
+            pool = _get_pool(workers)
+            try:
+                futures = [pool.submit(_extract_range, shm.name, len(data), first, last)
+                           for first, last in page_ranges(pages, workers)]
+                parts = sorted(f.result() for f in futures)
+                return ''.join(text for _, text in parts)
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                if attempt == 2:
+                    raise
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def enabled() -> bool:
+    return PARALLEL_MIN_PAGES > 0 and PDF_WORKERS > 1
+
+
+def wants_parallel(pages: int) -> bool:
+    return enabled() and pages >= PARALLEL_MIN_PAGES
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+# On-demand diagnostics for the ML service. Nothing here runs until an admin endpoint
+# asks for it: the CPU sampler is a loop in the requesting thread that lasts N seconds,
+# and tracemalloc is only started by an explicit call and stopped by another.
+
+MAX_PROFILE_SECONDS = 60.0
+MAX_SNAPSHOTS = 8
+KEY_TYPES = ('lineno', 'filename', 'traceback')  # tracemalloc statistics groupings
+
+# Leaf frames of threads that are parked rather than doing work
+IDLE_LEAVES = {
+    ('threading.py', 'wait'), ('selectors.py', 'select'), ('queue.py', 'get'),
+    ('thread.py', '_worker'), ('base_events.py', '_run_once'), ('connection.py', 'wait'),
+}
+
+_profile_lock = threading.Lock()
+_snapshots: 'OrderedDict[int, tracemalloc.Snapshot]' = OrderedDict()
+_snapshot_seq = 0
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, include_idle: bool = False) -> Dict[str, int]:
+    """Sample every thread's stack for `seconds` and return collapsed stacks.
+
+    Keys are ``thread;outer;...;leaf`` strings (the format flamegraph.pl and speedscope
+    read), values are sample counts. Only one profile may run at a time.
+    """
+    seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy('a profile is already running')
+    try:
+        me = threading.get_ident()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                leaf = frame.f_code
+                if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                counts[';'.join(reversed(stack))] += 1
+            time.sleep(interval)
+        return dict(counts)
+    finally:
+        _profile_lock.release()
+
+
+def collapsed_text(counts: Dict[str, int]) -> str:
+    return ''.join(f'{stack} {n}\n' for stack, n in sorted(counts.items(), key=lambda kv: -kv[1]))
+
+
+# ---- tracemalloc ----
+
+def tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def start_tracing(frames: int = 10) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, frames))
+
+
+def stop_tracing() -> None:
+    _snapshots.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _stat_row(stat) -> Dict:
+    frame = stat.traceback[0]
+    row = {'file': frame.filename, 'line': frame.lineno, 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+    if hasattr(stat, 'size_diff'):
+        row['size_diff_kb'] = round(stat.size_diff / 1024, 1)
+        row['count_diff'] = stat.count_diff
+    return row
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def _check_key_type(key_type: str) -> None:
+    if key_type not in KEY_TYPES:
+        raise ValueError(f'key_type must be one of {", ".join(KEY_TYPES)}')
+
+
+def take_snapshot(limit: int = 20, key_type: str = 'lineno') -> Dict:
+    """Store a snapshot (the oldest is dropped past MAX_SNAPSHOTS) and return its top sites."""
+    global _snapshot_seq
+    _check_key_type(key_type)
+    if not tracemalloc.is_tracing():
+        raise RuntimeError('tracemalloc is not running; start it first')
+    snapshot = _filtered(tracemalloc.take_snapshot())
+    _snapshot_seq += 1
+    _snapshots[_snapshot_seq] = snapshot
+    while len(_snapshots) > MAX_SNAPSHOTS:
+        _snapshots.popitem(last=False)
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        'id': _snapshot_seq,
+        'traced_kb': round(current / 1024, 1),
+        'peak_kb': round(peak / 1024, 1),
+        'top': [_stat_row(s) for s in snapshot.statistics(key_type)[:limit]],
+    }
+
+
+def diff_snapshots(base_id: int, current_id: Optional[int] = None, limit: int = 20,
+                   key_type: str = 'lineno') -> List[Dict]:
+    """Largest allocation changes between two stored snapshots (default: the latest)."""
+    _check_key_type(key_type)
+    if current_id is None:
+        current_id = next(reversed(_snapshots), None)
+    if base_id not in _snapshots or current_id not in _snapshots:
+        raise KeyError('unknown snapshot id')
+    stats = _snapshots[current_id].compare_to(_snapshots[base_id], key_type)
+    return [_stat_row(s) for s in stats[:limit]]
+
+
+def snapshot_ids() -> List[int]:
+    return list(_snapshots)
@@ -1,9 +1,17 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 try:
     from .Courses import ds_course, web_course, android_course, ios_course, uiux_course
 except Exception:
     # Fallback empty lists if Courses module is unavailable
     ds_course, web_course, android_course, ios_course, uiux_course = [], [], [], [], []
+try:
+    from .cooccurrence import default_model as cooccurrence_model
+except ImportError:
+    from cooccurrence import default_model as cooccurrence_model
+try:
+    from .collaborative import blend, load_default as collaborative_model
+except ImportError:
+    from collaborative import blend, load_default as collaborative_model
 
 
 CATEGORY_MAP = {
@@ -24,6 +32,9 @@ CATEGORY_MAP = {
     'figma': uiux_course,
 }
 
+COURSE_LINKS = {title: link for courses in (ds_course, web_course, android_course, ios_course, uiux_course)
+                for title, link in courses}
+
 
 def infer_categories(skills: List[str]) -> List[str]:
     s = ' '.join(skills).lower()
@@ -39,7 +50,7 @@ def infer_categories(skills: List[str]) -> List[str]:
     return list(cats)
 
 
-def get_recommendations(current_skills: List[str], target_skills: List[str]) -> Dict:
+def get_recommendations(current_skills: List[str], target_skills: List[str], user_id: Optional[str] = None) -> Dict:
     missing = [t for t in (target_skills or []) if t.lower() not in [c.lower() for c in current_skills or []]]
     cats = infer_categories(current_skills + missing)
     courses = []
@@ -52,8 +63,13 @@ def get_recommendations(current_skills: List[str], target_skills: List[str]) ->
         if title not in seen:
             unique_courses.append({'title': title, 'link': link})
             seen.add(title)
+    # Skills that people with this skill set usually also have (co-occurrence model)
+    related = [r['skill'] for r in cooccurrence_model().related(current_skills or [], 10)
+               if r['skill'].lower() not in {m.lower() for m in missing}]
     return {
         'categories': cats,
         'missingSkills': missing,
-        'courses': unique_courses[:10]
+        'relatedSkills': related,
+        # content-based picks re-ranked with what similar users took (no-op without a trained model)
+        'courses': blend(unique_courses, collaborative_model(), COURSE_LINKS, user_id)
     }
\ No newline at end of file
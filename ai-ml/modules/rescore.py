@@ -0,0 +1,88 @@
+import os
+from typing import Dict, Optional, Tuple
+
+try:
+    from .resume_classifier import load_default as load_classifier, rule_field, rule_level
+    from .resume_parser import extract_text_generic, parse_resume_text
+    from .sections import labels_present, section_score, segment
+    from .text_cache import TextCache, file_sha256
+    from .blob_store import BLOB_DIR, BlobStore
+except ImportError:
+    from resume_classifier import load_default as load_classifier, rule_field, rule_level
+    from resume_parser import extract_text_generic, parse_resume_text
+    from sections import labels_present, section_score, segment
+    from text_cache import TextCache, file_sha256
+    from blob_store import BLOB_DIR, BlobStore
+
+# Recomputing the derived columns of a stored user_data row (resume_score, Actual_skills,
+# Predicted_Field, User_level) from its uploaded file, with the current skill vocabulary,
+# section weights and classifier. rescore_row runs inside the worker processes of
+# tools/rescore_resumes.py; each worker opens the text cache and the upload store once
+# and reuses them. Uploads are found in the blob store by the name they were stored
+# under (whose sha256 is also the text cache key), then in the legacy upload folder; a
+# resume that was analysed before costs a cache lookup instead of a PDF parse.
+
+UPLOAD_DIR = os.environ.get('ML_UPLOAD_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                          'core', 'Uploaded_Resumes'))
+
+_cache: Optional[TextCache] = None
+_store: Optional[BlobStore] = None
+
+
+def init_worker(cache_path: str, upload_dir: str = UPLOAD_DIR, blob_dir: str = BLOB_DIR) -> None:
+    global _cache, _store, UPLOAD_DIR
+    _cache = TextCache(cache_path)
+    _store = BlobStore(blob_dir)
+    UPLOAD_DIR = upload_dir
+    load_classifier()  # load the model once per worker, not per row
+
+
+def locate(pdf_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """(sha256 or None, path or None) of a stored upload."""
+    sha = _store.lookup_name(pdf_name) if _store is not None and pdf_name else None
+    if sha is not None:
+        path = _store.path(sha, touch=False)  # batch reads should not keep blobs alive
+        if path is not None:
+            return sha, path
+    path = os.path.join(UPLOAD_DIR, pdf_name or '')
+    return None, (path if pdf_name and os.path.isfile(path) else None)
+
+
+def resume_text(path: str, sha: Optional[str] = None) -> Tuple[str, bool]:
+    """Text of an uploaded file and whether it came from the cache."""
+    sha = sha or file_sha256(path)
+    text = _cache.get(sha) if _cache is not None else None
+    if text is not None:
+        return text, True
+    text, _ = extract_text_generic(path)
+    if _cache is not None:
+        _cache.put(sha, text)
+    return text, False
+
+
+def rescore_text(text: str, pages: int) -> Dict:
+    sections = labels_present(segment(text))
+    skills = parse_resume_text(text)['skills']
+    classifier = load_classifier()
+    prediction = classifier.classify(text, skills, sorted(sections)) if classifier else None
+    field = prediction['field'] if prediction else rule_field(skills)
+    if pages < 1:
+        level = 'NA'
+    else:
+        level = prediction['level'] if prediction else rule_level(sections)
+    return {'resume_score': str(section_score(sections)), 'Actual_skills': str(skills),
+            'Predicted_Field': field, 'User_level': level}
+
+
+def rescore_row(row: Tuple[int, str, str]) -> Dict:
+    """(ID, pdf_name, Page_no) -> {'id', 'status', 'values'?, 'cached'?, 'error'?}."""
+    row_id, pdf_name, page_no = row
+    sha, path = locate(pdf_name)
+    if path is None:
+        return {'id': row_id, 'status': 'missing'}
+    try:
+        text, cached = resume_text(path, sha)
+        pages = int(page_no) if str(page_no).strip().isdigit() else 1
+        return {'id': row_id, 'status': 'ok', 'cached': cached, 'values': rescore_text(text, pages)}
+    except Exception as e:
+        return {'id': row_id, 'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
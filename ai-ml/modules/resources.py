@@ -0,0 +1,88 @@
+import os
+import importlib
+import threading
+from typing import Any, Optional
+
+# Heavy dependencies (spaCy, pdfminer, NLTK corpora) are loaded on first
+# use instead of at import time so the service starts quickly. Model and corpus data
+# are looked up in a local data directory and only downloaded when missing.
+
+DATA_DIR = os.environ.get(
+    'ML_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'),
+)
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA', os.path.join(DATA_DIR, 'nltk'))
+SPACY_DATA_DIR = os.path.join(DATA_DIR, 'spacy')
+SPACY_MODEL = os.environ.get('ML_SPACY_MODEL', 'en_core_web_sm')
+
+_MISSING = object()
+_lock = threading.Lock()
+_modules = {}
+_spacy_models = {}
+_nltk_checked = set()
+
+
+def lazy_import(name: str) -> Optional[Any]:
+    """Import a module on first use and memoise it. Returns None if it is not installed."""
+    mod = _modules.get(name, _MISSING)
+    if mod is not _MISSING:
+        return mod
+    with _lock:
+        mod = _modules.get(name, _MISSING)
+        if mod is _MISSING:
+            try:
+                mod = importlib.import_module(name)
+            except Exception:
+                mod = None
+            _modules[name] = mod
+    return mod
+
+
+def ensure_nltk_data(resource: str, category: str = 'corpora') -> bool:
+    """Make an NLTK resource available from the local data directory.
+
+    The lookup happens once per process; the download only runs when the resource
+    is not already on disk.
+    """
+    if resource in _nltk_checked:
+        return True
+    nltk = lazy_import('nltk')
+    if nltk is None:
+        return False
+    with _lock:
+        if resource in _nltk_checked:
+            return True
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        try:
+            nltk.data.find(f'{category}/{resource}')
+        except LookupError:
+            os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+            if not nltk.download(resource, download_dir=NLTK_DATA_DIR, quiet=True):
+                return False
+        _nltk_checked.add(resource)
+    return True
+
+
+def load_spacy_model(name: str = SPACY_MODEL) -> Optional[Any]:
+    """Load a spaCy pipeline once per process.
+
+    A copy saved under ``<data dir>/spacy/<name>`` is preferred over the installed
+    package. Returns None if spaCy or the model is unavailable.
+    """
+    nlp = _spacy_models.get(name, _MISSING)
+    if nlp is not _MISSING:
+        return nlp
+    spacy = lazy_import('spacy')
+    with _lock:
+        nlp = _spacy_models.get(name, _MISSING)
+        if nlp is _MISSING:
+            nlp = None
+            if spacy is not None:
+                local_path = os.path.join(SPACY_DATA_DIR, name)
+                try:
+                    nlp = spacy.load(local_path if os.path.isdir(local_path) else name)
+                except Exception:
+                    nlp = None
+            _spacy_models[name] = nlp
+    return nlp
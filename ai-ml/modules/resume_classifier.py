@@ -0,0 +1,262 @@
+import os
+import re
+import math
+import zlib
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .resources import DATA_DIR, lazy_import
+except ImportError:
+    from resources import DATA_DIR, lazy_import
+
+# Learned candidate-level and field classifier.
+#
+# A resume becomes a sparse feature vector: hashed word unigrams/bigrams of the text,
+# plus one feature per parsed skill and per detected section label, all hashed with
+# crc32 into HASH_BITS buckets (no vocabulary to store or keep in sync). Each head
+# (field, level) is a multinomial logistic regression: an (n_classes, 2**HASH_BITS)
+# float32 weight matrix and a bias, saved together in one .npz file. Weights are stored
+# class-major so each class's gather reads one contiguous row.
+#
+# Batches are scored as one sparse x dense product: every (doc, bucket, value) triple of
+# the batch is laid out CSR-style, each class's weights are gathered in one indexing call
+# and summed per doc with np.bincount, so thousands of resumes cost a single pass over
+# their non-zeros. The keyword rules App.py used before are kept as rule_field/rule_level:
+# they are the fallback when no trained model is present, and the weak labels the
+# training script can bootstrap from.
+
+HASH_BITS = int(os.environ.get('ML_CLASSIFIER_HASH_BITS', '16'))
+MODEL_PATH = os.environ.get('ML_CLASSIFIER_PATH', os.path.join(DATA_DIR, 'resume_classifier.npz'))
+
+FIELDS = ('Data Science', 'Web Development', 'Android Development', 'IOS Development', 'UI-UX Development', 'NA')
+LEVELS = ('Fresher', 'Intermediate', 'Experienced')
+
+# Keyword lists from the original App.py rules, checked against parsed skills in order
+FIELD_KEYWORDS = (
+    ('Data Science', ('tensorflow', 'keras', 'pytorch', 'machine learning', 'deep learning', 'flask', 'streamlit')),
+    ('Web Development', ('react', 'django', 'node js', 'react js', 'php', 'laravel', 'magento', 'wordpress',
+                         'javascript', 'angular js', 'c#', 'asp.net', 'flask')),
+    ('Android Development', ('android', 'android development', 'flutter', 'kotlin', 'xml', 'kivy')),
+    ('IOS Development', ('ios', 'ios development', 'swift', 'cocoa', 'cocoa touch', 'xcode')),
+    ('UI-UX Development', ('ux', 'adobe xd', 'figma', 'zeplin', 'balsamiq', 'ui', 'prototyping', 'wireframes',
+                           'storyframes', 'adobe photoshop', 'photoshop', 'editing', 'adobe illustrator',
+                           'illustrator', 'adobe after effects', 'after effects', 'adobe premier pro',
+                           'premier pro', 'adobe indesign', 'indesign', 'wireframe', 'solid', 'grasp',
+                           'user research', 'user experience')),
+    ('NA', ('english', 'communication', 'writing', 'microsoft office', 'leadership', 'customer management',
+            'social media')),
+)
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+
+
+def rule_field(skills: Iterable[str]) -> str:
+    """Field of the first skill found in a keyword list, '' when none matches."""
+    for skill in skills:
+        s = skill.lower()
+        for field, keywords in FIELD_KEYWORDS:
+            if s in keywords:
+                return field
+    return ''
+
+
+def rule_level(sections: Iterable[str]) -> str:
+    sections = set(sections)
+    if 'internships' in sections:
+        return 'Intermediate'
+    if 'experience' in sections:
+        return 'Experienced'
+    return 'Fresher'
+
+
+def _bucket(feature: str, mask: int) -> int:
+    return zlib.crc32(feature.encode('utf-8')) & mask
+
+
+def featurize(text: str, skills: Sequence[str] = (), sections: Sequence[str] = (),
+              hash_bits: int = HASH_BITS) -> Dict[int, float]:
+    """Hashed, L2-normalised feature vector of one resume as {bucket: value}."""
+    mask = (1 << hash_bits) - 1
+    counts: Dict[int, float] = {}
+    tokens = _TOKEN_RE.findall((text or '').lower())
+    for i, tok in enumerate(tokens):
+        b = _bucket('w:' + tok, mask)
+        counts[b] = counts.get(b, 0.0) + 1.0
+        if i:
+            b = _bucket('b:' + tokens[i - 1] + ' ' + tok, mask)
+            counts[b] = counts.get(b, 0.0) + 1.0
+    # log-scaled term counts so long resumes do not drown the skill/section features
+    feats = {b: 1.0 + math.log(c) for b, c in counts.items()}
+    for skill in skills:
+        b = _bucket('s:' + skill.lower(), mask)
+        feats[b] = feats.get(b, 0.0) + 2.0
+    for label in sections:
+        b = _bucket('h:' + label, mask)
+        feats[b] = feats.get(b, 0.0) + 2.0
+    norm = sum(v * v for v in feats.values()) ** 0.5 or 1.0
+    return {b: v / norm for b, v in feats.items()}
+
+
+def to_csr(rows: Sequence[Dict[int, float]]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """Stack feature dicts into CSR arrays (indptr, indices, values)."""
+    np = lazy_import('numpy')
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(r) for r in rows])
+    indices = np.fromiter((b for r in rows for b in r), dtype=np.int64, count=int(indptr[-1]))
+    values = np.fromiter((v for r in rows for v in r.values()), dtype=np.float32, count=int(indptr[-1]))
+    return indptr, indices, values
+
+
+def sparse_dot(indptr, indices, values, weights) -> 'np.ndarray':
+    """(n_docs, n_features) CSR matrix times the transpose of a (k, n_features) matrix."""
+    np = lazy_import('numpy')
+    n_docs = len(indptr) - 1
+    rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+    # k is a handful of classes: per class, gather its weights for every non-zero of the
+    # batch and sum them per doc
+    return np.stack([np.bincount(rows, weights=w[indices] * values, minlength=n_docs)
+                     for w in weights], axis=1).astype(np.float32)
+
+
+def softmax(z: 'np.ndarray') -> 'np.ndarray':
+    np = lazy_import('numpy')
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class LinearHead:
+    """Multinomial logistic regression over hashed features."""
+
+    def __init__(self, labels: Sequence[str], weights, bias):
+        self.labels = tuple(labels)
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def zeros(cls, labels: Sequence[str], hash_bits: int = HASH_BITS) -> 'LinearHead':
+        np = lazy_import('numpy')
+        return cls(labels, np.zeros((len(labels), 1 << hash_bits), dtype=np.float32),
+                   np.zeros(len(labels), dtype=np.float32))
+
+    def predict_proba(self, csr) -> 'np.ndarray':
+        return softmax(sparse_dot(*csr, self.weights) + self.bias)
+
+    def predict(self, csr) -> List[str]:
+        return [self.labels[i] for i in self.predict_proba(csr).argmax(axis=1)]
+
+    def fit(self, csr, y: 'np.ndarray', epochs: int = 20, lr: float = 0.5, l2: float = 1e-5,
+            batch_size: int = 128, seed: int = 0) -> List[float]:
+        """Mini-batch AdaGrad on the cross-entropy loss; returns the per-epoch mean loss.
+
+        Per-weight step sizes matter here: hashed text buckets are dense and small
+        valued while skill/section buckets are rare, so one global rate either
+        stalls the rare features or overshoots the common ones.
+        """
+        np = lazy_import('numpy')
+        n = len(csr[0]) - 1
+        rng = np.random.default_rng(seed)
+        onehot = np.eye(len(self.labels), dtype=np.float32)[y]
+        g2_w = np.full_like(self.weights, 1e-8)
+        g2_b = np.full_like(self.bias, 1e-8)
+        losses = []
+        for _ in range(epochs):
+            order = rng.permutation(n)
+            total = 0.0
+            for start in range(0, n, batch_size):
+                batch = order[start:start + batch_size]
+                sub_ptr, sub_idx, sub_val = _take_rows(csr, batch)
+                p = self.predict_proba((sub_ptr, sub_idx, sub_val))
+                target = onehot[batch]
+                total += float(-np.log(np.maximum((p * target).sum(axis=1), 1e-9)).sum())
+                err = (p - target) / len(batch)
+                rows = np.repeat(np.arange(len(batch)), np.diff(sub_ptr))
+                # gradient only for the buckets this batch touches
+                touched, inverse = np.unique(sub_idx, return_inverse=True)
+                grad = np.stack([np.bincount(inverse, weights=sub_val * err[rows, c], minlength=len(touched))
+                                 for c in range(len(self.labels))]).astype(np.float32)
+                grad += l2 * self.weights[:, touched]
+                g2_w[:, touched] += grad * grad
+                self.weights[:, touched] -= lr * grad / np.sqrt(g2_w[:, touched])
+                grad_b = err.sum(axis=0)
+                g2_b += grad_b * grad_b
+                self.bias -= lr * grad_b / np.sqrt(g2_b)
+            losses.append(total / max(n, 1))
+        return losses
+
+
+def _take_rows(csr, rows) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    np = lazy_import('numpy')
+    indptr, indices, values = csr
+    starts, ends = indptr[rows], indptr[rows + 1]
+    lengths = ends - starts
+    sub_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    sub_ptr[1:] = np.cumsum(lengths)
+    pick = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) if len(rows) else np.zeros(0, np.int64)
+    return sub_ptr, indices[pick], values[pick]
+
+
+class ResumeClassifier:
+    def __init__(self, field: LinearHead, level: LinearHead, hash_bits: int = HASH_BITS):
+        self.field = field
+        self.level = level
+        self.hash_bits = hash_bits
+
+    @classmethod
+    def untrained(cls, hash_bits: int = HASH_BITS) -> 'ResumeClassifier':
+        return cls(LinearHead.zeros(FIELDS, hash_bits), LinearHead.zeros(LEVELS, hash_bits), hash_bits)
+
+    def vectorize(self, docs: Sequence[Dict]):
+        """docs are dicts with 'text', 'skills' and 'sections' (section labels)."""
+        return to_csr([featurize(d.get('text', ''), d.get('skills') or (), d.get('sections') or (), self.hash_bits)
+                       for d in docs])
+
+    def classify_batch(self, docs: Sequence[Dict]) -> List[Dict]:
+        csr = self.vectorize(docs)
+        field_p = self.field.predict_proba(csr)
+        level_p = self.level.predict_proba(csr)
+        out = []
+        for fp, lp in zip(field_p, level_p):
+            fi, li = int(fp.argmax()), int(lp.argmax())
+            out.append({
+                'field': self.field.labels[fi], 'field_confidence': round(float(fp[fi]), 4),
+                'level': self.level.labels[li], 'level_confidence': round(float(lp[li]), 4),
+            })
+        return out
+
+    def classify(self, text: str, skills: Sequence[str] = (), sections: Sequence[str] = ()) -> Dict:
+        return self.classify_batch([{'text': text, 'skills': skills, 'sections': sections}])[0]
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        np = lazy_import('numpy')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + '.tmp.npz'
+        np.savez_compressed(
+            tmp, hash_bits=np.int64(self.hash_bits),
+            field_labels=np.array(self.field.labels), field_w=self.field.weights, field_b=self.field.bias,
+            level_labels=np.array(self.level.labels), level_w=self.level.weights, level_b=self.level.bias)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> 'ResumeClassifier':
+        np = lazy_import('numpy')
+        with np.load(path) as z:
+            return cls(LinearHead([str(s) for s in z['field_labels']], z['field_w'], z['field_b']),
+                       LinearHead([str(s) for s in z['level_labels']], z['level_w'], z['level_b']),
+                       int(z['hash_bits']))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def load_default() -> Optional[ResumeClassifier]:
+    """The trained model at MODEL_PATH, or None without numpy or a weights file."""
+    global _default
+    if lazy_import('numpy') is None or not os.path.exists(MODEL_PATH):
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = ResumeClassifier.load(MODEL_PATH)
+    return _default
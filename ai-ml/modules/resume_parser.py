@@ -1,24 +1,37 @@
 import os
-import io
 import re
 import json
-from typing import Dict, List, Any, Tuple
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 
-# Optional imports guarded to avoid hard failures in environments without these libs
 try:
-    import spacy
-except Exception:
-    spacy = None
-
-try:
-    from pdfminer.high_level import extract_text as pdf_extract_text
-except Exception:
-    pdf_extract_text = None
-
-try:
-    import docx  # python-docx
-except Exception:
-    docx = None
+    from .resources import lazy_import, load_spacy_model
+    from .ocr import OCR_MIN_CHARS, cached_pages, ocr_available, ocr_pages
+    from .deadline import Deadline, unbounded
+    from . import pdf_parallel
+    from .docx_stream import read_docx_text
+    from .sections import segment, paragraphs, has_headers, raw_date_ranges, resolve_ranges, months_covered
+except ImportError:
+    # Allow running this file directly as a script (see the harness at the bottom)
+    from resources import lazy_import, load_spacy_model
+    from ocr import OCR_MIN_CHARS, cached_pages, ocr_available, ocr_pages
+    from deadline import Deadline, unbounded
+    import pdf_parallel
+    from docx_stream import read_docx_text
+    from sections import segment, paragraphs, has_headers, raw_date_ranges, resolve_ranges, months_covered
+
+# spaCy and pdfminer are imported on first use (see resources.py) so that
+# importing this module stays cheap; each reader still fails softly if a lib is missing.
+#
+# Extraction runs per paragraph (blank-line separated, within a section) and the
+# per-paragraph results are merged with set unions, an interval union and a max, none
+# of which depend on paragraph order. Given a ChunkCache, results are kept under the
+# hash of the paragraph text, so re-analysing an edited resume only extracts from the
+# paragraphs that changed; the merged result is the same as with an empty cache.
+
+CHUNK_CACHE_SIZE = int(os.environ.get('ML_CHUNK_CACHE_SIZE', '50000'))
 
 
 DEFAULT_SKILLS = [
@@ -31,46 +44,117 @@ DEGREE_KEYWORDS = [
     'bachelor','master','phd','b.tech','m.tech','bsc','msc','bs','ms','be','me','mba','degree','diploma'
 ]
 
-
-def _read_txt(path: str) -> str:
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+# Sections each extractor reads (see sections.py); resumes without recognisable headers
+# fall back to the full text, except for job date ranges: outside an experience section
+# they are as likely to be education or project dates, so a resume without one only
+# gets credit for an explicit "N years" mention.
+SKILL_SECTIONS = ('summary', 'experience', 'internships', 'skills', 'projects', 'certifications', 'achievements')
+DEGREE_SECTIONS = ('education',)
+EXPERIENCE_SECTIONS = ('experience',)
+YEARS_MENTION_SECTIONS = ('summary', 'experience')
+
+
+def _read_txt(source: Any) -> str:
+    if hasattr(source, 'read'):
+        data = source.read()
+        return data.decode('utf-8', errors='ignore') if isinstance(data, bytes) else data
+    with open(source, 'r', encoding='utf-8', errors='ignore') as f:
         return f.read()
 
 
-def _read_pdf(path: str) -> str:
-    if pdf_extract_text is None:
+def _read_pdf(source: Any, deadline: Optional[Deadline] = None) -> str:
+    pdfminer = lazy_import('pdfminer.high_level')
+    if pdfminer is None:
         raise ImportError('pdfminer.six not available for PDF extraction')
-    return pdf_extract_text(path) or ''
+    text = None
+    pages = _pdf_page_count(source) if pdf_parallel.enabled() else 0
+    if pdf_parallel.wants_parallel(pages):
+        try:
+            text = pdf_parallel.extract_text_parallel(_read_bytes(source), pages)
+        except Exception:
+            text = None  # pool unavailable or broken: fall back to the serial path
+    if text is None:
+        if hasattr(source, 'read'):
+            source.seek(0)
+        text = pdfminer.extract_text(source) or ''
+    return _ocr_sparse_pages(source, text, deadline)
+
 
+def _pdf_page_count(source: Any) -> int:
+    """Page count for choosing the parallel path; 0 if the PDF cannot be read."""
+    try:
+        if hasattr(source, 'read'):
+            source.seek(0)
+            try:
+                return pdf_parallel.page_count(source)
+            finally:
+                source.seek(0)
+        with open(source, 'rb') as f:
+            return pdf_parallel.page_count(f)
+    except Exception:
+        return 0
+
+
+def _read_bytes(source: Any) -> bytes:
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
 
-def _read_docx(path: str) -> str:
-    if docx is None:
-        raise ImportError('python-docx not available for DOCX extraction')
-    doc = docx.Document(path)
-    return '\n'.join([p.text for p in doc.paragraphs])
 
+def _ocr_sparse_pages(source: Any, text: str, deadline: Optional[Deadline] = None) -> str:
+    """Replace near-empty pages (scans) with OCR output; text-only PDFs return untouched.
 
-def extract_text_generic(source: Any) -> Tuple[str, str]:
+    Cached pages are always used; pages that still need OCR are limited to what fits in
+    the deadline, the rest keep their (empty) text layer.
+    """
+    # pdfminer ends every page with a form feed, so the last split element is not a page
+    pages = text.split('\x0c')
+    sparse = [i for i, page in enumerate(pages[:-1]) if len(page.strip()) < OCR_MIN_CHARS]
+    if not sparse or not ocr_available():
+        return text
+    deadline = unbounded(deadline)
+    data = _read_bytes(source)
+    recovered = cached_pages(data, sparse)
+    todo = [i for i in sparse if i not in recovered]
+    picked = todo[:deadline.affordable('ocr', len(todo))]
+    if len(picked) < len(todo):
+        deadline.skip('ocr_partial' if picked else 'ocr')
+    if picked:
+        timeout = deadline.remaining() if deadline.bounded else None
+        with deadline.timed('ocr', len(picked)):
+            recovered.update(ocr_pages(data, picked, timeout))
+    for i, page_text in recovered.items():
+        pages[i] = page_text
+    return '\x0c'.join(pages)
+
+
+def _read_docx(source: Any) -> str:
+    # streamed from the zip (docx_stream.py): tables, text boxes, headers and footers included
+    if hasattr(source, 'read'):
+        source.seek(0)
+    return read_docx_text(source)
+
+
+def extract_text_generic(source: Any, name: str = None, deadline: Optional[Deadline] = None) -> Tuple[str, str]:
     """Extract text from PDF, DOCX, or TXT.
+    `source` is a path or a seekable binary file object (BytesIO, spooled upload);
+    for file objects the extension comes from `name` or the object's name attribute.
+    With a `deadline`, OCR of scanned PDF pages is limited to the remaining budget.
     Returns (text, extension)
     """
-    if isinstance(source, io.BytesIO):
-        # Heuristic: use name attribute if present
-        name = getattr(source, 'name', 'resume.txt')
-        ext = os.path.splitext(name)[1].lower()
-        tmp_path = os.path.join(os.getcwd(), f"_tmp_resume{ext or '.txt'}")
-        with open(tmp_path, 'wb') as f:
-            f.write(source.getvalue())
-        text, _ = extract_text_generic(tmp_path)
-        os.remove(tmp_path)
-        return text, ext
-
-    # If source is a path
-    ext = os.path.splitext(source)[1].lower()
+    if hasattr(source, 'read'):
+        # Readers take file objects directly, so buffers never touch the disk here
+        name = name or getattr(source, 'name', None)
+        name = name if isinstance(name, str) else 'resume.txt'
+    else:
+        name = name or source
+    ext = os.path.splitext(name)[1].lower()
     if ext in ['.txt', '.md']:
         return _read_txt(source), ext
     if ext in ['.pdf']:
-        return _read_pdf(source), ext
+        return _read_pdf(source, deadline), ext
     if ext in ['.docx']:
         return _read_docx(source), ext
     # Fallback: treat as text
@@ -98,22 +182,25 @@ def _extract_name(text: str) -> str:
     return ' '.join(tokens[:3])
 
 
-def _extract_skills(text: str, skills_vocab: List[str]) -> List[str]:
+def _extract_skills(text: str, skills_vocab: List[str], use_nlp: bool = True,
+                    deadline: Optional[Deadline] = None) -> List[str]:
     lower = text.lower()
     found = set()
     for s in skills_vocab:
         if re.search(rf'\b{re.escape(s.lower())}\b', lower):
             found.add(s)
-    # Optional NLP noun chunking if spaCy is available
-    if spacy:
+    # Optional NLP noun chunking if spaCy is available (model loaded once per process)
+    nlp = load_spacy_model() if use_nlp else None
+    deadline = unbounded(deadline)
+    if nlp is not None and deadline.allows('nlp_chunking', len(text) / 1000):
         try:
-            nlp = spacy.load('en_core_web_sm')
-            doc = nlp(text)
-            for chunk in doc.noun_chunks:
-                t = chunk.text.lower().strip()
-                for s in skills_vocab:
-                    if s.lower() in t:
-                        found.add(s)
+            with deadline.timed('nlp_chunking', len(text) / 1000):
+                doc = nlp(text)
+                for chunk in doc.noun_chunks:
+                    t = chunk.text.lower().strip()
+                    for s in skills_vocab:
+                        if s.lower() in t:
+                            found.add(s)
         except Exception:
             pass
     return sorted(found)
@@ -138,6 +225,91 @@ def _extract_experience_years(text: str) -> float:
     return years
 
 
+class ChunkCache:
+    """Bounded LRU of per-paragraph extraction results, keyed by content hash."""
+
+    def __init__(self, max_entries: int = CHUNK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, field: str) -> Tuple[bool, Any]:
+        """(True, value) if ``field`` is cached for the paragraph, else (False, None)."""
+        with self._lock:
+            fields = self._entries.get(key)
+            if fields is None or field not in fields:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, fields[field]
+
+    def update(self, key: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            # entries are replaced, never mutated, so readers can hold on to them
+            self._entries[key] = {**self._entries.get(key, {}), **fields}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def _scoped(chunks: List[Tuple[str, str]], headed: bool, labels, strict: bool = False) -> List[str]:
+    """Paragraphs an extractor reads: those in its sections, or, unless `strict`, all of
+    them when the resume has no recognisable headers or none of those sections."""
+    if headed or strict:
+        scoped = [para for label, para in chunks if label in labels]
+        if scoped or strict:
+            return scoped
+    return [para for _, para in chunks]
+
+
+def _extract_chunks(chunks: List[Tuple[str, str]], headed: bool, skills_vocab: List[str],
+                    cache: Optional[ChunkCache], deadline: Deadline) -> Dict[str, List]:
+    """Per-paragraph results of every extractor, from the cache where possible."""
+    vocab_key = hashlib.sha1('\n'.join(skills_vocab).encode('utf-8')).hexdigest()
+    extractors = {
+        'skills': (SKILL_SECTIONS, False),
+        'degrees': (DEGREE_SECTIONS, False),
+        'ranges': (EXPERIENCE_SECTIONS, True),
+        'years': (YEARS_MENTION_SECTIONS, False),
+    }
+    nlp = None
+    results: Dict[str, List] = {}
+    for field, (labels, strict) in extractors.items():
+        results[field] = values = []
+        for para in _scoped(chunks, headed, labels, strict):
+            key = hashlib.sha1(f'{vocab_key}\0{para}'.encode('utf-8')).hexdigest()
+            hit, value = cache.get(key, field) if cache is not None else (False, None)
+            if hit:
+                values.append(value)
+                continue
+            complete = True
+            if field == 'skills':
+                nlp = nlp or load_spacy_model()
+                use_nlp = nlp is not None and deadline.allows('nlp_chunking', len(para) / 1000)
+                complete = use_nlp or nlp is None  # skills found without spaCy are not cached
+                value = _extract_skills(para, skills_vocab, use_nlp=use_nlp)
+            elif field == 'degrees':
+                value = _extract_degrees(para)
+            elif field == 'ranges':
+                value = raw_date_ranges(para)
+            else:
+                value = _extract_experience_years(para)
+            if cache is not None and complete:
+                cache.update(key, {field: value})
+            values.append(value)
+    return results
+
+
 def match_requirements(skills: List[str], requirements: List[str]) -> Dict[str, Any]:
     req_norm = [r.lower() for r in requirements]
     skills_norm = [s.lower() for s in skills]
@@ -146,25 +318,72 @@ def match_requirements(skills: List[str], requirements: List[str]) -> Dict[str,
     return { 'matched': matched, 'missing': missing }
 
 
-def parse_resume(source: Any, job_requirements: List[str] = None, skills_vocab: List[str] = None) -> Dict[str, Any]:
-    """High-level parser that extracts key details and optionally matches job requirements."""
+def parse_resume(source: Any, job_requirements: List[str] = None, skills_vocab: List[str] = None,
+                 deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """High-level parser that extracts key details and optionally matches job requirements.
+
+    With a `deadline`, optional stages that do not fit in the remaining time (OCR, spaCy
+    chunking) are skipped and listed in ``details['skipped_stages']``.
+    """
+    deadline = unbounded(deadline)
+    text, ext = extract_text_generic(source, deadline=deadline)
+    details = parse_resume_text(text, job_requirements, skills_vocab, source_ext=ext, deadline=deadline)
+    details['skipped_stages'] = list(deadline.skipped)
+    return details
+
+
+def parse_resume_text(text: str, job_requirements: List[str] = None, skills_vocab: List[str] = None,
+                      source_ext: str = '.txt', deadline: Optional[Deadline] = None,
+                      chunk_cache: Optional[ChunkCache] = None) -> Dict[str, Any]:
+    """Same as parse_resume, for text that has already been extracted.
+
+    With a `chunk_cache`, paragraphs analysed before (in any resume) are not extracted
+    again. ``details['skipped_stages']`` lists the stages skipped here for the deadline.
+    """
+    deadline = unbounded(deadline)
+    skipped_before = len(deadline.skipped)
     skills_vocab = skills_vocab or DEFAULT_SKILLS
-    text, ext = extract_text_generic(source)
+    sections = segment(text)
+    found = _extract_chunks(paragraphs(text, sections), has_headers(sections), skills_vocab, chunk_cache, deadline)
+    # the merge: unions and maxima, so paragraph order and caching do not matter
+    months = months_covered(resolve_ranges(r for ranges in found['ranges'] for r in ranges))
+    experience_years = max([round(months / 12, 1)] + found['years'])
     details = {
         'name': _extract_name(text),
         'email': _extract_email(text),
         'mobile_number': _extract_phone(text),
-        'skills': _extract_skills(text, skills_vocab),
-        'degrees': _extract_degrees(text),
-        'experience_years': _extract_experience_years(text),
+        'skills': sorted(set().union(*found['skills'])),
+        'degrees': sorted(set().union(*found['degrees'])),
+        'experience_years': experience_years,
+        'sections': [s.label for s in sections],
         'no_of_pages': None,
-        'source_ext': ext,
+        'source_ext': source_ext,
+        'skipped_stages': deadline.skipped[skipped_before:],
     }
     if job_requirements:
         details['requirements_match'] = match_requirements(details['skills'], job_requirements)
     return details
 
 
+# Fields of an analysis (ours or pyresparser's) that describe what a resume contains
+# rather than whose it is; reuse_analysis copies only these from another resume.
+CONTENT_FIELDS = ('skills', 'degrees', 'degree', 'experience_years', 'total_experience', 'sections',
+                  'no_of_pages', 'source_ext')
+
+
+def reuse_analysis(prior: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Analysis of ``text`` built from that of a near-identical resume.
+
+    The content fields are copied from ``prior``; the contact fields (name, email,
+    phone) are always extracted from ``text`` itself, since a near-duplicate may be
+    someone else's copy of the same template.
+    """
+    details = {k: prior[k] for k in CONTENT_FIELDS if k in prior}
+    details.update(name=_extract_name(text), email=_extract_email(text), mobile_number=_extract_phone(text),
+                   skipped_stages=[])
+    return details
+
+
 # Backward-compatible class wrapper (kept minimal)
 class ResumeParser:
     def __init__(self, resume):
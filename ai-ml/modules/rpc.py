@@ -0,0 +1,326 @@
+import os
+import hmac
+import socket
+import struct
+import asyncio
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+try:
+    from .admission import ClientLimiter, Rejected
+except ImportError:
+    from admission import ClientLimiter, Rejected
+
+# Persistent binary transport for service-to-service calls.
+#
+# One long-lived connection (Unix domain socket or TCP) carries length-prefixed msgpack
+# frames: a 4-byte big-endian length, then the body. A request frame is
+#
+#     {"id": 7, "calls": [{"method": "parse_resume", "params": {...}}, ...]}
+#
+# and its response frame is {"id": 7, "results": [{"result": ...} | {"error": "..."}]},
+# one entry per call, in call order. Requests on a connection are handled concurrently
+# and answered as they finish, so a client can pipeline many requests and match the
+# answers by id (responses may come back out of order). Calls run in the default thread
+# pool, capped at RPC_CONCURRENCY per server.
+#
+# Limits: at most RPC_MAX_CONNECTIONS connections, and RPC_MAX_INFLIGHT requests in flight
+# per connection; past that the server stops reading the connection until one finishes,
+# so a client that pipelines without bound is slowed down rather than queued in memory.
+# With a limiter (the admission controller's token buckets, see admission.py) every call
+# is charged to the request's "user" (the end user the caller acts for) or else to the
+# connection, and answered {"error": "rate limit exceeded", "retry_after": s} when over.
+#
+# Authentication: when a token is configured (ML_RPC_TOKEN; required for TCP) the first
+# frame on a connection must be {"auth": token}; it is answered {"id": 0, "auth": "ok"}
+# and anything else closes the connection. Unix sockets are also created mode 0660.
+#
+# A Unix socket path is bound once per host: prefork.py binds it in the master before
+# forking (bind_unix) and every worker accepts on the inherited socket; without it only
+# one process may serve the path, since binding unlinks whatever socket was there.
+
+RPC_CONCURRENCY = int(os.environ.get('ML_RPC_CONCURRENCY', '8'))
+RPC_MAX_FRAME_BYTES = int(os.environ.get('ML_RPC_MAX_FRAME_BYTES', str(16 * 1024 * 1024)))
+RPC_MAX_CALLS = int(os.environ.get('ML_RPC_MAX_CALLS', '1000'))
+RPC_MAX_INFLIGHT = int(os.environ.get('ML_RPC_MAX_INFLIGHT', '32'))
+RPC_MAX_CONNECTIONS = int(os.environ.get('ML_RPC_MAX_CONNECTIONS', '256'))
+RPC_TOKEN = os.environ.get('ML_RPC_TOKEN') or None
+RPC_CALL_COST = 1.0
+
+_HEADER = struct.Struct('>I')
+
+
+class RpcError(RuntimeError):
+    pass
+
+
+def pack_frame(obj: Any) -> bytes:
+    body = msgpack.packb(obj, use_bin_type=True, default=str)
+    return _HEADER.pack(len(body)) + body
+
+
+def unpack_body(body: bytes) -> Any:
+    return msgpack.unpackb(body, raw=False)
+
+
+_inherited: Dict[str, socket.socket] = {}
+
+
+def bind_unix(path: str) -> socket.socket:
+    """Bind and listen on a Unix socket, to be inherited by forked workers (prefork.py)."""
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a previous run
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o660)
+    sock.listen(1024)
+    sock.set_inheritable(True)
+    _inherited[path] = sock
+    return sock
+
+
+def inherited(path: Optional[str]) -> bool:
+    return path in _inherited
+
+
+class RpcServer:
+    def __init__(self, methods: Dict[str, Callable[[Dict], Any]], concurrency: int = RPC_CONCURRENCY,
+                 token: Optional[str] = RPC_TOKEN, limiter: Optional[ClientLimiter] = None, max_inflight: int = RPC_MAX_INFLIGHT,
+                 max_connections: int = RPC_MAX_CONNECTIONS):
+        if msgpack is None:
+            raise RuntimeError('msgpack is required for the RPC transport')
+        self.methods = methods
+        self.token = token
+        self.limiter = limiter
+        self.max_inflight = max(1, max_inflight)
+        self.max_connections = max_connections
+        self._slots = asyncio.Semaphore(concurrency)
+        self._server = None
+        self.requests = 0
+        self.calls = 0
+        self.errors = 0
+        self.connections = 0
+        self.refused = 0
+        self.rate_limited = 0
+
+    async def start(self, path: Optional[str] = None, host: str = '127.0.0.1', port: Optional[int] = None):
+        if path:
+            sock = _inherited.get(path) or bind_unix(path)
+            self._server = await asyncio.start_unix_server(self._serve, sock=sock)
+        else:
+            if not self.token:
+                raise RuntimeError('the TCP RPC listener requires a token (ML_RPC_TOKEN)')
+            # reuse_port lets every pre-forked worker accept on the same port
+            self._server = await asyncio.start_server(self._serve, host, port, reuse_port=True)
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _read_frame(self, reader: asyncio.StreamReader, writer, write_lock) -> Optional[bytes]:
+        try:
+            header = await reader.readexactly(_HEADER.size)
+        except asyncio.IncompleteReadError:
+            return None
+        (length,) = _HEADER.unpack(header)
+        if length > RPC_MAX_FRAME_BYTES:
+            await self._send(writer, write_lock, {'id': None, 'error': f'frame exceeds {RPC_MAX_FRAME_BYTES} bytes'})
+            return None
+        return await reader.readexactly(length)
+
+    async def _authenticate(self, reader, writer, write_lock) -> bool:
+        body = await self._read_frame(reader, writer, write_lock)
+        try:
+            offered = unpack_body(body).get('auth') if body is not None else None
+        except Exception:
+            offered = None
+        if not isinstance(offered, str) or not hmac.compare_digest(offered.encode(), self.token.encode()):
+            await self._send(writer, write_lock, {'id': None, 'error': 'authentication failed'})
+            return False
+        await self._send(writer, write_lock, {'id': 0, 'auth': 'ok'})
+        return True
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        if self.connections >= self.max_connections:
+            self.refused += 1
+            try:
+                await self._send(writer, write_lock, {'id': None, 'error': 'too many connections'})
+            finally:
+                writer.close()
+            return
+        self.connections += 1
+        peer = writer.get_extra_info('peername') or 'unix'
+        client = f'rpc:{peer[0] if isinstance(peer, tuple) else peer}:{id(writer)}'
+        inflight = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+        try:
+            if self.token and not await self._authenticate(reader, writer, write_lock):
+                return
+            while True:
+                # stop reading while the connection has max_inflight requests running
+                await inflight.acquire()
+                body = await self._read_frame(reader, writer, write_lock)
+                if body is None:
+                    inflight.release()
+                    break
+                task = asyncio.ensure_future(self._handle(body, writer, write_lock, client))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _t: inflight.release())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+            writer.close()
+
+    async def _send(self, writer, write_lock, obj) -> None:
+        async with write_lock:
+            writer.write(pack_frame(obj))
+            await writer.drain()
+
+    async def _handle(self, body: bytes, writer, write_lock, client: str = 'rpc') -> None:
+        self.requests += 1
+        try:
+            request = unpack_body(body)
+            calls = request.get('calls')
+            if calls is None:
+                calls = [{'method': request.get('method'), 'params': request.get('params') or {}}]
+            if len(calls) > RPC_MAX_CALLS:
+                raise RpcError(f'at most {RPC_MAX_CALLS} calls per request')
+        except Exception as e:
+            self.errors += 1
+            await self._send(writer, write_lock, {'id': None, 'error': f'bad request: {e}'})
+            return
+        user = request.get('user')
+        results = await asyncio.gather(*(self._call(c, f'user:{user}' if user else client) for c in calls))
+        try:
+            await self._send(writer, write_lock, {'id': request.get('id'), 'results': results})
+        except ConnectionError:
+            pass
+
+    async def _call(self, call: Dict, client: str = 'rpc') -> Dict:
+        self.calls += 1
+        fn = self.methods.get(call.get('method'))
+        if fn is None:
+            self.errors += 1
+            return {'error': f"unknown method {call.get('method')!r}"}
+        if self.limiter is not None:
+            try:
+                self.limiter.check(client, RPC_CALL_COST)
+            except Rejected as e:
+                self.rate_limited += 1
+                return {'error': e.reason, 'retry_after': round(e.retry_after, 3)}
+        async with self._slots:
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(None, fn, call.get('params') or {})
+                return {'result': result}
+            except Exception as e:
+                self.errors += 1
+                return {'error': str(e)}
+
+    def snapshot(self) -> Dict[str, int]:
+        return {'connections': self.connections, 'requests': self.requests, 'calls': self.calls, 'errors': self.errors,
+                'refused': self.refused, 'rate_limited': self.rate_limited}
+
+
+class RpcClient:
+    """Blocking reference client. Thread-safe; one connection, reconnects on demand.
+
+        client = RpcClient(path='/tmp/ml.sock')
+        client.call('analyze_skill_gap', current_skills=['python'], target_skills=['docker'])
+        client.batch([('parse_resume', {'resume_text': text}) for text in texts])
+    """
+
+    def __init__(self, path: Optional[str] = None, host: str = '127.0.0.1', port: Optional[int] = None,
+                 timeout: float = 30.0, token: Optional[str] = RPC_TOKEN):
+        if msgpack is None:
+            raise RuntimeError('msgpack is required for the RPC transport')
+        self.path, self.host, self.port, self.timeout = path, host, port, timeout
+        self.token = token
+        self._sock = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            if self.path:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(self.path)
+            else:
+                sock = socket.create_connection((self.host, self.port), self.timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock = sock
+            if self.token:
+                sock.sendall(pack_frame({'auth': self.token}))
+                if self._read_frame().get('auth') != 'ok':
+                    raise RpcError('authentication failed')
+        return self._sock
+
+    def _recv_exact(self, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self._sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError('connection closed by server')
+            buf += chunk
+        return bytes(buf)
+
+    def _read_frame(self) -> Dict:
+        (length,) = _HEADER.unpack(self._recv_exact(_HEADER.size))
+        return unpack_body(self._recv_exact(length))
+
+    def pipeline(self, requests: Sequence[Sequence[Tuple[str, Dict]]]) -> List[List[Dict]]:
+        """Send several batched requests back to back, then collect all their answers.
+
+        Returns one list of {'result'|'error'} entries per request, in request order.
+        """
+        with self._lock:
+            try:
+                sock = self._connect()
+                ids = []
+                frames = []
+                for calls in requests:
+                    rid = next(self._ids)
+                    ids.append(rid)
+                    frames.append(pack_frame({'id': rid, 'calls': [{'method': m, 'params': p} for m, p in calls]}))
+                sock.sendall(b''.join(frames))
+                answers = {}
+                while len(answers) < len(ids):
+                    frame = self._read_frame()
+                    if frame.get('id') is None:
+                        raise RpcError(frame.get('error', 'protocol error'))
+                    answers[frame['id']] = frame['results']
+                return [answers[rid] for rid in ids]
+            except (OSError, RpcError):
+                # unread answers may still be in flight; never reuse the connection
+                self.close()
+                raise
+
+    def batch(self, calls: Sequence[Tuple[str, Dict]]) -> List[Dict]:
+        return self.pipeline([calls])[0]
+
+    def call(self, method: str, **params) -> Any:
+        (entry,) = self.batch([(method, params)])
+        if 'error' in entry:
+            raise RpcError(entry['error'])
+        return entry['result']
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
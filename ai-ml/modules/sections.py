@@ -0,0 +1,177 @@
+import re
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Resume section segmentation: one pass of a compiled header matcher splits the text
+# into labelled spans so each extractor only looks at the part of the resume it cares
+# about. Text before the first recognised header is labelled 'contact'.
+
+SECTION_HEADERS: Dict[str, List[str]] = {
+    'summary': ['summary', 'professional summary', 'career summary', 'objective', 'career objective',
+                'profile', 'professional profile', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'employment', 'work history', 'career history'],
+    'internships': ['internship', 'internships', 'internship experience'],
+    'education': ['education', 'academic background', 'academics', 'educational qualifications',
+                  'qualifications', 'academic qualifications'],
+    'skills': ['skills', 'skill', 'technical skills', 'key skills', 'core competencies', 'skills summary',
+               'technologies', 'tools and technologies', 'technical proficiency'],
+    'projects': ['projects', 'project', 'personal projects', 'academic projects', 'key projects'],
+    'certifications': ['certifications', 'certification', 'certificates', 'licenses and certifications',
+                       'courses'],
+    'achievements': ['achievements', 'awards', 'honors', 'honours', 'accomplishments', 'awards and achievements'],
+    'hobbies': ['hobbies', 'hobbies and interests'],
+    'interests': ['interests', 'areas of interest'],
+    # Recognised so they end the previous section, but not used by any extractor
+    'other': ['languages', 'references', 'publications', 'volunteer experience', 'volunteering',
+              'extracurricular activities', 'activities', 'personal details', 'personal information',
+              'declaration'],
+}
+
+_HEADER_LABEL = {h: label for label, headers in SECTION_HEADERS.items() for h in headers}
+_alternation = '|'.join(
+    r'\s+'.join('(?:and|&)' if w == 'and' else re.escape(w) for w in h.split())
+    for h in sorted(_HEADER_LABEL, key=len, reverse=True)
+)
+# A header is a line holding only the header phrase, optionally decorated with bullets
+# or a trailing colon. Inline "Profile: Backend engineer ..." or "Skills: Python, SQL"
+# lines are content, not headers: treating them as headers would open a section that
+# swallows everything up to the next real header.
+HEADER_RE = re.compile(
+    rf'^[ \t]*[#*•\-=]*[ \t]*(?P<header>{_alternation})[ \t]*:?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class Section(NamedTuple):
+    label: str
+    header: str
+    start: int  # offset of the section body in the text
+    end: int
+
+
+def _label_for(header: str) -> str:
+    key = re.sub(r'\s+', ' ', header.lower()).replace('&', 'and')
+    return _HEADER_LABEL.get(key, 'other')
+
+
+def segment(text: str) -> List[Section]:
+    """Split resume text into labelled spans in a single scan."""
+    sections: List[Section] = []
+    label, header, start = 'contact', '', 0
+    for m in HEADER_RE.finditer(text):
+        sections.append(Section(label, header, start, m.start()))
+        label, header = _label_for(m.group('header')), m.group('header')
+        start = m.end()
+    sections.append(Section(label, header, start, len(text)))
+    return [s for s in sections if s.end > s.start or s.label != 'contact']
+
+
+def labels_present(sections: Iterable[Section]) -> Set[str]:
+    return {s.label for s in sections}
+
+
+def section_text(text: str, sections: Iterable[Section], labels: Iterable[str]) -> str:
+    """Concatenate the bodies of every section with one of `labels`."""
+    wanted = set(labels)
+    return '\n'.join(text[s.start:s.end] for s in sections if s.label in wanted)
+
+
+def has_headers(sections: Iterable[Section]) -> bool:
+    return any(s.label != 'contact' for s in sections)
+
+
+PARAGRAPH_BREAK_RE = re.compile(r'\n[ \t]*\n')
+
+
+def paragraphs(text: str, sections: Iterable[Section]) -> List[Tuple[str, str]]:
+    """(section label, paragraph) for every non-blank, blank-line separated paragraph."""
+    out = []
+    for s in sections:
+        for para in PARAGRAPH_BREAK_RE.split(text[s.start:s.end]):
+            para = para.strip()
+            if para:
+                out.append((s.label, para))
+    return out
+
+
+# ---- resume score ----
+
+# Points for each section a resume has (the "Resume Tips" score in core/App.py, out of 100).
+# Changing these leaves stored user_data.resume_score values stale; tools/rescore_resumes.py
+# recomputes them.
+SECTION_WEIGHTS: Dict[str, int] = {
+    'summary': 6, 'education': 12, 'experience': 16, 'internships': 6, 'skills': 7,
+    'hobbies': 4, 'interests': 5, 'achievements': 13, 'certifications': 12, 'projects': 19,
+}
+
+
+def section_score(labels: Iterable[str]) -> int:
+    return sum(SECTION_WEIGHTS.get(label, 0) for label in set(labels))
+
+
+# ---- experience date ranges ----
+
+_MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])}
+_DATE = r'(?:(?:(?P<{p}mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s+)|(?P<{p}num>\d{{1,2}})[/\-.])?(?P<{p}year>(?:19|20)\d{{2}})'
+DATE_RANGE_RE = re.compile(
+    _DATE.format(p='s') + r'\s*(?:-|–|—|to|until|till)\s*(?:' + _DATE.format(p='e') +
+    r'|(?P<open>present|current|now|till\s+date|to\s+date|today|ongoing))',
+    re.IGNORECASE,
+)
+
+
+def _month_index(year: str, mon: str, num: str) -> int:
+    if mon:
+        month = _MONTHS[mon[:3].lower()]
+    elif num and 1 <= int(num) <= 12:
+        month = int(num) - 1
+    else:
+        month = 0
+    return int(year) * 12 + month
+
+
+def raw_date_ranges(text: str) -> List[Tuple[int, Optional[int]]]:
+    """(start, end) month indexes of every date range in `text`; end is None for open
+    ranges ("- present"). Independent of today's date, so it can be cached."""
+    out = []
+    for m in DATE_RANGE_RE.finditer(text):
+        start = _month_index(m.group('syear'), m.group('smon'), m.group('snum'))
+        end = None if m.group('open') else _month_index(m.group('eyear'), m.group('emon'), m.group('enum'))
+        out.append((start, end))
+    return out
+
+
+def resolve_ranges(ranges: Iterable[Tuple[int, Optional[int]]],
+                   today: datetime.date = None) -> List[Tuple[int, int]]:
+    """Turn raw ranges into [start, end) intervals, closing open ones at today."""
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month - 1
+    out = []
+    for start, end in ranges:
+        end = now if end is None else min(end, now)
+        if end >= start:
+            # inclusive of the end month
+            out.append((start, end + 1))
+    return out
+
+
+def date_ranges(text: str, today: datetime.date = None) -> List[Tuple[int, int]]:
+    """Return [start, end) month-index intervals for every date range in `text`."""
+    return resolve_ranges(raw_date_ranges(text), today)
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def months_covered(intervals: Iterable[Tuple[int, int]]) -> int:
+    return sum(end - start for start, end in merge_intervals(intervals))
@@ -0,0 +1,107 @@
+import os
+import json
+import gzip
+from typing import Any, Dict, Optional, Tuple
+
+# Response encoding for the ML service. Handlers return plain dicts/lists built from
+# str/int/float/bool, so they are serialised directly (orjson when installed) instead
+# of going through FastAPI's jsonable_encoder walk. Bodies above a size threshold are
+# compressed with brotli or gzip per Accept-Encoding, and callers that send
+# `Accept: application/msgpack` get msgpack instead of JSON.
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('ML_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('ML_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('ML_BROTLI_QUALITY', '4'))
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def dumps_json(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def dumps_msgpack(obj: Any) -> bytes:
+    return msgpack.packb(obj, use_bin_type=True, default=str)
+
+
+def _parse_qualities(header: str) -> Dict[str, float]:
+    out = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token.strip().lower()] = q
+    return out
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None."""
+    prefs = _parse_qualities(accept_encoding)
+    candidates = []
+    if brotli is not None:
+        candidates.append('br')
+    candidates.append('gzip')
+    best, best_q = None, 0.0
+    for enc in candidates:
+        q = prefs.get(enc, prefs.get('*', 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def wants_msgpack(accept: str) -> bool:
+    if msgpack is None or not accept:
+        return False
+    prefs = _parse_qualities(accept)
+    return any(prefs.get(t, 0) > 0 for t in MSGPACK_TYPES)
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def encode(payload: Any, accept: str = '', accept_encoding: str = '') -> Tuple[bytes, Dict[str, str]]:
+    """Serialise and (if large enough) compress a payload for the given request headers.
+
+    Returns the body and the response headers to send with it.
+    """
+    if wants_msgpack(accept):
+        body, media_type = dumps_msgpack(payload), MSGPACK_TYPES[0]
+    else:
+        body, media_type = dumps_json(payload), JSON_TYPE
+    headers = {'content-type': media_type, 'vary': 'Accept, Accept-Encoding'}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = choose_encoding(accept_encoding)
+        if encoding:
+            body = compress(body, encoding)
+            headers['content-encoding'] = encoding
+    return body, headers
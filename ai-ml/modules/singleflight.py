@@ -0,0 +1,72 @@
+import json
+import asyncio
+import hashlib
+import functools
+from typing import Any, Callable, Dict
+
+# Single-flight request coalescing: concurrent calls with the same key share one
+# computation. The first caller starts it in a worker thread; callers arriving while it
+# runs await the same result (or exception). A caller that is cancelled (client went
+# away) only stops waiting; the computation is cancelled once no caller is left.
+
+
+def canonical_key(namespace: str, payload: Any) -> str:
+    """Stable hash of a request body: key order and whitespace do not matter."""
+    blob = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return namespace + ':' + hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self, future):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+            call = _Call(future)
+            self._calls[key] = call
+            future.add_done_callback(functools.partial(self._finished, key, call))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.future.done():
+                call.future.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finished(self, key: str, call: _Call, future) -> None:
+        # Only drop the entry if it still belongs to this computation
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if future.cancelled():
+            self.cancelled += 1
+        elif future.exception() is not None:
+            self.failed += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'in_flight': len(self._calls),
+        }
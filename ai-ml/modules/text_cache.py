@@ -0,0 +1,68 @@
+import os
+import zlib
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+try:
+    from .resources import DATA_DIR
+except ImportError:
+    from resources import DATA_DIR
+
+# Persistent cache of extracted resume text, keyed by the sha256 of the uploaded file.
+#
+# Text extraction (pdfminer, OCR for scanned pages) is the expensive part of analysing a
+# stored resume again; the text itself is small. The Streamlit app writes every text it
+# extracts here, and batch jobs such as tools/rescore_resumes.py read it before falling
+# back to parsing the file. One SQLite database in WAL mode, zlib-compressed rows, safe
+# to share between processes.
+
+TEXT_CACHE_DB = os.environ.get('ML_TEXT_CACHE_DB', os.path.join(DATA_DIR, 'extracted_text.sqlite3'))
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS extracted_text (
+    sha256 TEXT PRIMARY KEY,
+    text BLOB NOT NULL,
+    created REAL NOT NULL
+);
+'''
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """sha256 -> extracted text. One instance per process; connections are per thread."""
+
+    def __init__(self, path: str = TEXT_CACHE_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, sha256: str) -> Optional[str]:
+        row = self._conn().execute('SELECT text FROM extracted_text WHERE sha256 = ?', (sha256,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def put(self, sha256: str, text: str) -> None:
+        self._conn().execute('INSERT OR REPLACE INTO extracted_text (sha256, text, created) VALUES (?, ?, ?)',
+                             (sha256, zlib.compress(text.encode('utf-8'), 6), time.time()))
+
+    def __len__(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM extracted_text').fetchone()[0]
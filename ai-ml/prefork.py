@@ -0,0 +1,126 @@
+"""Pre-fork launcher for the ML service.
+
+Loads every read-only asset (skill vocabulary, course catalog, spaCy pipeline) once in
+the master process, moves the resulting heap into the GC's permanent generation with
+``gc.freeze()`` and only then forks the uvicorn workers. Workers share those pages
+copy-on-write instead of each loading its own copy.
+
+    python prefork.py --workers 8 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+# Keep the collector from walking (and so writing to) the master heap while assets load.
+gc.disable()
+
+import uvicorn
+
+from main import RPC_SOCKET, app
+from modules import recommendation_engine, resume_parser, rpc
+from modules.resources import load_spacy_model
+
+
+def preload_assets() -> dict:
+    """Load the read-only assets workers would otherwise load on first use."""
+    nlp = load_spacy_model()
+    if nlp is not None:
+        # Run the pipeline once so lazily-built tables are materialised before fork
+        nlp('warm up')
+    # Exercise the parsing and recommendation paths so regexes and lookups are cached
+    resume_parser._extract_skills('warm up', resume_parser.DEFAULT_SKILLS)
+    recommendation_engine.get_recommendations(['python'], ['react'])
+    return {
+        'skills': len(resume_parser.DEFAULT_SKILLS),
+        'course_categories': len(recommendation_engine.CATEGORY_MAP),
+        'spacy_model': nlp is not None,
+    }
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, args) -> None:
+    # Children start with a fresh collector; frozen objects are never scanned again.
+    gc.enable()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=args.log_level, access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+    os._exit(0)
+
+
+def _spawn(sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(sock, args)
+        finally:
+            os._exit(1)
+    return pid
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Pre-fork launcher for the NexStepAI ML service')
+    ap.add_argument('--host', default='0.0.0.0')
+    ap.add_argument('--port', type=int, default=8000)
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    ap.add_argument('--log-level', default='info')
+    args = ap.parse_args()
+
+    assets = preload_assets()
+    # Everything allocated so far is shared with the workers; freezing it keeps GC
+    # passes in the children from touching (and thereby copying) those pages.
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind(args.host, args.port)
+    # The RPC socket is bound once here and accepted on by every worker (see modules/rpc.py)
+    rpc_sock = rpc.bind_unix(RPC_SOCKET) if RPC_SOCKET else None
+    print(f'[prefork] master {os.getpid()} loaded {assets}, starting {args.workers} workers', flush=True)
+    workers = {_spawn(sock, args) for _ in range(args.workers)}
+
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f'[prefork] worker {pid} exited with status {status}, respawning', flush=True)
+            time.sleep(0.5)
+            workers.add(_spawn(sock, args))
+    sock.close()
+    if rpc_sock is not None:
+        rpc_sock.close()
+        os.unlink(RPC_SOCKET)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
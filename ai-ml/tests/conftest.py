@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the service imports its packages from the ai-ml root (see main.py and tools/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,33 @@
+import pytest
+
+from modules import admission
+from modules.admission import AdmissionController, ClientLimiter, Rejected, client_keys
+
+
+def _scope(ip='10.0.0.5', **headers):
+    return {'client': (ip, 4000),
+            'headers': [(k.replace('_', '-').encode(), v.encode()) for k, v in headers.items()]}
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    monkeypatch.setattr(admission, 'API_KEYS', frozenset({'backend-key'}))
+    monkeypatch.setattr(admission, 'TRUSTED_PROXIES', frozenset({'10.0.0.9'}))
+
+
+def test_user_header_is_ignored_from_untrusted_callers(trusted):
+    assert client_keys(_scope(x_end_user='u1')) == ('ip:10.0.0.5', None)
+    # an unknown API key is no better than none: it could change on every request
+    assert client_keys(_scope(x_end_user='u1', x_api_key='made-up')) == ('ip:10.0.0.5', None)
+
+
+def test_trusted_callers_forward_users_within_their_own_budget(trusted):
+    assert client_keys(_scope(x_end_user='u1', x_api_key='backend-key')) == ('key:backend-key',
+                                                                             'key:backend-key/user:u1')
+    assert client_keys(_scope('10.0.0.9', x_end_user='u1')) == ('ip:10.0.0.9', 'ip:10.0.0.9/user:u1')
+
+    ctrl = AdmissionController(limiter=ClientLimiter(rate=0.001, burst=1), callers=ClientLimiter(rate=0.001, burst=2))
+    ctrl.check(_scope('10.0.0.9', x_end_user='u1'), 1)
+    ctrl.check(_scope('10.0.0.9', x_end_user='u2'), 1)
+    with pytest.raises(Rejected):  # a fresh user per request still spends the caller's budget
+        ctrl.check(_scope('10.0.0.9', x_end_user='u3'), 1)
@@ -0,0 +1,77 @@
+import math
+import random
+
+from modules.candidate_index import (BM25_B, BM25_K1, SKILL_WEIGHT, CandidateIndex, CandidateStore,
+                                     SharedCandidateIndex, tokenize)
+from modules.resume_parser import DEFAULT_SKILLS, _extract_skills
+
+WORDS = ('backend', 'frontend', 'payments', 'billing', 'platform', 'mobile', 'search', 'ranking',
+         'pipeline', 'streaming', 'latency', 'scale', 'migration', 'testing', 'security', 'design')
+
+
+def _resume(rnd):
+    words = rnd.choices(WORDS, k=rnd.randint(5, 40)) + rnd.sample(DEFAULT_SKILLS, rnd.randint(1, 6))
+    rnd.shuffle(words)
+    return ' '.join(words)
+
+
+def _exhaustive(index, job_description, top_k):
+    """Score every live candidate against every query feature, no pruning."""
+    query_skills = {s.lower() for s in _extract_skills(job_description, index.skills_vocab, use_nlp=False)}
+    terms = set(tokenize(job_description)) - query_skills
+    n = len(index)
+    avg_len = index._total_len / n
+    scores = {}
+    for d, cid in enumerate(index._external):
+        if cid is None:
+            continue
+        score = SKILL_WEIGHT * len(index._doc_skills[d] & query_skills)
+        for t in terms:
+            docs = list(index._term_docs.get(t, ()))
+            if d not in docs:
+                continue
+            df = len(docs)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            tf = index._term_tfs[t][docs.index(d)]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * index._doc_len[d] / avg_len)
+            score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        if score > 0:
+            scores[d] = score
+    best = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:top_k]
+    return [(index._external[d], round(score, 4)) for d, score in best]
+
+
+def test_pruned_search_matches_exhaustive_top_k():
+    rnd = random.Random(7)
+    index = CandidateIndex()
+    for i in range(400):
+        index.add(f'c{i}', _resume(rnd))
+    for query in ('python django payments backend', 'react typescript frontend design',
+                  'kubernetes docker platform scale latency', 'billing'):
+        got = [(r['candidate_id'], r['score']) for r in index.search(query, top_k=10)]
+        assert got == _exhaustive(index, query, 10)
+
+
+def test_reindexing_compacts_dead_postings():
+    index = CandidateIndex()
+    for i in range(20):
+        index.add(f'c{i}', 'python backend payments')
+    for _ in range(10):
+        for i in range(20):
+            index.add(f'c{i}', 'python backend payments')
+    assert len(index) == 20
+    assert len(index._external) <= 20 / (1 - 0.25) + 1
+    assert len(index._term_docs['payments']) == len(index._external)
+
+
+def test_workers_sharing_a_store_see_each_others_candidates(tmp_path):
+    path = str(tmp_path / 'candidates.sqlite3')
+    a, b = SharedCandidateIndex(CandidateStore(path)), SharedCandidateIndex(CandidateStore(path))
+    a.add('c1', 'python django payments backend')
+    b.add('c2', 'react typescript frontend')
+    assert [r['candidate_id'] for r in b.search('python backend')] == ['c1']
+    assert len(a) == len(b) == 2
+    assert b.remove('c1') and not a.remove('c1')
+    assert a.search('python backend') == [] and len(a) == 1
+    # a worker started later rebuilds the same index from the store
+    assert [r['candidate_id'] for r in SharedCandidateIndex(CandidateStore(path)).search('react')] == ['c2']
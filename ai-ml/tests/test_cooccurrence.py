@@ -0,0 +1,53 @@
+import threading
+
+from modules import cooccurrence
+from modules.cooccurrence import append_log, compact, read_model, seeded
+
+
+def _pair(model, a, b):
+    return model.rows[model._id(a, False)].get(model._id(b, False), 0)
+
+
+def test_counts_from_every_process_survive_compaction(tmp_path):
+    path = str(tmp_path / 'co.bin')
+    # two workers log their resumes; either one compacting keeps both
+    for _ in range(3):
+        append_log(['Rust', 'Wasm'], path)
+    append_log(['Rust', 'Go'], path)
+    compact(path)
+    append_log(['Rust', 'Wasm'], path)
+    model = read_model(path)
+    assert (_pair(model, 'rust', 'wasm'), _pair(model, 'rust', 'go')) == (4, 1)
+    assert model.n_docs == seeded().n_docs + 5
+
+
+def test_concurrent_compactions_do_not_collide(tmp_path):
+    path = str(tmp_path / 'co.bin')
+    append_log(['Rust', 'Wasm'], path)
+    errors = []
+
+    def run():
+        try:
+            compact(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert _pair(read_model(path), 'rust', 'wasm') == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['co.bin', 'co.bin.lock', 'co.bin.log']
+
+
+def test_unreadable_snapshot_falls_back_to_seeded(tmp_path, monkeypatch):
+    path = tmp_path / 'co.bin'
+    path.write_bytes(b'SKCO1 not zlib')
+    monkeypatch.setattr(cooccurrence, 'SNAPSHOT_PATH', str(path))
+    monkeypatch.setattr(cooccurrence, '_default', None)
+    model = cooccurrence.default_model()
+    assert model.n_docs == seeded().n_docs
+    cooccurrence.record_resume(['Rust', 'Wasm'])  # must not raise into the parse
+    assert _pair(model, 'rust', 'wasm') == 1
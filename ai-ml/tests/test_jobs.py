@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from modules import jobs
+from modules.jobs import DONE, FAILED, QUEUED, RUNNING, JobStore, run_job
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite3'))
+
+
+def test_store_creates_nothing_until_used(tmp_path):
+    path = tmp_path / 'sub' / 'jobs.sqlite3'
+    store = JobStore(str(path))
+    assert not path.parent.exists()
+    store.submit('roadmap', {})
+    assert path.exists()
+
+
+def test_complete_and_fail_need_the_current_lease(store):
+    job_id = store.submit('roadmap', {}, max_attempts=3)
+    first = store.claim(lease_seconds=0)  # lease expires at once, as if the worker stalled
+    time.sleep(0.01)
+    second = store.claim()
+    assert first['id'] == second['id'] == job_id
+    assert (first['attempts'], second['attempts']) == (1, 2)
+
+    assert not store.complete(job_id, first['attempts'], {'stale': True})
+    assert not store.fail(job_id, first['attempts'], 'stale')
+    assert not store.renew(job_id, first['attempts'])
+    assert store.get(job_id)['status'] == RUNNING
+
+    assert store.complete(job_id, second['attempts'], {'ok': True})
+    job = store.get(job_id)
+    assert (job['status'], job['result']) == (DONE, {'ok': True})
+
+
+def test_fail_requeues_then_fails_when_attempts_are_used_up(store):
+    job_id = store.submit('roadmap', {}, max_attempts=2)
+    job = store.claim()
+    assert store.fail(job_id, job['attempts'], 'boom')
+    assert store.get(job_id)['status'] == QUEUED
+    store._conn().execute('UPDATE jobs SET run_after = 0 WHERE id = ?', (job_id,))
+    job = store.claim()
+    assert store.fail(job_id, job['attempts'], 'boom again')
+    job = store.get(job_id)
+    assert (job['status'], job['error']) == (FAILED, 'boom again')
+
+
+def test_heartbeat_keeps_a_long_job_leased(store, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setitem(jobs.HANDLERS, 'roadmap', lambda payload, blob: release.wait(5) and {'ok': True})
+    job_id = store.submit('roadmap', {})
+    job = store.claim(lease_seconds=0.3)
+    results = []
+    runner = threading.Thread(target=lambda: results.append(run_job(store, job, heartbeat=0.05)))
+    runner.start()
+    time.sleep(0.8)  # well past the original lease
+    assert store.claim() is None
+    release.set()
+    runner.join()
+    assert results == [True]
+    assert store.get(job_id)['status'] == DONE
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import random
+from collections import OrderedDict
+
+import pytest
+
+import main
+from modules import cooccurrence
+from modules.dedup import DedupIndex
+from modules.resume_parser import ChunkCache
+
+EXPERIENCE = ('Backend engineer at Acme Corp building payment services in python and django with '
+              'postgres on aws, owning the billing pipeline and the public rest api for merchants')
+RESUME = ('Ravi Kumar\nravi@example.com\n\nExperience\n' + EXPERIENCE + '\n\n'
+          'Skills\npython django postgres aws docker kubernetes git linux\n')
+
+
+def _post(path, payload, headers=()):
+    """Send one JSON POST through the ASGI app; returns (status, decoded body)."""
+    body = json.dumps(payload).encode()
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'server': ('test', 80), 'client': ('127.0.0.1', 1),
+             'headers': [(b'content-type', b'application/json'),
+                         (b'content-length', str(len(body)).encode()), *headers]}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(main.app(scope, receive, send))
+    status = sent[0]['status']
+    return status, json.loads(b''.join(m.get('body', b'') for m in sent[1:]))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(main, 'dedup_index', DedupIndex())
+    monkeypatch.setattr(main, 'analysis_cache', OrderedDict())
+    monkeypatch.setattr(main, 'chunk_cache', ChunkCache())
+    monkeypatch.setattr(cooccurrence, 'record_resume', lambda skills: None)
+    return main
+
+
+def test_identical_resume_reuses_cached_analysis(service):
+    first, _ = service._parse_deduplicated(RESUME)
+    again, match = service._parse_deduplicated(RESUME)
+    assert again is first
+    assert match is not None
+
+
+def test_edited_reupload_is_parsed_again_from_paragraph_cache(service):
+    first, _ = service._parse_deduplicated(RESUME)
+    edited = RESUME + '\nProjects\nBuilt a graphql gateway\n'
+    details, match = service._parse_deduplicated(edited)
+    assert match is not None  # still reported as a near-duplicate
+    assert 'graphql' in details['skills'] and 'graphql' not in first['skills']
+    assert service.chunk_cache.stats()['hits'] > 0
+
+
+def test_parse_degraded_before_the_parse_is_not_cached_or_indexed(service):
+    deadline = main.Deadline()
+    deadline.skip('ocr')  # e.g. scanned pages left out during extraction
+    details, _ = service._parse_deduplicated(RESUME, deadline=deadline)
+    assert details['skills']
+    assert len(service.analysis_cache) == 0
+    assert len(service.dedup_index) == 0
+    full, match = service._parse_deduplicated(RESUME)
+    assert full is not details and match is None
+    assert len(service.analysis_cache) == 1 and len(service.dedup_index) == 1
+
+
+def test_roadmap_route_builds_a_roadmap():
+    status, roadmap = _post('/api/roadmap', {'goal': 'Backend developer with docker and kubernetes',
+                                             'skill_level': 'beginner', 'time_available': '3 months',
+                                             'current_skills': ['python']})
+    assert status == 200, roadmap
+    assert roadmap == main.generate_roadmap(['python'], ['docker', 'kubernetes'])
+    status, explicit = _post('/api/roadmap', {'current_skills': ['python'], 'target_skills': ['react']})
+    assert status == 200 and explicit == main.generate_roadmap(['python'], ['react'])
+
+
+def test_arrival_is_stamped_without_admission_control():
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen.update(scope['state'])
+
+    asyncio.run(main.ArrivalMiddleware(app)({'type': 'http'}, None, None))
+    assert isinstance(seen.get('arrived'), float)
+    assert main.ArrivalMiddleware in [m.cls for m in main.app.user_middleware]
+
+
+def test_streamed_parse_records_get_a_deadline(service):
+    result = service._stream_parse({'resume_text': RESUME, 'deadline_ms': 0.001})
+    assert 'dedup' in result['skipped_stages']
+    assert len(service.analysis_cache) == 0  # degraded, so not cached
+
+
+def test_near_identical_resume_reuses_content_but_not_contact_fields(service):
+    # a full-length resume, as in bulk imports: a new header changes few of its shingles
+    rnd = random.Random(5)
+    words = EXPERIENCE.split()
+    resume = RESUME + ''.join('\n' + ' '.join(rnd.sample(words, 20)) + '\n' for _ in range(15))
+    first, _ = service._parse_deduplicated(resume)
+    other = resume.replace('Ravi Kumar\nravi@example.com', 'Asha Rao\nasha@example.org')
+    details, match = service._parse_deduplicated(other)
+    assert match is not None and match.similarity >= main.DEDUP_REUSE_SIMILARITY
+    assert details['skills'] is first['skills']
+    assert (details['name'], details['email']) == ('Asha Rao', 'asha@example.org')
+    assert service.dedup_stats['reused_near'] >= 1
@@ -0,0 +1,24 @@
+import io
+import random
+
+from pdfminer.high_level import extract_text
+
+from modules import pdf_parallel
+from tools.bench_pdf_extract import synthetic_pdf
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    data = synthetic_pdf(8, random.Random(3), lines_per_page=5)
+    serial = extract_text(io.BytesIO(data))
+    try:
+        assert pdf_parallel.extract_text_parallel(data, 8, workers=2) == serial
+        pool = pdf_parallel._pool
+        victim = next(iter(pool._processes.values()))
+        victim.kill()  # as if OOM-killed or crashed on a malformed PDF
+        victim.join()
+        assert pdf_parallel.extract_text_parallel(data, 8, workers=2) == serial
+        assert pdf_parallel._pool is not pool
+    finally:
+        if pdf_parallel._pool is not None:
+            pdf_parallel._pool.shutdown()
+            pdf_parallel._pool = None
@@ -0,0 +1,24 @@
+from modules.resume_parser import parse_resume_text
+from modules.sections import segment
+
+
+def test_headerless_resume_does_not_count_education_dates_as_experience():
+    text = 'Ravi Kumar\nravi@example.com\n\nB.Tech 2016 - 2020\nSchool 2004 - 2016\n\npython sql'
+    assert parse_resume_text(text)['experience_years'] == 0
+
+
+def test_resume_without_experience_section_uses_explicit_years_only():
+    text = ('Ravi Kumar\n\nSummary\nBackend engineer with 3 years of python\n\n'
+            'Education\nB.Tech 2012 - 2016\n')
+    assert parse_resume_text(text)['experience_years'] == 3
+
+
+def test_experience_section_ranges_are_summed_and_education_ignored():
+    text = ('Ravi Kumar\n\nExperience\nAcme Jan 2018 - Dec 2020\n\n'
+            'Education\nB.Tech 2014 - 2018\n')
+    assert parse_resume_text(text)['experience_years'] == 3
+
+
+def test_inline_label_line_is_not_a_section_header():
+    text = 'Ravi Kumar\nProfile: backend engineer\nSkills: python, sql\n\nEducation\nB.Tech\n'
+    assert [s.label for s in segment(text)] == ['contact', 'education']
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from modules.admission import ClientLimiter
+from modules.rpc import RpcClient, RpcError, RpcServer, pack_frame, unpack_body
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Start an RpcServer on a Unix socket in a background loop; yields a factory."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(methods, **kwargs):
+        path = str(tmp_path / f'rpc{len(servers)}.sock')
+        server = asyncio.run_coroutine_threadsafe(RpcServer(methods, **kwargs).start(path), loop).result(5)
+        servers.append(server)
+        return path, server
+
+    yield start
+    for server in servers:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_frame_round_trip():
+    request = {'id': 7, 'calls': [{'method': 'echo', 'params': {'text': 'héllo', 'raw': b'\x00\xff', 'n': [1, 2.5]}}]}
+    frame = pack_frame(request)
+    assert int.from_bytes(frame[:4], 'big') == len(frame) - 4
+    assert unpack_body(frame[4:]) == request
+
+
+def test_pipelined_requests_over_unix_socket(serve):
+    path, server = serve({'echo': lambda params: params, 'boom': lambda params: 1 / 0}, token=None)
+    client = RpcClient(path=path, token=None)
+    try:
+        answers = client.pipeline([[('echo', {'i': i})] for i in range(50)] + [[('boom', {}), ('nope', {})]])
+        assert [a[0]['result'] for a in answers[:50]] == [{'i': i} for i in range(50)]
+        boom, unknown = answers[50]
+        assert 'division by zero' in boom['error']
+        assert 'unknown method' in unknown['error']
+        assert client.call('echo', x=1) == {'x': 1}
+    finally:
+        client.close()
+    assert server.requests == 52
+
+
+def test_token_is_checked_before_any_call(serve):
+    path, _ = serve({'echo': lambda params: params}, token='s3cret')
+    good = RpcClient(path=path, token='s3cret')
+    bad = RpcClient(path=path, token='wrong')
+    try:
+        assert good.call('echo', ok=True) == {'ok': True}
+        with pytest.raises(RpcError):
+            bad.call('echo', ok=True)
+        assert bad._sock is None  # closed, not left holding unread frames
+    finally:
+        good.close()
+        bad.close()
+
+
+def test_calls_are_rate_limited_per_user(serve):
+    path, server = serve({'echo': lambda params: params}, token=None, limiter=ClientLimiter(rate=0.001, burst=2))
+    client = RpcClient(path=path, token=None)
+    try:
+        results = client.batch([('echo', {})] * 3)
+        assert ['result' in r for r in results] == [True, True, False]
+        assert results[2]['error'] == 'rate limit exceeded' and results[2]['retry_after'] > 0
+    finally:
+        client.close()
+    assert server.rate_limited == 1
+
+
+def test_tcp_listener_requires_a_token():
+    with pytest.raises(RuntimeError):
+        asyncio.run(RpcServer({}, token=None).start(port=0))
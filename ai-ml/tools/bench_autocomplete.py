@@ -0,0 +1,108 @@
+"""Benchmark the skill autocomplete index.
+
+Builds the index from the real vocabulary plus --extra synthetic skill names (to see
+how it scales past today's few hundred skills), then replays keystrokes: every prefix
+of sampled skills as a user types them, a share of them with one typo. Reports build
+time, index size and per-lookup latency; with --http the same queries go to a running
+service's /api/skills/autocomplete on one keep-alive connection.
+
+    python tools/bench_autocomplete.py --extra 20000
+    python tools/bench_autocomplete.py --http http://127.0.0.1:8000
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import string
+import sys
+import time
+from urllib.parse import quote, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import autocomplete
+
+
+def synthetic_terms(n, rnd):
+    terms = {}
+    for _ in range(n):
+        words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(3, 9)))
+                 for _ in range(rnd.choice((1, 1, 1, 2, 2, 3)))]
+        name = ' '.join(words)
+        terms[name] = (name, float(int(rnd.paretovariate(1.2))))
+    return terms
+
+
+def typo(word, rnd):
+    i = rnd.randrange(len(word))
+    op = rnd.randrange(3)
+    if op == 0:
+        return word[:i] + word[i + 1:]
+    if op == 1:
+        return word[:i] + rnd.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + word[i + 1:i + 2] + word[i:i + 1] + word[i + 2:]
+
+
+def keystrokes(names, n, typo_rate, rnd):
+    queries = []
+    while len(queries) < n:
+        name = rnd.choice(names).lower()
+        if len(name) >= 5 and rnd.random() < typo_rate:
+            name = typo(name, rnd)
+        queries += [name[:i] for i in range(1, len(name) + 1)]
+    return queries[:n]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(name, samples):
+    print(f'{name:<22} p50 {percentile(samples, .5) * 1e6:7.1f} us  p99 {percentile(samples, .99) * 1e6:7.1f} us  '
+          f'max {max(samples) * 1e6:7.1f} us  {len(samples) / sum(samples):9.0f} lookups/s')
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark skill autocomplete')
+    ap.add_argument('--extra', type=int, default=5000, help='synthetic skills added to the vocabulary')
+    ap.add_argument('--queries', type=int, default=20000)
+    ap.add_argument('--typo-rate', type=float, default=0.3)
+    ap.add_argument('--limit', type=int, default=10)
+    ap.add_argument('--http', help='base URL of a running service')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    rnd = random.Random(args.seed)
+
+    terms = autocomplete.vocabulary()
+    terms.update(synthetic_terms(args.extra, rnd))
+    start = time.perf_counter()
+    index = autocomplete.SkillIndex(terms)
+    stats = index.stats()
+    print(f"built in {time.perf_counter() - start:.2f}s: {stats['skills']} skills, {stats['keys']} keys, "
+          f"{stats['deletion_keys']} deletion keys")
+    queries = keystrokes(index.names, args.queries, args.typo_rate, rnd)
+
+    samples = []
+    for q in queries:
+        t = time.perf_counter()
+        index.complete(q, args.limit)
+        samples.append(time.perf_counter() - t)
+    report('in-process', samples)
+
+    if args.http:
+        url = urlparse(args.http)
+        conn = http.client.HTTPConnection(url.hostname, url.port or 80)
+        samples = []
+        for q in queries[:2000]:
+            t = time.perf_counter()
+            conn.request('GET', f'/api/skills/autocomplete?q={quote(q)}&limit={args.limit}')
+            json.loads(conn.getresponse().read())
+            samples.append(time.perf_counter() - t)
+        report('http (keep-alive)', samples)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
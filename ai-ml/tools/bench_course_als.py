@@ -0,0 +1,121 @@
+"""Benchmark the ALS course recommender on synthetic interactions.
+
+Users belong to a field and take 3-8 courses, mostly from that field's catalogue list
+and some from others, so the factorisation has real structure to find. Reports ALS
+training time per iteration, hit rate of one held-out course per user in the top 10
+(against a popularity baseline), model size, and recommendation latency for known
+users, folded-in new users and the blended get_recommendations path.
+
+    python tools/bench_course_als.py --users 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules import collaborative as cf
+from modules import recommendation_engine as re_
+from modules.Courses import android_course, ds_course, ios_course, uiux_course, web_course
+
+FIELDS = (ds_course, web_course, android_course, ios_course, uiux_course)
+
+
+def synthetic(n_users, seed):
+    """CSR interactions plus one held-out course per user."""
+    rng = np.random.default_rng(seed)
+    items = list(re_.COURSE_LINKS)
+    field_items = [np.array([items.index(t) for t, _ in f]) for f in FIELDS]
+    counts = rng.integers(3, 9, n_users)
+    field = rng.integers(0, len(FIELDS), n_users)
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    user_of = np.repeat(np.arange(n_users), counts)
+    # 85% of picks from the user's field (skewed towards its first courses), the rest anywhere
+    own = rng.random(len(user_of)) < 0.85
+    rank = np.minimum(rng.geometric(0.25, len(user_of)) - 1, 9)
+    picks = np.where(own, np.stack(field_items)[field[user_of], rank], rng.integers(0, len(items), len(user_of)))
+    # drop duplicate picks within a user; hold out each user's last distinct course
+    key = np.unique(user_of * len(items) + picks)
+    user_of, picks = key // len(items), (key % len(items)).astype(np.int32)
+    last = np.r_[user_of[1:] != user_of[:-1], True]
+    held = np.full(n_users, -1)
+    held[user_of[last]] = picks[last]
+    keep = ~last
+    user_of, picks = user_of[keep], picks[keep]
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(user_of, minlength=n_users), out=indptr[1:])
+    return items, indptr, picks, np.ones(len(picks), dtype=np.float32), held
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def timed(fn, n):
+    samples = []
+    for i in range(n):
+        t = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t)
+    return f'p50 {percentile(samples, .5) * 1e6:7.0f} us  p99 {percentile(samples, .99) * 1e6:7.0f} us'
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark the ALS course recommender')
+    ap.add_argument('--users', type=int, default=1000000)
+    ap.add_argument('--factors', type=int, default=cf.FACTORS)
+    ap.add_argument('--iterations', type=int, default=10)
+    ap.add_argument('--eval-users', type=int, default=20000)
+    ap.add_argument('--queries', type=int, default=2000)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    items, indptr, indices, values, held = synthetic(args.users, args.seed)
+    print(f'{args.users} users x {len(items)} courses, {len(values)} interactions')
+    start = time.perf_counter()
+    marks = []
+    X, Y = cf.train_als(indptr, indices, values, len(items), args.factors, args.iterations, seed=args.seed,
+                        callback=lambda it, X, Y: marks.append(time.perf_counter()))
+    total = time.perf_counter() - start
+    per_iter = np.diff([start] + marks)
+    print(f'training: {total:.1f}s for {args.iterations} iterations '
+          f'({per_iter.mean():.2f}s/iteration, k={args.factors})')
+
+    ids = [f'user{i}@example.com' for i in range(args.users)]
+    model = cf.CourseModel(items, Y, cf.REG, cf.ALPHA, ids, X, indptr, indices)
+    path = os.path.join(os.path.dirname(cf.MODEL_PATH), 'bench_course_als.npz')
+    model.save(path)
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    model = cf.CourseModel.load(path)
+    print(f'model file {size / 2**20:.1f} MiB, loaded in {time.perf_counter() - start:.2f}s')
+    os.remove(path)
+
+    rng = np.random.default_rng(args.seed + 1)
+    sample = rng.choice(args.users, min(args.eval_users, args.users), replace=False)
+    popular = np.argsort(-np.bincount(indices, minlength=len(items)))
+    hits = pop_hits = 0
+    for u in sample:
+        top = {model.items.index(t) for t, _ in model.recommend(ids[u], k=10)}
+        hits += held[u] in top
+        seen = set(indices[indptr[u]:indptr[u + 1]].tolist())
+        pop_hits += held[u] in [i for i in popular if i not in seen][:10]
+    print(f'hit rate@10 on a held-out course: ALS {hits / len(sample):.3f}, popularity {pop_hits / len(sample):.3f}')
+
+    users = rng.integers(0, args.users, args.queries)
+    print('known user top-10:   ', timed(lambda i: model.recommend(ids[users[i]], k=10), args.queries))
+    folds = [{items[j]: 1.0 for j in indices[indptr[u]:indptr[u + 1]]} for u in users]
+    print('folded-in user top-10:', timed(lambda i: model.recommend(courses=folds[i], k=10), args.queries))
+    cf._default = model
+    print('get_recommendations:  ', timed(lambda i: re_.get_recommendations(['Python', 'Tensorflow', 'Flask'], ['Docker'],
+                                                                           ids[users[i]]), args.queries))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
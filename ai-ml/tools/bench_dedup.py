@@ -0,0 +1,96 @@
+"""Benchmark the MinHash LSH near-duplicate index.
+
+Fills an index with N unrelated resumes (random signatures stand in for the bulk, so a
+million entries build in reasonable time), plants real near-duplicate pairs made by
+small edits to synthetic resume text, then reports index memory, lookup latency and how
+many planted duplicates and distinct resumes were classified correctly.
+
+    python tools/bench_dedup.py --docs 1000000 --pairs 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import dedup
+from modules.resume_parser import DEFAULT_SKILLS
+
+WORDS = ('led', 'team', 'built', 'designed', 'project', 'users', 'delivered', 'improved', 'system', 'worked',
+         'api', 'service', 'pipeline', 'data', 'product', 'features', 'performance', 'customers', 'cloud',
+         'migration', 'latency', 'tests', 'release', 'mentored', 'engineers', 'dashboard', 'reports')
+
+
+def resume_text(rnd):
+    words = WORDS + tuple(s.lower() for s in DEFAULT_SKILLS)
+    return ' '.join(rnd.choice(words) for _ in range(rnd.randint(250, 600)))
+
+
+def edit(text, rnd, fraction):
+    """Replace/drop a small fraction of words, like a re-saved or lightly updated resume."""
+    words = text.split()
+    for _ in range(int(len(words) * fraction)):
+        i = rnd.randrange(len(words))
+        if rnd.random() < 0.5:
+            words[i] = rnd.choice(WORDS)
+        else:
+            del words[i]
+    return ' '.join(words)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark the near-duplicate index')
+    ap.add_argument('--docs', type=int, default=200000, help='unrelated resumes in the index')
+    ap.add_argument('--pairs', type=int, default=300, help='planted near-duplicate pairs')
+    ap.add_argument('--edit', type=float, default=0.02, help='fraction of words edited in a duplicate')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    rnd = random.Random(args.seed)
+
+    index = dedup.DedupIndex()
+    start = time.perf_counter()
+    for i in range(args.docs):
+        index.add(f'bulk-{i}', [rnd.getrandbits(32) for _ in range(dedup.NUM_PERM)])
+    index._merge()
+    build = time.perf_counter() - start
+
+    originals, sig_times = [], []
+    for i in range(args.pairs):
+        text = resume_text(rnd)
+        t = time.perf_counter()
+        sig = dedup.signature(text)
+        sig_times.append(time.perf_counter() - t)
+        index.add(f'orig-{i}', sig)
+        originals.append(text)
+
+    lookups, found, false_hits = [], 0, 0
+    for i, text in enumerate(originals):
+        dup_sig = dedup.signature(edit(text, rnd, args.edit))
+        fresh_sig = dedup.signature(resume_text(rnd))
+        for sig, expect in ((dup_sig, f'orig-{i}'), (fresh_sig, None)):
+            t = time.perf_counter()
+            match = index.query(sig)
+            lookups.append(time.perf_counter() - t)
+            if expect and match and match.ref == expect:
+                found += 1
+            elif not expect and match:
+                false_hits += 1
+
+    print(f'indexed {len(index)} resumes in {build:.1f}s, index memory {index.memory_bytes() / 2**20:.1f} MiB '
+          f'({index.memory_bytes() / len(index):.0f} B/resume, refs excluded)')
+    print(f'signature: p50 {percentile(sig_times, .5) * 1e3:.2f} ms  p99 {percentile(sig_times, .99) * 1e3:.2f} ms')
+    print(f'lookup:    p50 {percentile(lookups, .5) * 1e6:.0f} us  p99 {percentile(lookups, .99) * 1e6:.0f} us')
+    print(f'near-duplicates found {found}/{args.pairs} ({args.edit:.0%} of words edited), '
+          f'false matches {false_hits}/{args.pairs} distinct resumes')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Benchmark streaming DOCX extraction against the python-docx object model.
+
+Writes synthetic resume-template .docx files (name and contact line in the page header,
+skills in a table and in a text box, body paragraphs scaled by --paragraphs) and reads
+each one with modules/docx_stream.py and with python-docx's Document().paragraphs, the
+previous extraction path. Reports median time, peak Python memory (tracemalloc) and how
+many of DEFAULT_SKILLS each path finds. "iter KiB" is the streaming reader's peak when
+paragraphs are consumed as they are yielded, i.e. without holding the output text.
+
+    python tools/bench_docx_extract.py --paragraphs 50 500 5000
+"""
+import argparse
+import io
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.docx_stream import iter_docx_text, read_docx_text
+from modules.resume_parser import DEFAULT_SKILLS
+
+NS = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+      'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+      'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+      'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+      'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+      'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+      'xmlns:v="urn:schemas-microsoft-com:vml"')
+WORDS = ('led', 'team', 'built', 'designed', 'project', 'users', 'delivered', 'improved', 'system', 'worked',
+         'api', 'service', 'pipeline', 'data', 'product', 'features', 'performance', 'customers', 'cloud')
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/header1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>'
+    '</Types>')
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="word/document.xml"/></Relationships>')
+DOC_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" '
+    'Target="header1.xml"/></Relationships>')
+
+
+def _p(text):
+    return f'<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def _text_box(lines):
+    inner = ''.join(_p(l) for l in lines)
+    return ('<w:p><w:r><mc:AlternateContent><mc:Choice Requires="wps"><w:drawing><wp:anchor><a:graphic>'
+            f'<a:graphicData><wps:wsp><wps:txbx><w:txbxContent>{inner}</w:txbxContent></wps:txbx></wps:wsp>'
+            '</a:graphicData></a:graphic></wp:anchor></w:drawing></mc:Choice><mc:Fallback><w:pict><v:shape>'
+            f'<v:textbox><w:txbxContent>{inner}</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>'
+            '</mc:AlternateContent></w:r></w:p>')
+
+
+def synthetic_docx(paragraphs, rnd):
+    skills = list(DEFAULT_SKILLS)
+    rnd.shuffle(skills)
+    table_skills, box_skills = skills[:12], skills[12:18]
+    rows = ''.join(f'<w:tr><w:tc>{_p(a)}</w:tc><w:tc>{_p(b)}</w:tc></w:tr>'
+                   for a, b in zip(table_skills[::2], table_skills[1::2]))
+    body = [_p('Experience')]
+    body += [_p(' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 30)))) for _ in range(paragraphs)]
+    body += [_p('Skills'), f'<w:tbl>{rows}</w:tbl>', _text_box(['Tools'] + box_skills)]
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {NS}><w:body>{"".join(body)}</w:body></w:document>'
+    header = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:hdr {NS}>{_p("Jane Doe")}{_p("jane@example.com")}</w:hdr>'
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES)
+        zf.writestr('_rels/.rels', ROOT_RELS)
+        zf.writestr('word/_rels/document.xml.rels', DOC_RELS)
+        zf.writestr('word/document.xml', document)
+        zf.writestr('word/header1.xml', header)
+    return out.getvalue()
+
+
+def python_docx_text(data):
+    import docx
+    return '\n'.join(p.text for p in docx.Document(io.BytesIO(data)).paragraphs)
+
+
+def stream_text(data):
+    return read_docx_text(io.BytesIO(data))
+
+
+def measure(fn, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(data)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak, text
+
+
+def iter_peak(data):
+    tracemalloc.start()
+    for _ in iter_docx_text(io.BytesIO(data)):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def skills_found(text):
+    lower = text.lower()
+    return sum(1 for s in DEFAULT_SKILLS if re.search(rf'\b{re.escape(s)}\b', lower))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark DOCX text extraction')
+    ap.add_argument('--paragraphs', type=int, nargs='+', default=[50, 500, 5000])
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    rnd = random.Random(args.seed)
+    print(f'{"paras":>6} {"KiB":>6} | {"python-docx ms":>14} {"peak KiB":>9} {"skills":>6} | '
+          f'{"stream ms":>9} {"peak KiB":>9} {"iter KiB":>8} {"skills":>6} | {"speedup":>7}')
+    for n in args.paragraphs:
+        data = synthetic_docx(n, rnd)
+        base_s, base_peak, base_text = measure(python_docx_text, data, args.repeat)
+        new_s, new_peak, new_text = measure(stream_text, data, args.repeat)
+        print(f'{n:>6} {len(data) / 1024:>6.0f} | {base_s * 1e3:>14.1f} {base_peak / 1024:>9.0f} '
+              f'{skills_found(base_text):>6} | {new_s * 1e3:>9.1f} {new_peak / 1024:>9.0f} {iter_peak(data) / 1024:>8.0f} '
+              f'{skills_found(new_text):>6} | {base_s / new_s:>6.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Benchmark page-parallel PDF text extraction against the serial pdfminer path.
+
+Writes synthetic resume-like PDFs (text pages in a standard font, built here so no PDF
+writer is needed) of each --pages count, extracts each serially and with every
+--workers pool size, checks the parallel text is identical to the serial text and
+reports median times and speedups. Pools are started and warmed before timing, as in
+the service.
+
+    python tools/bench_pdf_extract.py --pages 10 30 60 100 --workers 2 4 8
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import pdf_parallel
+from modules.resume_parser import DEFAULT_SKILLS
+
+WORDS = ('led', 'team', 'built', 'designed', 'project', 'users', 'delivered', 'improved', 'system', 'worked',
+         'api', 'service', 'pipeline', 'data', 'product', 'features', 'performance', 'published', 'journal',
+         'conference', 'proceedings', 'analysis', 'model', 'results', 'study', 'evaluation')
+
+
+def _escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def synthetic_pdf(pages, rnd, lines_per_page=45):
+    """A minimal PDF 1.4 file: one Helvetica text stream per page."""
+    words = WORDS + tuple(DEFAULT_SKILLS)
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for p in range(pages):
+        lines = [f'Page {p + 1}'] + [' '.join(rnd.choice(words) for _ in range(rnd.randint(6, 14)))
+                                     for _ in range(lines_per_page)]
+        body = 'BT /F1 10 Tf 12 TL 50 780 Td ' + ' '.join(f'({_escape(l)}) Tj T*' for l in lines) + ' ET'
+        stream = body.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), pages)
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % i + obj + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for off in offsets:
+        out.write(b'%010d 00000 n \n' % off)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark parallel PDF text extraction')
+    ap.add_argument('--pages', type=int, nargs='+', default=[10, 30, 60, 100])
+    ap.add_argument('--workers', type=int, nargs='+', default=sorted({2, 4, os.cpu_count() or 1}))
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    from pdfminer.high_level import extract_text
+    rnd = random.Random(args.seed)
+
+    print(f'cpus={os.cpu_count()}  threshold={pdf_parallel.PARALLEL_MIN_PAGES} pages (ML_PDF_PARALLEL_MIN_PAGES)')
+    print(f'{"pages":>6} {"KiB":>7} {"serial s":>9}' + ''.join(f' {f"{w} workers s":>12} {"speedup":>8}'
+                                                            for w in args.workers))
+    for pages in args.pages:
+        data = synthetic_pdf(pages, rnd)
+        serial_s, serial_text = timed(lambda: extract_text(io.BytesIO(data)), args.repeat)
+        row = f'{pages:>6} {len(data) / 1024:>7.0f} {serial_s:>9.3f}'
+        for workers in args.workers:
+            pdf_parallel.extract_text_parallel(data, pages, workers)  # start and warm the pool
+            par_s, par_text = timed(lambda: pdf_parallel.extract_text_parallel(data, pages, workers), args.repeat)
+            if par_text != serial_text:
+                print(f'MISMATCH: {pages} pages, {workers} workers', file=sys.stderr)
+                return 1
+            row += f' {par_s:>12.3f} {serial_s / par_s:>7.2f}x'
+        print(row)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
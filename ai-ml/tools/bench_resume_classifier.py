@@ -0,0 +1,120 @@
+"""Evaluate and benchmark the resume field/level classifier.
+
+Evaluation: per-class precision/recall and accuracy of a trained model on labelled data
+(same inputs as train_resume_classifier.py), next to the keyword rules on the same docs.
+
+Benchmark: throughput of featurization and of batched inference at several batch sizes
+on synthetic resumes, against classifying one resume at a time and against the rules.
+
+    python tools/bench_resume_classifier.py --data labelled.jsonl
+    python tools/bench_resume_classifier.py --bench-docs 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules import resume_classifier as rc
+from modules.resume_parser import DEFAULT_SKILLS
+from train_resume_classifier import labelled, load_jsonl, load_resume_dir
+
+FILLER = ('led', 'team', 'built', 'designed', 'project', 'users', 'delivered', 'improved', 'system',
+          'worked', 'with', 'for', 'the', 'a', 'product', 'features', 'performance', 'customers')
+SECTION_LINES = {'summary': 'Summary', 'experience': 'Work Experience', 'internships': 'Internships',
+                 'education': 'Education', 'skills': 'Skills', 'projects': 'Projects'}
+
+
+def synthetic_docs(n, seed=0):
+    rnd = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        skills = rnd.sample(DEFAULT_SKILLS, min(len(DEFAULT_SKILLS), rnd.randint(3, 8)))
+        sections = rnd.sample(list(SECTION_LINES), rnd.randint(2, len(SECTION_LINES)))
+        lines = []
+        for label in sections:
+            lines.append(SECTION_LINES[label])
+            lines.append(' '.join(rnd.choice(FILLER + tuple(skills)) for _ in range(rnd.randint(40, 120))))
+        docs.append({'text': '\n'.join(lines), 'skills': skills, 'sections': sections})
+    return docs
+
+
+def report(name, labels, gold, pred):
+    pairs = list(zip(gold, pred))
+    acc = sum(g == p for g, p in pairs) / max(len(pairs), 1)
+    print(f'\n{name}: accuracy {acc:.3f} on {len(pairs)} docs')
+    print(f"  {'class':<22} {'precision':>9} {'recall':>7} {'support':>8}")
+    for label in labels:
+        tp = sum(1 for g, p in pairs if g == label and p == label)
+        predicted = sum(1 for _, p in pairs if p == label)
+        support = sum(1 for g, _ in pairs if g == label)
+        if support or predicted:
+            print(f'  {label:<22} {tp / predicted if predicted else 0:>9.3f} '
+                  f'{tp / support if support else 0:>7.3f} {support:>8}')
+
+
+def evaluate(model, docs):
+    for key, head, rule in (('field', model.field, lambda d: rc.rule_field(d['skills'])),
+                            ('level', model.level, lambda d: rc.rule_level(d['sections']))):
+        rows, y = labelled(docs, key, list(head.labels))
+        if not rows:
+            continue
+        gold = [head.labels[i] for i in y]
+        report(f'{key} (model)', head.labels, gold, head.predict(model.vectorize(rows)))
+        report(f'{key} (keyword rules)', head.labels, gold, [rule(d) for d in rows])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def benchmark(model, n, batch_sizes):
+    docs = synthetic_docs(n)
+    print(f'\nbenchmark: {n} synthetic resumes, {1 << model.hash_bits} hashed features')
+    t = timed(lambda: [rc.featurize(d['text'], d['skills'], d['sections'], model.hash_bits) for d in docs])
+    print(f"  {'featurize only':<28} {n / t:>10.0f} docs/s")
+    csr = model.vectorize(docs)
+    t = timed(lambda: (model.field.predict_proba(csr), model.level.predict_proba(csr)))
+    print(f"  {'matmul only, one batch':<28} {n / t:>10.0f} docs/s  ({t * 1e3:.1f} ms)")
+    for bs in batch_sizes:
+        t = timed(lambda: [model.classify_batch(docs[i:i + bs]) for i in range(0, n, bs)])
+        print(f"  {f'classify_batch({bs})':<28} {n / t:>10.0f} docs/s")
+    t = timed(lambda: [(rc.rule_field(d['skills']), rc.rule_level(d['sections'])) for d in docs])
+    print(f"  {'keyword rules':<28} {n / t:>10.0f} docs/s")
+    levels = Counter(r['level'] for r in model.classify_batch(docs[:1000]))
+    print(f'  level distribution (first 1000): {dict(levels)}')
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Evaluate and benchmark the resume classifier')
+    ap.add_argument('--model', default=rc.MODEL_PATH)
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument('--data', help='labelled JSONL file to evaluate on')
+    src.add_argument('--resumes', help='directory of resumes, labelled by the keyword rules')
+    ap.add_argument('--bench-docs', type=int, default=2000)
+    ap.add_argument('--batch-sizes', default='1,64,1024')
+    args = ap.parse_args()
+
+    if os.path.exists(args.model):
+        model = rc.ResumeClassifier.load(args.model)
+    else:
+        print(f'{args.model} not found; benchmarking an untrained model (evaluation skipped)')
+        model = rc.ResumeClassifier.untrained()
+        args.data = args.resumes = None
+    if args.data or args.resumes:
+        evaluate(model, load_jsonl(args.data) if args.data else load_resume_dir(args.resumes))
+    if args.bench_docs:
+        benchmark(model, args.bench_docs, [int(b) for b in args.batch_sizes.split(',')])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Serialization benchmark for ML service payloads.
+
+Compares encode time and bytes on the wire for a typical recommendation response and
+a batch of them, across stdlib json, orjson and msgpack, with and without gzip/brotli.
+Encoders whose libraries are not installed are skipped.
+
+    python tools/bench_serialization.py --batch 500 --repeat 200
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import serialization
+from modules.recommendation_engine import get_recommendations
+from modules.roadmap_generator import generate_roadmap
+
+
+def typical_payloads():
+    rec = get_recommendations(['python', 'react', 'figma'], ['tensorflow', 'node', 'kotlin', 'swift'])
+    roadmap = generate_roadmap(['python', 'sql'], ['docker', 'kubernetes', 'aws', 'react', 'node'])
+    return rec, roadmap
+
+
+def encoders():
+    out = {'json': lambda o: json.dumps(o).encode('utf-8')}
+    if serialization.orjson is not None:
+        out['orjson'] = lambda o: serialization.orjson.dumps(o)
+    if serialization.msgpack is not None:
+        out['msgpack'] = serialization.dumps_msgpack
+    return out
+
+
+def compressors():
+    out = {'none': lambda b: b, 'gzip': lambda b: gzip.compress(b, compresslevel=serialization.GZIP_LEVEL)}
+    if serialization.brotli is not None:
+        out['br'] = lambda b: serialization.brotli.compress(b, quality=serialization.BROTLI_QUALITY)
+    return out
+
+
+def bench(fn, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Benchmark response serialization')
+    ap.add_argument('--batch', type=int, default=500, help='records in the batch payload')
+    ap.add_argument('--repeat', type=int, default=200)
+    args = ap.parse_args()
+
+    rec, roadmap = typical_payloads()
+    payloads = {
+        'recommendations': rec,
+        'roadmap': roadmap,
+        f'batch x{args.batch}': [{'index': i, 'result': rec} for i in range(args.batch)],
+    }
+    print(f"{'payload':<18} {'encoder':<8} {'compress':<8} {'encode us':>10} {'total us':>10} {'bytes':>9}")
+    for name, payload in payloads.items():
+        repeat = args.repeat if not name.startswith('batch') else max(1, args.repeat // 20)
+        for enc_name, enc in encoders().items():
+            body = enc(payload)
+            enc_us = bench(enc, payload, repeat)
+            for comp_name, comp in compressors().items():
+                wire = comp(body)
+                total_us = enc_us + (bench(comp, body, repeat) if comp_name != 'none' else 0)
+                print(f'{name:<18} {enc_name:<8} {comp_name:<8} {enc_us:>10.1f} {total_us:>10.1f} {len(wire):>9}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
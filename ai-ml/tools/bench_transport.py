@@ -0,0 +1,170 @@
+"""Latency comparison: JSON HTTP routes vs the msgpack RPC transport.
+
+Runs the same workload (skill gap, recommendations, roadmap and resume parsing calls)
+against a running service over
+
+  - HTTP/JSON, a new connection per request (what the Node backend does today),
+  - HTTP/JSON on one keep-alive connection,
+  - RPC, one call per frame, one batched frame per N calls, and pipelined batches.
+
+    ML_RPC_SOCKET=/tmp/ml.sock python main.py
+    python tools/bench_transport.py --http http://127.0.0.1:8000 --rpc-socket /tmp/ml.sock
+
+With --standalone an in-process RPC server is started on a temporary socket with the
+plain module functions, so the RPC side can be measured without the web stack.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.recommendation_engine import get_recommendations
+from modules.resume_parser import DEFAULT_SKILLS, parse_resume_text
+from modules.roadmap_generator import generate_roadmap
+from modules.rpc import RpcClient, RpcServer
+from modules.skill_gap_analyzer import analyze_skill_gap
+
+HTTP_ROUTES = {
+    'analyze_skill_gap': '/api/skill-gap',
+    'get_recommendations': '/api/recommendations',
+    'parse_resume': '/api/parse-resume',
+}
+
+
+def workload(n, seed=0):
+    rnd = random.Random(seed)
+    calls = []
+    for i in range(n):
+        current = rnd.sample(DEFAULT_SKILLS, 4)
+        target = rnd.sample(DEFAULT_SKILLS, 5)
+        kind = i % 4
+        if kind == 0:
+            calls.append(('analyze_skill_gap', {'current_skills': current, 'target_skills': target}))
+        elif kind == 1:
+            calls.append(('get_recommendations', {'current_skills': current, 'target_skills': target}))
+        elif kind == 2:
+            calls.append(('generate_roadmap', {'current_skills': current, 'target_skills': target}))
+        else:
+            text = f'Experience\nBuilt services with {", ".join(current)}. 3 years of experience.\nSkills: {", ".join(target)}'
+            calls.append(('parse_resume', {'resume_text': text}))
+    return calls
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1e3
+    return f'p50 {pick(.5):7.3f} ms  p99 {pick(.99):7.3f} ms'
+
+
+def report(name, samples, calls):
+    total = sum(samples)
+    print(f'{name:<34} {percentiles(samples)}  {calls / total:9.0f} calls/s')
+
+
+def bench_http(base, calls, keep_alive):
+    url = urlparse(base)
+    calls = [(m, p) for m, p in calls if m in HTTP_ROUTES]
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80) if keep_alive else None
+    samples = []
+    for method, params in calls:
+        body = json.dumps(params)
+        start = time.perf_counter()
+        c = conn or http.client.HTTPConnection(url.hostname, url.port or 80)
+        c.request('POST', HTTP_ROUTES[method], body, {'Content-Type': 'application/json'})
+        resp = c.getresponse()
+        json.loads(resp.read())
+        if not keep_alive:
+            c.close()
+        samples.append(time.perf_counter() - start)
+    report(f"http json ({'keep-alive' if keep_alive else 'new conn'})", samples, len(calls))
+
+
+def bench_rpc(client, calls, batch, depth):
+    rpc_calls = [(m, p) for m, p in calls if m in HTTP_ROUTES]
+    samples = []
+    for call in rpc_calls:
+        start = time.perf_counter()
+        client.batch([call])
+        samples.append(time.perf_counter() - start)
+    report('rpc msgpack (1 call/frame)', samples, len(rpc_calls))
+
+    samples = []
+    for i in range(0, len(calls), batch):
+        start = time.perf_counter()
+        client.batch(calls[i:i + batch])
+        samples.append(time.perf_counter() - start)
+    report(f'rpc msgpack (batch {batch}, per batch)', samples, len(calls))
+
+    samples = []
+    batches = [calls[i:i + batch] for i in range(0, len(calls), batch)]
+    for i in range(0, len(batches), depth):
+        start = time.perf_counter()
+        client.pipeline(batches[i:i + depth])
+        samples.append(time.perf_counter() - start)
+    report(f'rpc msgpack (pipeline {depth}x{batch})', samples, len(calls))
+
+
+def start_standalone():
+    path = os.path.join(tempfile.mkdtemp(), 'ml-rpc.sock')
+    methods = {
+        'parse_resume': lambda p: {'skills': parse_resume_text(p['resume_text'])},
+        'analyze_skill_gap': lambda p: analyze_skill_gap(p['current_skills'], p['target_skills']),
+        'get_recommendations': lambda p: get_recommendations(p['current_skills'], p['target_skills']),
+        'generate_roadmap': lambda p: generate_roadmap(p['current_skills'], p['target_skills']),
+    }
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(RpcServer(methods).start(path))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return path
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Compare JSON HTTP and msgpack RPC latency')
+    ap.add_argument('--http', help='base URL of the running service, e.g. http://127.0.0.1:8000')
+    ap.add_argument('--rpc-socket', help='Unix socket of the RPC listener (ML_RPC_SOCKET)')
+    ap.add_argument('--rpc-port', type=int, help='TCP port of the RPC listener (ML_RPC_PORT)')
+    ap.add_argument('--standalone', action='store_true', help='start an in-process RPC server')
+    ap.add_argument('--calls', type=int, default=2000)
+    ap.add_argument('--batch', type=int, default=50)
+    ap.add_argument('--depth', type=int, default=4, help='batches in flight when pipelining')
+    args = ap.parse_args()
+
+    calls = workload(args.calls)
+    # warm caches and lazy imports on both sides before timing
+    if args.standalone:
+        args.rpc_socket = start_standalone()
+    if args.http:
+        bench_http(args.http, calls[:20], keep_alive=True)
+    if args.rpc_socket or args.rpc_port:
+        client = RpcClient(path=args.rpc_socket, port=args.rpc_port)
+        client.batch(calls[:20])
+
+    print(f'{len(calls)} calls (skill gap / recommendations / roadmap / parse)')
+    if args.http:
+        bench_http(args.http, calls, keep_alive=False)
+        bench_http(args.http, calls, keep_alive=True)
+    if args.rpc_socket or args.rpc_port:
+        bench_rpc(client, calls, args.batch, args.depth)
+        client.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
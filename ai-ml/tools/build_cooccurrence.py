@@ -0,0 +1,68 @@
+"""Rebuild the skill co-occurrence snapshot from stored resumes.
+
+Input is a JSONL file with one skill list per line ({"skills": [...]}, or a bare JSON
+list), or a directory of resumes (pdf/docx/txt) parsed here. The role profiles are
+always added as the seed, so the result is what the service would have learned from
+those resumes on top of a fresh start.
+
+    python tools/build_cooccurrence.py --data skills.jsonl
+    python tools/build_cooccurrence.py --resumes core/Uploaded_Resumes --out data/skill_cooccurrence.bin
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import cooccurrence
+from modules.resume_parser import extract_text_generic, parse_resume_text
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+def skills_from_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                doc = json.loads(line)
+                yield doc if isinstance(doc, list) else doc.get('skills') or []
+
+
+def skills_from_resumes(path):
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(RESUME_EXTENSIONS):
+            continue
+        try:
+            text, _ = extract_text_generic(os.path.join(path, name))
+        except Exception as e:
+            print(f'skip {name}: {e}', file=sys.stderr)
+            continue
+        yield parse_resume_text(text)['skills']
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Rebuild the skill co-occurrence snapshot')
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument('--data', help='JSONL file of skill lists')
+    src.add_argument('--resumes', help='directory of resumes to parse')
+    ap.add_argument('--out', default=cooccurrence.SNAPSHOT_PATH)
+    ap.add_argument('--show', default='Python', help='comma-separated skills to print suggestions for')
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    model = cooccurrence.seeded()
+    for skills in skills_from_jsonl(args.data) if args.data else skills_from_resumes(args.resumes):
+        model.add(skills)
+    model.save(args.out)
+    print(f'{model.n_docs} weighted documents, {len(model)} skills in {time.perf_counter() - start:.1f}s '
+          f'-> {args.out} ({os.path.getsize(args.out)} bytes)')
+    wanted = [s for s in args.show.split(',') if s.strip()]
+    for row in model.related(wanted, 10):
+        print(f"  {row['skill']:<30} pmi {row['score']:7.3f}  together {row['cooccurrences']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Maintain the content-addressed upload store (modules/blob_store.py).
+
+    python tools/manage_blobs.py stats
+    python tools/manage_blobs.py import core/Uploaded_Resumes   # move the legacy folder in
+    python tools/manage_blobs.py gc --max-bytes 2000000000 --max-age-days 90
+
+import stores every file of a directory under its content hash (identical files once)
+and remembers the file name it had, which is what user_data.pdf_name refers to; with
+--delete the originals are removed once stored. gc applies the eviction policy now.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import blob_store
+
+
+def human(n):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024 or unit == 'GiB':
+            return f'{n:.1f} {unit}' if unit != 'B' else f'{n} B'
+        n /= 1024
+
+
+def cmd_import(store, args):
+    start, files, size = time.perf_counter(), 0, 0
+    before = store.stats()
+    for name in sorted(os.listdir(args.directory)):
+        path = os.path.join(args.directory, name)
+        if not os.path.isfile(path):
+            continue
+        store.put_file(path, name)
+        files += 1
+        size += os.path.getsize(path)
+        if args.delete:
+            os.unlink(path)
+    after = store.stats()
+    print(f'imported {files} files ({human(size)}) in {time.perf_counter() - start:.1f}s: '
+          f'{after["blobs"] - before["blobs"]} new blobs, {human(after["bytes"] - before["bytes"])} added')
+
+
+def cmd_gc(store, args):
+    before = store.stats()
+    evicted = store.enforce()
+    after = store.stats()
+    print(f'evicted {len(evicted)} blobs, {human(before["bytes"] - after["bytes"])} freed')
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Maintain the resume upload store')
+    ap.add_argument('--root', default=blob_store.BLOB_DIR)
+    ap.add_argument('--max-bytes', type=int, default=blob_store.MAX_BYTES)
+    ap.add_argument('--max-age-days', type=float, default=blob_store.MAX_AGE_DAYS)
+    sub = ap.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats')
+    imp = sub.add_parser('import')
+    imp.add_argument('directory')
+    imp.add_argument('--delete', action='store_true', help='remove each original once it is stored')
+    sub.add_parser('gc')
+    args = ap.parse_args()
+
+    store = blob_store.BlobStore(args.root, args.max_bytes, args.max_age_days)
+    if args.command == 'import':
+        cmd_import(store, args)
+    elif args.command == 'gc':
+        cmd_gc(store, args)
+    s = store.stats()
+    cap = f' of {human(s["max_bytes"])}' if s['max_bytes'] else ''
+    print(f'{s["blobs"]} blobs, {human(s["bytes"])}{cap}, {s["names"]} upload names')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Memory-per-worker report for the ML service (Linux only).
+
+Starts the service with N workers, waits until it answers, then reads
+``/proc/<pid>/smaps_rollup`` for the master and every worker. PSS splits shared pages
+between the processes that map them, so the PSS total is the real memory cost of the
+pod, and USS (private pages) is what each extra worker adds. ``uvicorn --workers 1`` runs
+the app in the launcher process itself, which is then reported as the one worker. The
+background job pool is turned off (ML_JOB_WORKERS=0) so only service workers are counted.
+
+    python tools/prefork_memory.py --workers 1 8 --mode prefork uvicorn
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+ML_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_smaps_rollup(pid: int) -> Dict[str, int]:
+    """Return Rss/Pss/Private figures for a process in KiB."""
+    out = {'rss': 0, 'pss': 0, 'uss': 0}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            parts = rest.split()
+            if not parts or not parts[0].isdigit():
+                continue
+            kb = int(parts[0])
+            if key == 'Rss':
+                out['rss'] = kb
+            elif key == 'Pss':
+                out['pss'] = kb
+            elif key in ('Private_Clean', 'Private_Dirty'):
+                out['uss'] += kb
+    return out
+
+
+def _is_helper(pid: int) -> bool:
+    # multiprocessing's resource tracker, started next to uvicorn's spawned workers
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return b'resource_tracker' in f.read()
+    except OSError:
+        return True
+
+
+def child_pids(pid: int) -> List[int]:
+    pids = []
+    task_dir = f'/proc/{pid}/task'
+    for tid in os.listdir(task_dir):
+        try:
+            with open(f'{task_dir}/{tid}/children') as f:
+                pids.extend(int(p) for p in f.read().split())
+        except OSError:
+            continue
+    return [p for p in pids if not _is_helper(p)]
+
+
+def _command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == 'prefork':
+        return [sys.executable, 'prefork.py', '--workers', str(workers), '--port', str(port),
+                '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'main:app', '--workers', str(workers),
+            '--port', str(port), '--log-level', 'warning']
+
+
+def measure(mode: str, workers: int, port: int, settle: float) -> Dict:
+    env = dict(os.environ, ML_JOB_WORKERS='0')
+    proc = subprocess.Popen(_command(mode, workers, port), cwd=ML_ROOT, env=env)
+    try:
+        deadline = time.time() + 120
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f'{mode} launcher exited with {proc.returncode}')
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1).read()
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError('service did not come up')
+                time.sleep(0.2)
+        # Let every worker finish booting; uvicorn's own supervisor spawns them lazily
+        time.sleep(settle)
+        # Touch each worker a few times so per-worker lazy state is realistic
+        for _ in range(workers * 4):
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+        master = read_smaps_rollup(proc.pid)
+        kids = [read_smaps_rollup(p) for p in child_pids(proc.pid)]
+        if not kids:
+            # single-process server: the launcher is the worker, there is no master
+            master, kids = {'rss': 0, 'pss': 0, 'uss': 0}, [master]
+    finally:
+        proc.terminate()
+        proc.wait()
+    n = max(len(kids), 1)
+    return {
+        'mode': mode,
+        'workers': len(kids),
+        'master_pss_mb': master['pss'] / 1024,
+        'worker_pss_mb': sum(k['pss'] for k in kids) / n / 1024,
+        'worker_uss_mb': sum(k['uss'] for k in kids) / n / 1024,
+        'total_pss_mb': (master['pss'] + sum(k['pss'] for k in kids)) / 1024,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Report memory per worker for 1 vs N workers')
+    ap.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    ap.add_argument('--mode', nargs='+', choices=['prefork', 'uvicorn'], default=['prefork', 'uvicorn'])
+    ap.add_argument('--port', type=int, default=8766)
+    ap.add_argument('--settle', type=float, default=3.0, help='seconds to wait for workers to boot')
+    args = ap.parse_args()
+
+    print(f"{'mode':>8} {'workers':>7} {'master PSS':>11} {'worker PSS':>11} {'worker USS':>11} {'total PSS':>10}")
+    for mode in args.mode:
+        for n in args.workers:
+            r = measure(mode, n, args.port, args.settle)
+            print(f"{r['mode']:>8} {r['workers']:>7} {r['master_pss_mb']:>9.1f}MB {r['worker_pss_mb']:>9.1f}MB "
+                  f"{r['worker_uss_mb']:>9.1f}MB {r['total_pss_mb']:>8.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
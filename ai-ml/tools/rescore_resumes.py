@@ -0,0 +1,142 @@
+"""Recompute the derived columns of every stored resume in user_data.
+
+After DEFAULT_SKILLS, the section weights or the classifier change, the stored
+resume_score, Actual_skills, Predicted_Field and User_level values are stale. This walks
+user_data in primary-key order (keyset pagination: WHERE ID > last ORDER BY ID LIMIT n),
+rescores each page in a process pool (extracted text comes from the text cache when the
+resume was analysed before, the PDF is only parsed otherwise), and writes the rows that
+changed back in one transaction per page. The last committed ID is checkpointed after
+every page, so an interrupted run picks up where it stopped; a run that finishes
+removes its checkpoint.
+
+    python tools/rescore_resumes.py --workers 8
+    python tools/rescore_resumes.py --dry-run --page-size 200
+    python tools/rescore_resumes.py --restart        # ignore the checkpoint
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import rescore
+from modules.blob_store import BLOB_DIR
+from modules.resources import DATA_DIR
+from modules.text_cache import TEXT_CACHE_DB
+
+COLUMNS = ('resume_score', 'Actual_skills', 'Predicted_Field', 'User_level')
+SELECT_PAGE = ('SELECT ID, pdf_name, Page_no, resume_score, convert(Actual_skills using utf8), '
+               'convert(Predicted_Field using utf8), convert(User_level using utf8) '
+               'FROM user_data WHERE ID > %s ORDER BY ID LIMIT %s')
+UPDATE_ROW = 'UPDATE user_data SET ' + ', '.join(f'{c} = %s' for c in COLUMNS) + ' WHERE ID = %s'
+COUNTERS = ('processed', 'updated', 'unchanged', 'missing', 'failed', 'cached')
+
+
+def load_checkpoint(path, restart):
+    if not restart and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return dict({c: 0 for c in COUNTERS}, last_id=0, elapsed=0.0)
+
+
+def save_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def fetch_page(conn, last_id, size):
+    with conn.cursor() as cursor:
+        cursor.execute(SELECT_PAGE, (last_id, size))
+        return cursor.fetchall()
+
+
+def changes(page, results, state):
+    """UPDATE parameters for rows whose recomputed values differ from the stored ones."""
+    stored = {row[0]: tuple('' if v is None else str(v) for v in row[3:]) for row in page}
+    updates = []
+    for res in results:
+        state['processed'] += 1
+        if res['status'] != 'ok':
+            state[res['status']] += 1
+            if res['status'] == 'failed':
+                print(f"  ID {res['id']}: {res['error']}", file=sys.stderr)
+            continue
+        state['cached'] += res['cached']
+        values = tuple(res['values'][c] for c in COLUMNS)
+        if values == stored[res['id']]:
+            state['unchanged'] += 1
+        else:
+            state['updated'] += 1
+            updates.append(values + (res['id'],))
+    return updates
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Re-score stored resumes with the current rules')
+    ap.add_argument('--host', default='localhost')
+    ap.add_argument('--user', default='root')
+    ap.add_argument('--password', default=os.environ.get('ML_MYSQL_PASSWORD', 'root@MySQL4admin'))
+    ap.add_argument('--db', default='cv')
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    ap.add_argument('--page-size', type=int, default=500)
+    ap.add_argument('--upload-dir', default=rescore.UPLOAD_DIR, help='legacy upload folder')
+    ap.add_argument('--blob-dir', default=BLOB_DIR)
+    ap.add_argument('--text-cache', default=TEXT_CACHE_DB)
+    ap.add_argument('--checkpoint', default=os.path.join(DATA_DIR, 'rescore_checkpoint.json'))
+    ap.add_argument('--restart', action='store_true', help='start from the first row, ignoring the checkpoint')
+    ap.add_argument('--dry-run', action='store_true', help='compute and report, write nothing')
+    args = ap.parse_args()
+
+    import pymysql
+    conn = pymysql.connect(host=args.host, user=args.user, password=args.password, db=args.db)
+    state = load_checkpoint(args.checkpoint, args.restart)
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM user_data WHERE ID > %s', (state['last_id'],))
+        remaining = cursor.fetchone()[0]
+    total = state['processed'] + remaining
+    if state['last_id']:
+        print(f"resuming after ID {state['last_id']} ({state['processed']} rows done)")
+    print(f'{remaining} rows to rescore with {args.workers} workers, pages of {args.page_size}')
+
+    ctx = multiprocessing.get_context('spawn')
+    start, done_before = time.perf_counter(), state['processed']
+    elapsed_before = state['elapsed']
+    with ctx.Pool(args.workers, initializer=rescore.init_worker,
+                  initargs=(args.text_cache, args.upload_dir, args.blob_dir)) as pool:
+        chunksize = max(1, args.page_size // (args.workers * 4))
+        page = fetch_page(conn, state['last_id'], args.page_size)
+        while page:
+            pending = pool.map_async(rescore.rescore_row, [row[:3] for row in page], chunksize)
+            # read the next page while the workers score this one
+            next_page = fetch_page(conn, page[-1][0], args.page_size)
+            updates = changes(page, pending.get(), state)
+            if updates and not args.dry_run:
+                with conn.cursor() as cursor:
+                    cursor.executemany(UPDATE_ROW, updates)
+                conn.commit()
+            state['last_id'] = page[-1][0]
+            run_time = time.perf_counter() - start
+            state['elapsed'] = elapsed_before + run_time
+            if not args.dry_run:
+                save_checkpoint(args.checkpoint, state)
+            rate = (state['processed'] - done_before) / max(run_time, 1e-9)
+            eta = (total - state['processed']) / rate if rate else 0
+            print(f"{state['processed']}/{total} rows  {rate:.1f} rows/s  eta {eta:.0f}s  "
+                  f"updated {state['updated']}  unchanged {state['unchanged']}  missing {state['missing']}  "
+                  f"failed {state['failed']}  text cache hits {state['cached']}", flush=True)
+            page = next_page
+    conn.close()
+    if not args.dry_run and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)  # finished: the next run starts from the first row
+    print(f"done: {state['processed']} rows in {state['elapsed']:.1f}s, {state['updated']} updated"
+          f"{' (dry run, nothing written)' if args.dry_run else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
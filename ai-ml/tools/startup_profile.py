@@ -0,0 +1,113 @@
+"""Startup profile report for the ML service.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter, summarises the
+slowest imports and checks the total against a time budget. With ``--serve`` it also
+starts uvicorn and measures time-to-first-request against ``GET /``.
+
+    python tools/startup_profile.py --budget-ms 1500 --top 15
+    python tools/startup_profile.py --serve --port 8765
+
+Exits with status 1 when a budget is exceeded so it can gate CI.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+ML_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = float(os.environ.get('ML_STARTUP_BUDGET_MS', '1500'))
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse ``-X importtime`` output into rows of self/cumulative microseconds."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        rows.append({
+            'module': m.group(4),
+            'self_us': int(m.group(1)),
+            'cumulative_us': int(m.group(2)),
+            # importtime indents nested imports by two spaces per level
+            'depth': (len(m.group(3)) - 1) // 2,
+        })
+    return rows
+
+
+def profile_imports(target: str = 'main') -> Dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=ML_ROOT, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'import failed')
+    rows = parse_importtime(proc.stderr)
+    top_level = [r for r in rows if r['depth'] == 0]
+    return {
+        'wall_ms': wall_ms,
+        'import_ms': sum(r['cumulative_us'] for r in top_level) / 1000,
+        'rows': rows,
+    }
+
+
+def time_to_first_request(port: int, timeout: float = 60.0) -> float:
+    """Start uvicorn and return milliseconds until ``GET /`` first succeeds."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=ML_ROOT,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError('uvicorn exited before serving a request')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as resp:
+                    resp.read()
+                return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError('service did not answer within %.0fs' % timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--target', default='main', help='module to import (default: main)')
+    ap.add_argument('--top', type=int, default=15, help='number of slowest imports to list')
+    ap.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                    help='time budget for import (and first request with --serve)')
+    ap.add_argument('--serve', action='store_true', help='also measure time-to-first-request')
+    ap.add_argument('--port', type=int, default=8765)
+    args = ap.parse_args()
+
+    report = profile_imports(args.target)
+    print(f"import {args.target}: {report['import_ms']:.1f} ms in imports, "
+          f"{report['wall_ms']:.1f} ms interpreter wall time")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    slowest = sorted(report['rows'], key=lambda r: r['cumulative_us'], reverse=True)[:args.top]
+    for r in slowest:
+        print(f"{r['cumulative_us'] / 1000:14.1f} {r['self_us'] / 1000:9.1f}  {'  ' * r['depth']}{r['module']}")
+
+    over = report['wall_ms'] > args.budget_ms
+    if args.serve:
+        ttfr = time_to_first_request(args.port)
+        print(f'\ntime to first request: {ttfr:.1f} ms')
+        over = over or ttfr > args.budget_ms
+    print(f"\nbudget {args.budget_ms:.0f} ms: {'EXCEEDED' if over else 'ok'}")
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Train the collaborative-filtering course model used by get_recommendations.
+
+Interactions come from the app's MySQL tables (user_data.Recommended_courses per
+Email_ID, weighted by the user's user_feedback score) or from a JSONL file with one
+event per line:
+
+    {"user": "a@example.com", "course": "Flask Full Course – freeCodeCamp", "weight": 1}
+
+    python tools/train_course_als.py --mysql
+    python tools/train_course_als.py --data events.jsonl --factors 32 --iterations 10
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules import collaborative as cf
+from modules.recommendation_engine import COURSE_LINKS
+
+
+def events_from_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                e = json.loads(line)
+                yield e['user'], e['course'], float(e.get('weight', 1.0))
+
+
+def events_from_mysql(args):
+    import pymysql
+    conn = pymysql.connect(host=args.host, user=args.user, password=args.password, db=args.db)
+    try:
+        cursor = conn.cursor()
+        # feedback is 1-5 for the whole tool: 3 is neutral, 5 counts a user's courses ~1.7x
+        cursor.execute('SELECT feed_email, AVG(feed_score) FROM user_feedback GROUP BY feed_email')
+        scale = {email.lower(): float(score) / 3.0 for email, score in cursor.fetchall() if email}
+        cursor.execute('SELECT Email_ID, convert(Recommended_courses using utf8) FROM user_data')
+        for email, courses in cursor.fetchall():
+            if not email or not courses:
+                continue
+            try:
+                titles = ast.literal_eval(courses)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(titles, str):
+                continue  # "Sorry! Not Available for this Field"
+            for title in titles:
+                yield email.lower(), title, scale.get(email.lower(), 1.0)
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Train the ALS course recommender')
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument('--data', help='JSONL file of (user, course, weight) events')
+    src.add_argument('--mysql', action='store_true', help='read user_data/user_feedback')
+    ap.add_argument('--host', default='localhost')
+    ap.add_argument('--user', default='root')
+    ap.add_argument('--password', default=os.environ.get('ML_MYSQL_PASSWORD', 'root@MySQL4admin'))
+    ap.add_argument('--db', default='cv')
+    ap.add_argument('--out', default=cf.MODEL_PATH)
+    ap.add_argument('--factors', type=int, default=cf.FACTORS)
+    ap.add_argument('--iterations', type=int, default=10)
+    ap.add_argument('--alpha', type=float, default=cf.ALPHA)
+    ap.add_argument('--reg', type=float, default=cf.REG)
+    ap.add_argument('--no-users', action='store_true', help='save item factors only')
+    args = ap.parse_args()
+
+    events = events_from_jsonl(args.data) if args.data else events_from_mysql(args)
+    users, items, indptr, indices, values = cf.build_matrix(events, list(COURSE_LINKS))
+    if not users:
+        print('no interactions found', file=sys.stderr)
+        return 1
+    print(f'{len(users)} users x {len(items)} courses, {len(values)} interactions')
+    start = time.perf_counter()
+    X, Y = cf.train_als(indptr, indices, values, len(items), args.factors, args.iterations, args.alpha, args.reg,
+                        callback=lambda it, X, Y: print(f'  iteration {it + 1}: {time.perf_counter() - start:.1f}s'))
+    if args.no_users:
+        model = cf.CourseModel(items, Y, args.reg, args.alpha)
+    else:
+        model = cf.CourseModel(items, Y, args.reg, args.alpha, users, X, indptr, indices)
+    model.save(args.out)
+    print(f'saved {args.out} ({os.path.getsize(args.out) / 2**20:.1f} MiB)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
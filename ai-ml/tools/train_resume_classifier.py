@@ -0,0 +1,126 @@
+"""Train the candidate field/level classifier used by core/App.py.
+
+Training data is either a JSONL file with one labelled resume per line
+
+    {"text": "...", "skills": ["python", ...], "sections": ["experience", ...],
+     "field": "Data Science", "level": "Experienced"}
+
+(skills/sections are optional and derived from the text when missing), or a directory
+of resumes (pdf/docx/txt) that are parsed here and labelled with the keyword rules the
+app used before, as a bootstrap until hand-labelled data exists. Resumes without a
+field label are still used for the level head.
+
+    python tools/train_resume_classifier.py --data labelled.jsonl
+    python tools/train_resume_classifier.py --resumes core/Uploaded_Resumes --out data/resume_classifier.npz
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules import resume_classifier as rc
+from modules.resume_parser import extract_text_generic, parse_resume_text
+from modules.sections import labels_present, segment
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+def _complete(doc):
+    text = doc.get('text') or ''
+    if 'skills' not in doc:
+        doc['skills'] = parse_resume_text(text)['skills']
+    if 'sections' not in doc:
+        doc['sections'] = sorted(labels_present(segment(text)))
+    return doc
+
+
+def load_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [_complete(json.loads(line)) for line in f if line.strip()]
+
+
+def load_resume_dir(path):
+    docs = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(RESUME_EXTENSIONS):
+            continue
+        try:
+            text, _ = extract_text_generic(os.path.join(path, name))
+        except Exception as e:
+            print(f'skip {name}: {e}', file=sys.stderr)
+            continue
+        doc = _complete({'text': text, 'source': name})
+        doc['field'] = rc.rule_field(doc['skills'])
+        doc['level'] = rc.rule_level(doc['sections'])
+        docs.append(doc)
+    return docs
+
+
+def load_examples(args):
+    if args.data:
+        return load_jsonl(args.data)
+    return load_resume_dir(args.resumes)
+
+
+def split(docs, holdout, seed):
+    order = np.random.default_rng(seed).permutation(len(docs))
+    cut = int(len(docs) * (1 - holdout))
+    return [docs[i] for i in order[:cut]], [docs[i] for i in order[cut:]]
+
+
+def labelled(docs, key, labels):
+    keep = [d for d in docs if d.get(key) in labels]
+    return keep, np.array([labels.index(d[key]) for d in keep], dtype=np.int64)
+
+
+def accuracy(head, model, docs, key):
+    docs, y = labelled(docs, key, list(head.labels))
+    if not docs:
+        return None
+    pred = head.predict_proba(model.vectorize(docs)).argmax(axis=1)
+    return float((pred == y).mean())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description='Train the resume field/level classifier')
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument('--data', help='labelled JSONL file')
+    src.add_argument('--resumes', help='directory of resumes, weakly labelled by the keyword rules')
+    ap.add_argument('--out', default=rc.MODEL_PATH)
+    ap.add_argument('--hash-bits', type=int, default=rc.HASH_BITS)
+    ap.add_argument('--epochs', type=int, default=20)
+    ap.add_argument('--lr', type=float, default=0.5)
+    ap.add_argument('--l2', type=float, default=1e-5)
+    ap.add_argument('--holdout', type=float, default=0.2, help='fraction kept back for evaluation')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    docs = load_examples(args)
+    if not docs:
+        print('no training examples found', file=sys.stderr)
+        return 1
+    train, test = split(docs, args.holdout, args.seed)
+    model = rc.ResumeClassifier.untrained(args.hash_bits)
+    for key, head in (('field', model.field), ('level', model.level)):
+        rows, y = labelled(train, key, list(head.labels))
+        if not rows:
+            print(f'{key}: no labelled examples, head left untrained')
+            continue
+        start = time.perf_counter()
+        losses = head.fit(model.vectorize(rows), y, epochs=args.epochs, lr=args.lr, l2=args.l2, seed=args.seed)
+        acc = accuracy(head, model, test, key)
+        print(f'{key}: {len(rows)} examples, loss {losses[0]:.3f} -> {losses[-1]:.3f}, '
+              f'{time.perf_counter() - start:.1f}s, holdout accuracy '
+              f'{"n/a" if acc is None else f"{acc:.3f}"}')
+    model.save(args.out)
+    print(f'saved {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())